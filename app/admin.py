@@ -4,4 +4,4 @@ from django.apps import apps
 app = apps.get_app_config('app')
 
 for model_name, model in app.models.items():
-    admin.site.register(model)
\ No newline at end of file
+    admin.site.register(model, list_select_related=True)
\ No newline at end of file
@@ -0,0 +1,87 @@
+import hashlib
+import io
+import mimetypes
+import os
+import posixpath
+import uuid
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.http import FileResponse, Http404, HttpResponse
+from PIL import Image, ImageOps
+
+
+class RecipesStorage(FileSystemStorage):
+	"""
+	Guarda cada archivo con el hash de su contenido como nombre: volver a
+	subir el mismo archivo reutiliza el que ya existe. Las imágenes más
+	grandes que RECIPES_MAX_LADO o RECIPES_MAX_BYTES se reducen a JPEG.
+	"""
+
+	def get_available_name(self, name, max_length=None):
+		return name
+
+	def comprimir(self, content):
+		content.seek(0)
+		try:
+			with Image.open(content) as original:
+				if max(original.size) <= settings.RECIPES_MAX_LADO and content.size <= settings.RECIPES_MAX_BYTES:
+					return None
+				imagen = ImageOps.exif_transpose(original).convert('RGB')
+		except (OSError, Image.DecompressionBombError):
+			return None
+		imagen.thumbnail((settings.RECIPES_MAX_LADO, settings.RECIPES_MAX_LADO), Image.LANCZOS)
+		salida = io.BytesIO()
+		imagen.save(salida, 'JPEG', quality=85, optimize=True)
+		return ContentFile(salida.getvalue())
+
+	def _save(self, name, content):
+		huella = hashlib.sha256()
+		for bloque in content.chunks():
+			huella.update(bloque)
+		directorio, nombre = posixpath.split(name)
+		base = posixpath.join(directorio, huella.hexdigest())
+		# Una imagen grande ya subida quedó guardada como JPEG.
+		for candidato in (base + posixpath.splitext(nombre)[1].lower(), base + '.jpg'):
+			if self.exists(candidato):
+				return candidato
+		comprimido = self.comprimir(content)
+		name = base + ('.jpg' if comprimido is not None else posixpath.splitext(nombre)[1].lower())
+		# Se escribe en un temporal y se enlaza con el nombre final: si otra
+		# subida idéntica ganó la carrera, os.link falla y se usa la suya.
+		temporal = super()._save('%s.%s.tmp' % (base, uuid.uuid4().hex), comprimido or content)
+		try:
+			os.link(self.path(temporal), self.path(name))
+		except FileExistsError:
+			pass
+		finally:
+			os.remove(self.path(temporal))
+		return name
+
+
+def enviar_archivo(nombre, cache_control, storage=default_storage):
+	"""
+	Responde con el archivo sin que Python lea su contenido cuando hay un
+	servidor delante (ENVIO_ARCHIVOS = 'x-accel-redirect' para nginx o
+	'x-sendfile' para Apache). Sin él, Django lo envía con FileResponse.
+	"""
+	try:
+		ruta = storage.path(nombre)
+	except SuspiciousFileOperation:
+		raise Http404
+	if not os.path.isfile(ruta):
+		raise Http404
+	content_type = mimetypes.guess_type(ruta)[0] or 'application/octet-stream'
+	if settings.ENVIO_ARCHIVOS == 'x-accel-redirect':
+		response = HttpResponse(content_type=content_type)
+		response['X-Accel-Redirect'] = quote(settings.ENVIO_ARCHIVOS_PREFIJO + nombre)
+	elif settings.ENVIO_ARCHIVOS == 'x-sendfile':
+		response = HttpResponse(content_type=content_type)
+		response['X-Sendfile'] = ruta
+	else:
+		response = FileResponse(open(ruta, 'rb'), content_type=content_type)
+	response['Cache-Control'] = cache_control
+	return response
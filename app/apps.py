@@ -1,6 +1,18 @@
 from django.apps import AppConfig
+from django.contrib.staticfiles.apps import StaticFilesConfig as BaseStaticFilesConfig
 
 
 class AppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app'
+
+    def ready(self):
+        from . import signals
+
+
+class StaticFilesConfig(BaseStaticFilesConfig):
+    # Fuentes y variantes de los paquetes de vendor que las plantillas no usan
+    ignore_patterns = BaseStaticFilesConfig.ignore_patterns + [
+        'scss', 'less', 'metadata', 'sprites', 'svgs', '*.scss', '*.less',
+        'vendor/fontawesome-free/js/*',
+    ]
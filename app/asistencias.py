@@ -0,0 +1,211 @@
+import datetime
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, FloatField, Q, Sum
+from django.db.models.functions import Cast, ExtractMonth, ExtractYear
+from django.utils.dateparse import parse_date
+
+from . import models, versiones
+
+
+def get_fecha(fecha):
+	if not isinstance(fecha, datetime.date):
+		fecha = parse_date(str(fecha))
+	return fecha
+
+
+class Deltas:
+	"""
+	Acumula cambios de presentes por (asignatura, fecha) y por (alumno, año,
+	mes). Al aplicarlos, un día de clase que aparece o desaparece del resumen
+	diario suma o resta una clase a cada alumno inscrito en la asignatura.
+	"""
+
+	def __init__(self):
+		self.dias = defaultdict(int)
+		self.meses = defaultdict(int)
+
+	def sumar(self, asignatura_id, alumno_id, fecha, cantidad=1):
+		fecha = get_fecha(fecha)
+		self.dias[(asignatura_id, fecha)] += cantidad
+		self.meses[(alumno_id, fecha.year, fecha.month)] += cantidad
+
+	def restar(self, asignatura_id, alumno_id, fecha):
+		self.sumar(asignatura_id, alumno_id, fecha, -1)
+
+	def aplicar(self):
+		dias = {clave: cambio for clave, cambio in self.dias.items() if cambio}
+		meses = {clave: cambio for clave, cambio in self.meses.items() if cambio}
+		if not dias and not meses:
+			return
+		with transaction.atomic():
+			clases = self.aplicar_dias(dias)
+			self.aplicar_meses(meses, clases)
+			versiones.invalidar(models.Asistencia_Diaria, models.Asistencia_Mensual)
+		self.dias.clear()
+		self.meses.clear()
+
+	def aplicar_dias(self, dias):
+		existentes = {
+			(d.asignatura_id, d.fecha): d
+			for d in models.Asistencia_Diaria.objects.select_for_update().filter(
+				asignatura_id__in={clave[0] for clave in dias},
+				fecha__in={clave[1] for clave in dias},
+			)
+		}
+		abiertos = {}
+		cerrados = []
+		actualizar = []
+		for clave, cambio in dias.items():
+			fila = existentes.get(clave)
+			if fila is None:
+				# Un descuento sin fila solo ocurre si la asignatura se borró en cascada.
+				if cambio > 0:
+					abiertos[clave] = cambio
+			elif fila.presentes + cambio > 0:
+				fila.presentes += cambio
+				actualizar.append(fila)
+			else:
+				cerrados.append(clave)
+		inscritos = defaultdict(list)
+		asignaturas = {clave[0] for clave in abiertos} | {clave[0] for clave in cerrados}
+		if asignaturas:
+			for asignatura_id, alumno_id in models.Asignatura_Alumno.objects.filter(asignatura_id__in=asignaturas).values_list('asignatura_id', 'alumno_id'):
+				inscritos[asignatura_id].append(alumno_id)
+		models.Asistencia_Diaria.objects.bulk_update(actualizar, ['presentes'])
+		models.Asistencia_Diaria.objects.bulk_create([
+			models.Asistencia_Diaria(asignatura_id=asignatura_id, fecha=fecha, presentes=cambio, inscritos=len(inscritos[asignatura_id]))
+			for (asignatura_id, fecha), cambio in abiertos.items()
+		])
+		if cerrados:
+			models.Asistencia_Diaria.objects.filter(pk__in=[existentes[clave].pk for clave in cerrados]).delete()
+		clases = defaultdict(int)
+		for claves, signo in ((abiertos, 1), (cerrados, -1)):
+			for asignatura_id, fecha in claves:
+				for alumno_id in inscritos[asignatura_id]:
+					clases[(alumno_id, fecha.year, fecha.month)] += signo
+		return clases
+
+	def aplicar_meses(self, meses, clases):
+		cambios = defaultdict(lambda: [0, 0])
+		for clave, cambio in meses.items():
+			cambios[clave][0] += cambio
+		for clave, cambio in clases.items():
+			cambios[clave][1] += cambio
+		cambios = {clave: valor for clave, valor in cambios.items() if valor != [0, 0]}
+		if not cambios:
+			return
+		existentes = {
+			(m.alumno_id, m.anio, m.mes): m
+			for m in models.Asistencia_Mensual.objects.select_for_update().filter(
+				alumno_id__in={clave[0] for clave in cambios},
+				anio__in={clave[1] for clave in cambios},
+				mes__in={clave[2] for clave in cambios},
+			)
+		}
+		actualizar = []
+		crear = []
+		eliminar = []
+		for clave, (presentes, clases) in cambios.items():
+			fila = existentes.get(clave)
+			if fila is not None:
+				fila.presentes += presentes
+				fila.clases += clases
+				if fila.presentes <= 0 and fila.clases <= 0:
+					eliminar.append(fila.pk)
+				else:
+					actualizar.append(fila)
+			elif presentes > 0 or clases > 0:
+				alumno_id, anio, mes = clave
+				crear.append(models.Asistencia_Mensual(alumno_id=alumno_id, anio=anio, mes=mes, presentes=max(presentes, 0), clases=max(clases, 0)))
+		models.Asistencia_Mensual.objects.bulk_update(actualizar, ['presentes', 'clases'])
+		models.Asistencia_Mensual.objects.bulk_create(crear)
+		if eliminar:
+			models.Asistencia_Mensual.objects.filter(pk__in=eliminar).delete()
+
+
+def recalcular(asignatura_ids=None, alumno_ids=None):
+	"""
+	Vuelve a generar desde Asistencia_Alumno el resumen diario de las
+	asignaturas dadas y el mensual de los alumnos dados (o de todos).
+	"""
+	dias_filtro = meses_filtro = Q()
+	asistencias_dias = asistencias_meses = Q()
+	if asignatura_ids is not None:
+		dias_filtro = Q(asignatura_id__in=asignatura_ids)
+		asistencias_dias = Q(asignatura_alumno__asignatura_id__in=asignatura_ids)
+	if alumno_ids is not None:
+		meses_filtro = Q(alumno_id__in=alumno_ids)
+		asistencias_meses = Q(asignatura_alumno__alumno_id__in=alumno_ids)
+	with transaction.atomic():
+		models.Asistencia_Diaria.objects.filter(dias_filtro).delete()
+		models.Asistencia_Mensual.objects.filter(meses_filtro).delete()
+		inscritos = dict(models.Asignatura_Alumno.objects.filter(dias_filtro).values_list('asignatura_id').annotate(n=Count('id')).order_by())
+		dias = models.Asistencia_Alumno.objects.filter(asistencias_dias).values(
+			'fecha', asignatura_id=F('asignatura_alumno__asignatura_id'),
+		).annotate(presentes=Count('id')).order_by()
+		models.Asistencia_Diaria.objects.bulk_create([
+			models.Asistencia_Diaria(inscritos=inscritos.get(fila['asignatura_id'], 0), **fila) for fila in dias.iterator()
+		], batch_size=1000)
+		meses = defaultdict(lambda: [0, 0])
+		presentes = models.Asistencia_Alumno.objects.filter(asistencias_meses).values_list(
+			'asignatura_alumno__alumno_id', ExtractYear('fecha'), ExtractMonth('fecha'),
+		).annotate(n=Count('id')).order_by()
+		for alumno_id, anio, mes, n in presentes.iterator():
+			meses[(alumno_id, anio, mes)][0] = n
+		clases = models.Asignatura_Alumno.objects.filter(meses_filtro, asignatura__asistencia_diaria__isnull=False).values_list(
+			'alumno_id', ExtractYear('asignatura__asistencia_diaria__fecha'), ExtractMonth('asignatura__asistencia_diaria__fecha'),
+		).annotate(n=Count('id')).order_by()
+		for alumno_id, anio, mes, n in clases.iterator():
+			meses[(alumno_id, anio, mes)][1] = n
+		models.Asistencia_Mensual.objects.bulk_create([
+			models.Asistencia_Mensual(alumno_id=alumno_id, anio=anio, mes=mes, presentes=presentes, clases=clases)
+			for (alumno_id, anio, mes), (presentes, clases) in meses.items()
+		], batch_size=1000)
+		versiones.invalidar(models.Asistencia_Diaria, models.Asistencia_Mensual)
+
+
+def porcentaje(presentes, total):
+	return round(presentes * 100 / total, 1) if total else None
+
+
+def estadisticas(dias=30, meses=12, limite=10):
+	"""Datos de los gráficos del tablero; solo lee los resúmenes."""
+	por_dia = list(models.Asistencia_Diaria.objects.values('fecha').annotate(
+		presentes=Sum('presentes'), inscritos=Sum('inscritos'),
+	).order_by('-fecha')[:dias])[::-1]
+	por_mes = list(models.Asistencia_Mensual.objects.values('anio', 'mes').annotate(
+		presentes=Sum('presentes'), clases=Sum('clases'),
+	).order_by('-anio', '-mes')[:meses])[::-1]
+	resultado = {
+		'dias': {
+			'etiquetas': [fila['fecha'].strftime('%d/%m') for fila in por_dia],
+			'porcentajes': [porcentaje(fila['presentes'], fila['inscritos']) for fila in por_dia],
+		},
+		'meses': {
+			'etiquetas': ['%02d/%d' % (fila['mes'], fila['anio']) for fila in por_mes],
+			'porcentajes': [porcentaje(fila['presentes'], fila['clases']) for fila in por_mes],
+		},
+		'asignaturas': {'etiquetas': [], 'porcentajes': []},
+		'alumnos': {'etiquetas': [], 'porcentajes': []},
+	}
+	if not por_mes:
+		return resultado
+	# Las asignaturas y los alumnos con menor asistencia del último mes.
+	ultimo = por_mes[-1]
+	asignaturas = models.Asistencia_Diaria.objects.filter(
+		fecha__year=ultimo['anio'], fecha__month=ultimo['mes'],
+	).values('asignatura__nombre').annotate(
+		tasa=Cast(Sum('presentes'), FloatField()) / Sum('inscritos'),
+	).filter(tasa__isnull=False).order_by('tasa', 'asignatura__nombre')[:limite]
+	alumnos = models.Asistencia_Mensual.objects.filter(
+		anio=ultimo['anio'], mes=ultimo['mes'], clases__gt=0,
+	).annotate(
+		tasa=Cast('presentes', FloatField()) / F('clases'),
+	).order_by('tasa', 'alumno__nombre').values('alumno__nombre', 'tasa')[:limite]
+	for clave, filas, campo in (('asignaturas', asignaturas, 'asignatura__nombre'), ('alumnos', alumnos, 'alumno__nombre')):
+		for fila in filas:
+			resultado[clave]['etiquetas'].append(fila[campo])
+			resultado[clave]['porcentajes'].append(round(fila['tasa'] * 100, 1))
+	return resultado
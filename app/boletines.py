@@ -0,0 +1,124 @@
+import os
+import tempfile
+import zipfile
+from concurrent.futures import as_completed
+from pathlib import Path
+
+from django.conf import settings
+from django.template.loader import get_template
+from django.utils import timezone
+from pypdf import PdfWriter
+
+from . import models, notas
+from .procesos import Pool
+from .utils import render_pdf_bytes
+
+pool = Pool('BOLETINES_WORKERS')
+
+PLANTILLA = 'pdf/boletin.html'
+
+# Plantillas compiladas por proceso: cada worker la compila una sola vez.
+plantillas = {}
+
+
+def get_plantilla(template_src):
+	if template_src not in plantillas:
+		plantillas[template_src] = get_template(template_src)
+	return plantillas[template_src]
+
+
+def get_contextos(asignaturas):
+	"""
+	Un contexto por alumno inscrito en alguna de las asignaturas, con los
+	promedios de todas sus asignaturas. Son diccionarios simples para
+	enviarlos a los procesos del pool; se arman con dos consultas.
+	"""
+	alumnos = models.Asignatura_Alumno.objects.filter(asignatura__in=asignaturas).values('alumno_id')
+	inscripciones = models.Asignatura_Alumno.objects.filter(alumno_id__in=alumnos).select_related(
+		'alumno__representante', 'asignatura',
+	).order_by('alumno__cedula', 'asignatura__nombre', 'pk')
+	promedios = {
+		(promedio.asignatura_alumno_id, promedio.lapso): promedio.promedio
+		for promedio in models.Promedio_Alumno.objects.filter(asignatura_alumno__alumno_id__in=alumnos)
+	}
+	lapsos = [nombre for lapso, nombre in models.LAPSOS]
+	fecha = timezone.localdate()
+	contextos = {}
+	for inscripcion in inscripciones:
+		alumno = inscripcion.alumno
+		if alumno.pk not in contextos:
+			contextos[alumno.pk] = {
+				'alumno': {'id': alumno.pk, 'cedula': alumno.cedula, 'nombre': alumno.nombre, 'representante': alumno.representante.nombre},
+				'asignaturas': [],
+				'lapsos': lapsos,
+				'fecha': fecha,
+			}
+		por_lapso = [promedios.get((inscripcion.pk, lapso)) for lapso in notas.LAPSOS]
+		contextos[alumno.pk]['asignaturas'].append({
+			'nombre': inscripcion.asignatura.nombre,
+			'promedios': por_lapso,
+			'definitiva': notas.get_definitiva(por_lapso),
+		})
+	return list(contextos.values())
+
+
+def generar_lote(template_src, contextos, directorio):
+	"""Se ejecuta en el pool: escribe un PDF por contexto en directorio."""
+	plantilla = get_plantilla(template_src)
+	generados = []
+	errores = []
+	for contexto in contextos:
+		alumno = contexto['alumno']
+		pdf = render_pdf_bytes(plantilla, contexto)
+		if pdf is None:
+			errores.append(alumno['cedula'])
+			continue
+		# La cédula del alumno no es única: el id evita pisar archivos.
+		ruta = Path(directorio) / ('boletin-%s-%d.pdf' % (alumno['cedula'], alumno['id']))
+		ruta.write_bytes(pdf)
+		generados.append(str(ruta))
+	return generados, errores
+
+
+def empaquetar(archivos, destino, unir):
+	temporal = destino.with_name(destino.name + '.tmp')
+	if unir:
+		escritor = PdfWriter()
+		for archivo in archivos:
+			escritor.append(archivo)
+		with open(temporal, 'wb') as salida:
+			escritor.write(salida)
+	else:
+		# Los PDF ya vienen comprimidos: se guardan sin volver a comprimir.
+		with zipfile.ZipFile(temporal, 'w', zipfile.ZIP_STORED) as salida:
+			for archivo in archivos:
+				salida.write(archivo, Path(archivo).name)
+	os.replace(temporal, destino)
+
+
+def generar(asignaturas, destino, unir=False, progreso=None):
+	"""
+	Genera los boletines de los alumnos de las asignaturas repartiendo lotes
+	de BOLETINES_LOTE alumnos entre los procesos del pool, y los guarda en
+	destino como un ZIP o, con unir, como un único PDF. progreso se llama
+	con (hechos, total) cada vez que termina un lote. Devuelve la cantidad
+	de boletines generados y las cédulas que fallaron.
+	"""
+	destino = Path(destino)
+	contextos = get_contextos(asignaturas)
+	lote = settings.BOLETINES_LOTE
+	archivos = []
+	errores = []
+	with tempfile.TemporaryDirectory() as directorio:
+		tareas = [
+			pool.submit(generar_lote, PLANTILLA, contextos[i:i + lote], directorio)
+			for i in range(0, len(contextos), lote)
+		]
+		for tarea in as_completed(tareas):
+			generados, fallidos = tarea.result()
+			archivos.extend(generados)
+			errores.extend(fallidos)
+			if progreso:
+				progreso(len(archivos) + len(errores), len(contextos))
+		empaquetar(sorted(archivos), destino, unir)
+	return len(archivos), errores
@@ -0,0 +1,137 @@
+import re
+
+from django.apps import apps as global_apps
+from django.db import connections
+from django.urls import reverse
+
+from . import models
+
+# La tabla la crea la migración 0024_busqueda.
+TABLA = 'app_busqueda'
+
+# tipo: (modelo, select_related, función que devuelve el título y los textos)
+FUENTES = {
+	'personal': ('Personal', [], lambda o: (o.nombre, [o.cedula, o.correo])),
+	'alumno': ('Alumno', [], lambda o: (o.nombre, [o.cedula, o.correo])),
+	'representante': ('Representante', [], lambda o: (o.nombre, [o.cedula])),
+	'bien': ('Bien', ['tipo'], lambda o: (o.nombre, [o.tipo.nombre])),
+	'reporte': ('Reporte', ['bien'], lambda o: (o.bien.nombre, [o.observacion])),
+	'memorandum': ('Memorandum', ['personal'], lambda o: (o.personal.nombre, [o.observacion])),
+}
+
+TIPOS = list(FUENTES)
+
+TIPO_POR_MODELO = {getattr(models, fuente[0]): tipo for tipo, fuente in FUENTES.items()}
+
+# Modelos cuyo cambio altera el texto indexado de otros: (tipo, campo que los referencia)
+DEPENDENCIAS = {
+	models.Tipo_Bien: [('bien', 'tipo')],
+	models.Bien: [('reporte', 'bien')],
+	models.Personal: [('memorandum', 'personal')],
+}
+
+LOTE = 500
+
+
+def get_id(tipo, pk):
+	# Un solo entero identifica la fila: así se borra por clave y no
+	# recorriendo la tabla.
+	return pk * 8 + TIPOS.index(tipo)
+
+
+def get_columna_id(conexion):
+	return 'rowid' if conexion.vendor == 'sqlite' else 'id'
+
+
+def desindexar(tipo, pks, using='default'):
+	conexion = connections[using]
+	ids = [get_id(tipo, pk) for pk in pks]
+	with conexion.cursor() as cursor:
+		for i in range(0, len(ids), LOTE):
+			lote = ids[i:i + LOTE]
+			cursor.execute(
+				'DELETE FROM %s WHERE %s IN (%s)' % (TABLA, get_columna_id(conexion), ', '.join(['%s'] * len(lote))),
+				lote,
+			)
+
+
+def insertar(tipo, objs, using='default'):
+	conexion = connections[using]
+	filas = []
+	for obj in objs:
+		titulo, textos = FUENTES[tipo][2](obj)
+		filas.append((get_id(tipo, obj.pk), titulo, ' '.join(texto for texto in textos if texto)))
+	with conexion.cursor() as cursor:
+		cursor.executemany(
+			'INSERT INTO %s (%s, titulo, texto) VALUES (%%s, %%s, %%s)' % (TABLA, get_columna_id(conexion)),
+			filas,
+		)
+
+
+def indexar(tipo, objs, using='default'):
+	objs = list(objs)
+	desindexar(tipo, [obj.pk for obj in objs], using)
+	insertar(tipo, objs, using)
+
+
+def actualizar(instancia, using='default'):
+	tipo = TIPO_POR_MODELO.get(type(instancia))
+	if tipo:
+		indexar(tipo, [instancia], using)
+	for tipo, campo in DEPENDENCIAS.get(type(instancia), []):
+		modelo = getattr(models, FUENTES[tipo][0])
+		indexar(tipo, modelo.objects.using(using).filter(**{campo: instancia}).select_related(*FUENTES[tipo][1]), using)
+
+
+def eliminar(instancia, using='default'):
+	tipo = TIPO_POR_MODELO.get(type(instancia))
+	if tipo:
+		desindexar(tipo, [instancia.pk], using)
+
+
+def reconstruir(using='default', apps=global_apps):
+	with connections[using].cursor() as cursor:
+		cursor.execute('DELETE FROM %s' % TABLA)
+	for tipo, (nombre, relaciones, textos) in FUENTES.items():
+		consulta = apps.get_model('app', nombre)._default_manager.using(using).select_related(*relaciones)
+		lote = []
+		for obj in consulta.iterator(chunk_size=2000):
+			lote.append(obj)
+			if len(lote) >= 2000:
+				insertar(tipo, lote, using)
+				lote = []
+		insertar(tipo, lote, using)
+
+
+def buscar(texto, limite=50, using='default'):
+	"""Devuelve los resultados ordenados por relevancia; cada palabra busca por prefijo."""
+	palabras = re.findall(r'\w+', texto)
+	if not palabras:
+		return []
+	conexion = connections[using]
+	with conexion.cursor() as cursor:
+		if conexion.vendor == 'sqlite':
+			cursor.execute(
+				'SELECT rowid, titulo, texto FROM %s WHERE %s MATCH %%s ORDER BY bm25(%s, 10.0, 1.0) LIMIT %%s' % (TABLA, TABLA, TABLA),
+				[' '.join('"%s"*' % palabra for palabra in palabras), limite],
+			)
+		else:
+			consulta = ' & '.join('%s:*' % palabra for palabra in palabras)
+			cursor.execute(
+				"SELECT id, titulo, texto FROM %s WHERE documento @@ to_tsquery('simple', %%s) "
+				"ORDER BY ts_rank(documento, to_tsquery('simple', %%s)) DESC LIMIT %%s" % TABLA,
+				[consulta, consulta, limite],
+			)
+		filas = cursor.fetchall()
+	resultados = []
+	for id, titulo, texto in filas:
+		tipo = TIPOS[id % 8]
+		resultados.append({
+			'tipo': tipo,
+			'etiqueta': getattr(models, FUENTES[tipo][0])._meta.verbose_name.capitalize(),
+			'id': id // 8,
+			'titulo': titulo,
+			'texto': texto,
+			'url': reverse('ver_' + tipo, args=[id // 8]),
+		})
+	return resultados
@@ -0,0 +1,67 @@
+import hashlib
+
+from django.conf import settings
+from django.contrib import messages
+from django.template.loader import get_template
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from . import versiones
+from .middleware import get_version
+
+PLANTILLA_BASE = 'bases/dashboard.html'
+
+
+def get_relacionados(model):
+	"""El modelo y los de sus claves foráneas y muchos a muchos de la app."""
+	modelos = [model]
+	for campo in model._meta.get_fields():
+		if campo.concrete and campo.is_relation and campo.related_model._meta.app_label == model._meta.app_label:
+			modelos.append(campo.related_model)
+	return modelos
+
+
+class CondicionalMixin:
+	"""
+	GET condicional (ETag y Last-Modified) sin consultar la base ni
+	renderizar: ambos salen de las versiones de modelos_condicional
+	(app/versiones.py), del usuario y de las plantillas. Por defecto los
+	modelos son el de la vista y los de sus relaciones directas.
+	"""
+	modelos_condicional = None
+	plantillas_condicional = (PLANTILLA_BASE,)
+
+	def get_modelos_condicional(self):
+		if self.modelos_condicional is not None:
+			return self.modelos_condicional
+		return get_relacionados(getattr(self, 'model', None) or self.queryset.model)
+
+	def get_etag(self, marcas):
+		request = self.request
+		partes = [type(self).__name__, request.get_full_path(), str(request.user.id), request.lca_group or '']
+		if request.user.is_authenticated:
+			partes.append(get_version(request.user.id))
+		# El token CSRF de los formularios cambia al iniciar sesión.
+		partes.append(request.COOKIES.get(settings.CSRF_COOKIE_NAME, ''))
+		partes.extend(marcas)
+		for plantilla in (self.template_name,) + tuple(self.plantillas_condicional):
+			partes.append(get_template(plantilla).template.source)
+		return quote_etag(hashlib.sha1('\n'.join(partes).encode()).hexdigest())
+
+	def get(self, request, *args, **kwargs):
+		# Los mensajes pendientes se muestran en la página: no hay 304.
+		if len(messages.get_messages(request)):
+			return super().get(request, *args, **kwargs)
+		marcas = versiones.get_versiones(self.get_modelos_condicional())
+		etag = self.get_etag(marcas)
+		modificado = int(versiones.get_fecha(marcas).timestamp())
+		respuesta = get_conditional_response(request, etag=etag, last_modified=modificado)
+		if respuesta is None:
+			respuesta = super().get(request, *args, **kwargs)
+			if respuesta.status_code != 200:
+				return respuesta
+		respuesta['ETag'] = etag
+		respuesta['Last-Modified'] = http_date(modificado)
+		# Solo el navegador guarda la página y la vuelve a validar cada vez.
+		patch_cache_control(respuesta, private=True, no_cache=True)
+		return respuesta
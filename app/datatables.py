@@ -0,0 +1,167 @@
+import json
+
+from django.core.exceptions import FieldDoesNotExist
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Q
+from django.http import JsonResponse
+from django.template.loader import get_template
+from django.utils.formats import localize
+from django.utils.html import conditional_escape
+from django.views import View
+from django.views.generic.list import MultipleObjectMixin
+
+
+class DataTableView(MultipleObjectMixin, View):
+	"""
+	Endpoint JSON para el modo server-side del plugin DataTables.
+
+	Cada columna es una tupla (lookup, display): el lookup del ORM se usa
+	para ordenar y buscar (None si la columna no se puede ordenar) y el
+	display es una ruta de atributos del objeto o un callable que recibe el
+	objeto. Si hay actions_template se agrega una última columna con el
+	fragmento renderizado.
+
+	Al ordenar por una columna no nula la respuesta incluye un cursor con
+	la clave de la última fila; si el cliente lo devuelve al pedir la página
+	siguiente se pagina por keyset en lugar de OFFSET.
+	"""
+	columns = []
+	search_fields = []
+	actions_template = None
+	max_length = 100
+
+	def get(self, request, *args, **kwargs):
+		respuesta = self.get_datos(request.GET)
+		respuesta['draw'] = self.get_int(request.GET, 'draw', 0)
+		return JsonResponse(respuesta)
+
+	def get_datos(self, params):
+		start = max(self.get_int(params, 'start', 0), 0)
+		length = self.get_int(params, 'length', 10)
+		if length <= 0 or length > self.max_length:
+			length = self.max_length
+
+		queryset = self.get_queryset()
+		total = queryset.count()
+		filtro = self.get_search_filter(params)
+		if filtro:
+			queryset = queryset.filter(filtro)
+			filtered = queryset.count()
+		else:
+			filtered = total
+
+		lookup, desc = self.get_order(params)
+		signo = '-' if desc else ''
+		queryset = queryset.annotate(dt_orden=F(lookup)).order_by(signo + 'dt_orden', signo + 'pk')
+
+		huella = self.get_fingerprint(params, lookup, desc)
+		ultimo = self.get_cursor(params.get('cursor'), start, huella)
+		if ultimo is not None:
+			valor, pk = ultimo
+			if desc:
+				queryset = queryset.filter(Q(dt_orden__lt=valor) | Q(dt_orden=valor, pk__lt=pk))
+			else:
+				queryset = queryset.filter(Q(dt_orden__gt=valor) | Q(dt_orden=valor, pk__gt=pk))
+			object_list = list(queryset[:length])
+		else:
+			object_list = list(queryset[start:start + length])
+
+		acciones = get_template(self.actions_template) if self.actions_template else None
+		contexto = self.get_actions_context() if acciones else {}
+		data = []
+		for obj in object_list:
+			fila = [self.render_cell(obj, display) for lookup_columna, display in self.columns]
+			if acciones:
+				fila.append(acciones.render(dict(contexto, object=obj), self.request))
+			data.append(fila)
+
+		respuesta = {
+			'recordsTotal': total,
+			'recordsFiltered': filtered,
+			'data': data,
+		}
+		if len(object_list) == length and self.is_keyset(lookup):
+			ultimo = object_list[-1]
+			respuesta['cursor'] = json.dumps({
+				'start': start + length,
+				'huella': huella,
+				'ultimo': [ultimo.dt_orden, ultimo.pk],
+			}, cls=DjangoJSONEncoder)
+		return respuesta
+
+	def get_int(self, params, nombre, defecto):
+		try:
+			return int(params.get(nombre, defecto))
+		except (TypeError, ValueError):
+			return defecto
+
+	def get_actions_context(self):
+		return {}
+
+	def get_search_filter(self, params):
+		filtro = Q()
+		valor = params.get('search[value]', '').strip()
+		if valor and self.search_fields:
+			busqueda = Q()
+			for campo in self.search_fields:
+				busqueda |= Q(**{campo + '__icontains': valor})
+			filtro &= busqueda
+		for i, (lookup, display) in enumerate(self.columns):
+			valor = params.get('columns[%d][search][value]' % i, '').strip()
+			if valor and lookup in self.search_fields:
+				filtro &= Q(**{lookup + '__icontains': valor})
+		return filtro
+
+	def get_order(self, params):
+		indice = self.get_int(params, 'order[0][column]', 0)
+		desc = params.get('order[0][dir]') == 'desc'
+		if 0 <= indice < len(self.columns) and self.columns[indice][0]:
+			return self.columns[indice][0], desc
+		return 'pk', desc
+
+	def get_fingerprint(self, params, lookup, desc):
+		busquedas = [params.get('search[value]', '')]
+		busquedas += [params.get('columns[%d][search][value]' % i, '') for i in range(len(self.columns))]
+		return [lookup, desc, busquedas]
+
+	def get_cursor(self, cursor, start, huella):
+		if not cursor:
+			return None
+		try:
+			cursor = json.loads(cursor)
+			if cursor['start'] != start or cursor['huella'] != huella:
+				return None
+			valor, pk = cursor['ultimo']
+		except (ValueError, TypeError, KeyError):
+			return None
+		if valor is None:
+			return None
+		return valor, pk
+
+	def is_keyset(self, lookup):
+		# Las columnas que admiten NULL no tienen un orden estable entre
+		# motores de base de datos, asi que se paginan con OFFSET.
+		opts = self.model._meta
+		for nombre in lookup.split('__'):
+			try:
+				campo = opts.get_field(nombre)
+			except FieldDoesNotExist:
+				return nombre == 'pk'
+			if campo.null or campo.many_to_many or campo.one_to_many:
+				return False
+			if campo.related_model:
+				opts = campo.related_model._meta
+		return True
+
+	def render_cell(self, obj, display):
+		if callable(display):
+			valor = display(obj)
+		else:
+			valor = obj
+			for atributo in display.split('.'):
+				valor = getattr(valor, atributo, None)
+				if callable(valor):
+					valor = valor()
+		if valor is None:
+			return ''
+		return conditional_escape(localize(valor))
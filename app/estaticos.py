@@ -0,0 +1,14 @@
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+
+class EstaticosStorage(CompressedManifestStaticFilesStorage):
+	"""
+	Sin collectstatic (desarrollo y pruebas) no hay manifiesto: las URLs se
+	devuelven sin hash en lugar de fallar.
+	"""
+	manifest_strict = False
+
+	def stored_name(self, name):
+		if not self.hashed_files:
+			return name
+		return super().stored_name(name)
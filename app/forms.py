@@ -0,0 +1,22 @@
+from django import forms
+
+from . import models
+
+
+class AsistenciaClaseForm(forms.Form):
+	asignatura = forms.ModelChoiceField(queryset=models.Asignatura.objects.none())
+	fecha = forms.DateField()
+
+	def __init__(self, *args, personal=None, **kwargs):
+		super().__init__(*args, **kwargs)
+		self.fields['asignatura'].queryset = models.Asignatura.objects.filter(personal=personal)
+
+
+class ImportarForm(forms.Form):
+	TIPOS = (
+		('alumno', 'Alumnos'),
+		('personal', 'Personal'),
+		('representante', 'Representantes'),
+	)
+	tipo = forms.ChoiceField(choices=TIPOS)
+	archivo = forms.FileField()
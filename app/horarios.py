@@ -0,0 +1,84 @@
+import heapq
+from itertools import groupby
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import models, versiones
+
+
+def solapamientos(intervalos):
+	"""
+	Pares de intervalos (inicio, fin, valor) que se solapan, por barrido:
+	se recorren ordenados por inicio con un montículo de los activos
+	ordenado por fin. Cuesta O(n log n + k) con k pares encontrados.
+	"""
+	pares = []
+	activos = []
+	for orden, (inicio, fin, valor) in enumerate(sorted(intervalos, key=lambda intervalo: intervalo[:2])):
+		while activos and activos[0][0] <= inicio:
+			heapq.heappop(activos)
+		for _, _, _, otro in activos:
+			pares.append((otro, valor))
+		heapq.heappush(activos, (fin, inicio, orden, valor))
+	return pares
+
+
+def conflictos():
+	"""
+	Bloques que se solapan entre sí por profesor y día, en una consulta
+	ordenada sobre todos los horarios.
+	"""
+	horarios = models.Horario.objects.select_related('asignatura__personal').order_by(
+		'asignatura__personal_id', 'dia', 'hora_inicio', 'pk',
+	)
+	resultado = []
+	for (personal_id, dia), grupo in groupby(horarios.iterator(), key=lambda h: (h.asignatura.personal_id, h.dia)):
+		resultado.extend(solapamientos((h.hora_inicio, h.hora_fin, h) for h in grupo))
+	return resultado
+
+
+def clave_grilla(personal_id):
+	# Con las versiones en la clave, un cambio en cualquier proceso deja la
+	# grilla vieja sin uso hasta que vence.
+	return 'lca_horario:%s:%s' % (personal_id, ':'.join(versiones.get_versiones([models.Horario, models.Asignatura])))
+
+
+def construir_grilla(personal_id):
+	"""
+	Grilla semanal del profesor en una consulta: una fila por bloque
+	(inicio, fin) distinto y una celda por día con las clases del bloque.
+	"""
+	horarios = models.Horario.objects.filter(asignatura__personal_id=personal_id).select_related('asignatura').order_by(
+		'hora_inicio', 'hora_fin', 'asignatura__nombre', 'pk',
+	)
+	dias = [dia for dia, nombre in models.DIAS]
+	filas = []
+	for (inicio, fin), grupo in groupby(horarios, key=lambda h: (h.hora_inicio, h.hora_fin)):
+		celdas = [[] for dia in dias]
+		for horario in grupo:
+			celdas[dias.index(horario.dia)].append({
+				'id': horario.pk, 'asignatura_id': horario.asignatura_id, 'nombre': horario.asignatura.nombre,
+			})
+		filas.append({'inicio': inicio, 'fin': fin, 'celdas': celdas})
+	return {'dias': [nombre for dia, nombre in models.DIAS], 'filas': filas}
+
+
+def get_grilla(personal_id):
+	"""La grilla del profesor desde la caché."""
+	clave = clave_grilla(personal_id)
+	grilla = cache.get(clave)
+	if grilla is None:
+		grilla = construir_grilla(personal_id)
+		cache.set(clave, grilla, settings.CACHE_VISTAS_TIMEOUT)
+	return grilla
+
+
+def filtrar_grilla(grilla, asignatura_id):
+	"""La grilla de una asignatura a partir de la de su profesor."""
+	filas = []
+	for fila in grilla['filas']:
+		celdas = [[clase for clase in celda if clase['asignatura_id'] == asignatura_id] for celda in fila['celdas']]
+		if any(celdas):
+			filas.append(dict(fila, celdas=celdas))
+	return dict(grilla, filas=filas)
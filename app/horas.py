@@ -0,0 +1,62 @@
+import datetime
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils.dateparse import parse_date
+
+from . import models, versiones
+
+
+def clave_mes(personal_id, fecha):
+	if not isinstance(fecha, datetime.date):
+		fecha = parse_date(str(fecha))
+	return (personal_id, fecha.year, fecha.month)
+
+
+class Deltas:
+	"""Acumula cambios de días y horas por (personal, año, mes)."""
+
+	def __init__(self):
+		self.cambios = defaultdict(lambda: [0, 0])
+
+	def sumar(self, personal_id, fecha, horas):
+		cambio = self.cambios[clave_mes(personal_id, fecha)]
+		cambio[0] += 1
+		cambio[1] += horas
+
+	def restar(self, personal_id, fecha, horas):
+		cambio = self.cambios[clave_mes(personal_id, fecha)]
+		cambio[0] -= 1
+		cambio[1] -= horas
+
+	def aplicar(self):
+		cambios = {clave: valor for clave, valor in self.cambios.items() if valor != [0, 0]}
+		if not cambios:
+			return
+		with transaction.atomic():
+			existentes = {
+				(h.personal_id, h.anio, h.mes): h
+				for h in models.Horas_Personal.objects.select_for_update().filter(
+					personal_id__in={clave[0] for clave in cambios},
+					anio__in={clave[1] for clave in cambios},
+					mes__in={clave[2] for clave in cambios},
+				)
+			}
+			actualizar = []
+			crear = []
+			for clave, (dias, horas) in cambios.items():
+				if clave in existentes:
+					fila = existentes[clave]
+					fila.dias += dias
+					fila.horas += horas
+					actualizar.append(fila)
+				else:
+					personal_id, anio, mes = clave
+					crear.append(models.Horas_Personal(personal_id=personal_id, anio=anio, mes=mes, dias=dias, horas=horas))
+			# Un descuento sin acumulado previo solo ocurre cuando el Personal se
+			# elimina y el borrado en cascada ya quitó su acumulado.
+			crear = [h for h in crear if h.dias > 0]
+			models.Horas_Personal.objects.bulk_update(actualizar, ['dias', 'horas'])
+			models.Horas_Personal.objects.bulk_create(crear)
+			versiones.invalidar(models.Horas_Personal)
+		self.cambios.clear()
\ No newline at end of file
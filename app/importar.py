@@ -0,0 +1,209 @@
+import csv
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User, Group
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from . import busqueda, models, versiones
+from .procesos import Pool
+
+pool = Pool('IMPORTAR_WORKERS')
+
+
+def hashear(claves):
+	# PBKDF2 es lento a propósito: se reparte entre varios procesos.
+	bloque = max(1, len(claves) // (settings.IMPORTAR_WORKERS * 4))
+	return list(pool.get().map(make_password, claves, chunksize=bloque))
+
+
+class Importador:
+	"""
+	Importa un CSV leyéndolo fila por fila.
+
+	Cada fila se valida con full_clean; las filas con errores se saltan y
+	quedan en errores como (línea, mensaje). La lectura, la validación y el
+	hash de las claves se hacen antes de escribir: las válidas se guardan
+	después con bulk_create en lotes de tamaño lote, todas en una
+	transacción corta que no retiene la base mientras se calcula PBKDF2.
+	"""
+	model = None
+	campos = []
+	excluir = []
+	grupo = None
+
+	def __init__(self, lote=500):
+		self.tipo = self.model._meta.model_name
+		self.lote = lote
+		self.creados = 0
+		self.errores = []
+		self.vistos = set()
+		self.claves = {}
+
+	def get_grupo(self, obj):
+		return self.grupo
+
+	def get_objeto(self, fila, model, campos, prefijo=''):
+		datos = {}
+		for campo in campos:
+			valor = (fila.get(prefijo + campo) or '').strip()
+			if not valor and model._meta.get_field(campo).null:
+				valor = None
+			datos[campo] = valor
+		obj = model(**datos)
+		obj.full_clean(exclude=self.excluir, validate_unique=False)
+		return obj
+
+	def preparar(self, fila):
+		return self.get_objeto(fila, self.model, self.campos)
+
+	def get_existentes(self, cedulas):
+		return set(User.objects.filter(username__in=cedulas).values_list('username', flat=True))
+
+	def importar(self, archivo):
+		objs = self.filtrar_existentes(self.leer(archivo))
+		if not objs:
+			return
+		self.preparar_guardado(objs)
+		with transaction.atomic():
+			for i in range(0, len(objs), self.lote):
+				self.guardar(objs[i:i + self.lote])
+		self.creados = len(objs)
+
+	def leer(self, archivo):
+		lector = csv.DictReader(archivo)
+		faltan = [campo for campo in self.get_columnas() if campo not in (lector.fieldnames or [])]
+		if faltan:
+			self.errores.append((1, 'Faltan columnas: %s.' % ', '.join(faltan)))
+			return []
+		pendientes = []
+		for fila in lector:
+			try:
+				obj = self.preparar(fila)
+			except ValidationError as e:
+				self.errores.append((lector.line_num, ' '.join(e.messages)))
+				continue
+			if obj.cedula in self.vistos:
+				self.errores.append((lector.line_num, 'Cédula %s repetida en el archivo.' % obj.cedula))
+				continue
+			self.vistos.add(obj.cedula)
+			pendientes.append((lector.line_num, obj))
+		return pendientes
+
+	def get_columnas(self):
+		return self.campos
+
+	def filtrar_existentes(self, pendientes):
+		objs = []
+		for i in range(0, len(pendientes), self.lote):
+			lote = pendientes[i:i + self.lote]
+			existentes = self.get_existentes([obj.cedula for linea, obj in lote])
+			for linea, obj in lote:
+				if obj.cedula in existentes:
+					self.errores.append((linea, 'La cédula %s ya está registrada.' % obj.cedula))
+				else:
+					objs.append(obj)
+		return objs
+
+	def preparar_guardado(self, objs):
+		"""Trabajo lento que no escribe en la base: el hash de las claves."""
+		cedulas = [obj.cedula for obj in objs]
+		self.claves = dict(zip(cedulas, hashear(cedulas)))
+
+	def guardar(self, objs):
+		self.antes_de_guardar(objs)
+		self.model.objects.bulk_create(objs)
+		# bulk_create no emite post_save: se indexan aquí para la búsqueda.
+		guardados = self.model.objects.filter(cedula__in=[obj.cedula for obj in objs]).select_related(*busqueda.FUENTES[self.tipo][1])
+		busqueda.indexar(self.tipo, guardados)
+		versiones.invalidar(self.model)
+
+	def antes_de_guardar(self, objs):
+		User.objects.bulk_create([
+			User(username=obj.cedula, email=obj.correo or '', password=self.claves[obj.cedula])
+			for obj in objs
+		])
+		# En SQLite bulk_create no devuelve los id, se buscan de una vez.
+		usuarios = dict(User.objects.filter(username__in=[obj.cedula for obj in objs]).values_list('username', 'id'))
+		grupos = dict(Group.objects.values_list('name', 'id'))
+		UsuarioGrupo = User.groups.through
+		UsuarioGrupo.objects.bulk_create([
+			UsuarioGrupo(user_id=usuarios[obj.cedula], group_id=grupos[self.get_grupo(obj)])
+			for obj in objs
+		])
+		for obj in objs:
+			obj.usuario_id = usuarios[obj.cedula]
+
+
+class ImportarPersonal(Importador):
+	model = models.Personal
+	campos = ['cedula', 'nombre', 'telefono', 'direccion', 'correo', 'cargo', 'horas', 'salario', 'fecha_nacimiento', 'fecha_inicio']
+	excluir = ['imagen', 'usuario']
+
+	def get_grupo(self, obj):
+		return obj.get_cargo_display().casefold()
+
+	def preparar(self, fila):
+		obj = super().preparar(fila)
+		if obj.cargo == 'P' and obj.horas is None:
+			raise ValidationError('Los profesores deben tener horas asignadas.')
+		return obj
+
+
+class ImportarAlumno(Importador):
+	"""El representante se busca por cédula y se crea si no existe."""
+	model = models.Alumno
+	campos = ['cedula', 'nombre', 'telefono', 'direccion', 'correo', 'fecha_nacimiento']
+	campos_representante = ['cedula', 'nombre', 'telefono', 'direccion']
+	excluir = ['imagen', 'representante', 'usuario']
+	grupo = 'alumno'
+
+	def get_columnas(self):
+		return self.campos + ['representante_' + campo for campo in self.campos_representante]
+
+	def preparar(self, fila):
+		obj = super().preparar(fila)
+		obj.representante = self.get_objeto(fila, models.Representante, self.campos_representante, 'representante_')
+		return obj
+
+	def get_representantes(self, cedulas):
+		representantes = {}
+		for cedula, id in models.Representante.objects.filter(cedula__in=cedulas).order_by('id').values_list('cedula', 'id'):
+			representantes.setdefault(cedula, id)
+		return representantes
+
+	def antes_de_guardar(self, objs):
+		nuevos = {}
+		representantes = self.get_representantes({obj.representante.cedula for obj in objs})
+		for obj in objs:
+			if obj.representante.cedula not in representantes:
+				nuevos.setdefault(obj.representante.cedula, obj.representante)
+		if nuevos:
+			models.Representante.objects.bulk_create(nuevos.values())
+			versiones.invalidar(models.Representante)
+			representantes = self.get_representantes({obj.representante.cedula for obj in objs})
+		for obj in objs:
+			obj.representante_id = representantes[obj.representante.cedula]
+		super().antes_de_guardar(objs)
+
+
+class ImportarRepresentante(Importador):
+	model = models.Representante
+	campos = ['cedula', 'nombre', 'telefono', 'direccion']
+
+	def get_existentes(self, cedulas):
+		return set(models.Representante.objects.filter(cedula__in=cedulas).values_list('cedula', flat=True))
+
+	def preparar_guardado(self, objs):
+		pass
+
+	def antes_de_guardar(self, objs):
+		pass
+
+
+IMPORTADORES = {
+	'alumno': ImportarAlumno,
+	'personal': ImportarPersonal,
+	'representante': ImportarRepresentante,
+}
@@ -0,0 +1,132 @@
+import datetime
+from collections import defaultdict
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from . import models, versiones
+
+# Cambios de status permitidos desde cada status.
+TRANSICIONES = {
+	'A': ('D',),
+	'D': ('A',),
+}
+
+
+class Deltas:
+	"""Acumula cambios de bienes, bienes dañados y reportes abiertos por departamento."""
+
+	def __init__(self):
+		self.cambios = defaultdict(lambda: [0, 0, 0])
+
+	def bien(self, departamento_id, status, signo=1):
+		cambio = self.cambios[departamento_id]
+		cambio[0] += signo
+		if status == 'D':
+			cambio[1] += signo
+
+	def reporte(self, departamento_id, signo=1):
+		self.cambios[departamento_id][2] += signo
+
+	def aplicar(self):
+		cambios = {clave: valor for clave, valor in self.cambios.items() if clave is not None and valor != [0, 0, 0]}
+		if not cambios:
+			return
+		with transaction.atomic():
+			existentes = {
+				fila.departamento_id: fila
+				for fila in models.Inventario_Departamento.objects.select_for_update().filter(departamento_id__in=cambios)
+			}
+			actualizar = []
+			crear = []
+			for departamento_id, (bienes, danados, reportes) in cambios.items():
+				fila = existentes.get(departamento_id)
+				if fila is not None:
+					fila.bienes += bienes
+					fila.danados += danados
+					fila.reportes_abiertos += reportes
+					actualizar.append(fila)
+				elif bienes > 0 or reportes > 0:
+					# Igual que en horas.Deltas: un descuento sin fila previa
+					# solo ocurre si el departamento ya se borró en cascada.
+					crear.append(models.Inventario_Departamento(
+						departamento_id=departamento_id, bienes=max(bienes, 0),
+						danados=max(danados, 0), reportes_abiertos=max(reportes, 0),
+					))
+			models.Inventario_Departamento.objects.bulk_update(actualizar, ['bienes', 'danados', 'reportes_abiertos'])
+			models.Inventario_Departamento.objects.bulk_create(crear)
+			vacias = [fila.pk for fila in actualizar if fila.bienes <= 0 and fila.reportes_abiertos <= 0]
+			if vacias:
+				models.Inventario_Departamento.objects.filter(pk__in=vacias).delete()
+			versiones.invalidar(models.Inventario_Departamento)
+		self.cambios.clear()
+
+
+def get_departamento_id(bien_id):
+	return models.Bien.objects.filter(pk=bien_id).values_list('departamento_id', flat=True).first()
+
+
+def cambiar_status(bien_id, status, reporte=None):
+	"""
+	Cambia el status de un bien con su fila bloqueada. Las señales anotan
+	el cambio en Historial_Bien y actualizan el inventario del departamento
+	dentro de la misma transacción.
+	"""
+	with transaction.atomic():
+		bien = models.Bien.objects.select_for_update().get(pk=bien_id)
+		if bien.status == status:
+			return bien
+		if status not in TRANSICIONES.get(bien.status, ()):
+			raise ValidationError('Un bien %s no puede pasar a %s.' % (bien.get_status_display().lower(), dict(models.STATUS)[status].lower()))
+		bien.status = status
+		bien._reporte = reporte
+		bien.save(update_fields=['status'])
+	return bien
+
+
+def resolver_reporte(reporte):
+	"""
+	Guarda un reporte editado. Al aceptarlo el bien pasa a dañado en la
+	misma transacción, o no se guarda ninguno de los dos.
+	"""
+	with transaction.atomic():
+		if reporte.status != 'E':
+			reporte.fecha_fin = timezone.localdate()
+		reporte.save()
+		if reporte.status == 'A':
+			cambiar_status(reporte.bien_id, 'D', reporte)
+	return reporte
+
+
+def get_historial_inicial(bienes):
+	"""Una fila de historial por bien con su status al registrarlo."""
+	return [
+		models.Historial_Bien(
+			bien_id=bien.pk, status=bien.status,
+			fecha=datetime.datetime.combine(bien.fecha, datetime.time(), datetime.timezone.utc),
+		)
+		for bien in bienes
+	]
+
+
+def recalcular():
+	"""Vuelve a generar el inventario por departamento desde Bien y Reporte."""
+	filas = defaultdict(lambda: [0, 0, 0])
+	with transaction.atomic():
+		models.Inventario_Departamento.objects.all().delete()
+		bienes = models.Bien.objects.values_list('departamento_id').annotate(
+			bienes=Count('id'), danados=Count('id', filter=Q(status='D')),
+		).order_by()
+		for departamento_id, cantidad, danados in bienes:
+			filas[departamento_id][0] = cantidad
+			filas[departamento_id][1] = danados
+		abiertos = models.Reporte.objects.filter(status='E').values_list('bien__departamento_id').annotate(n=Count('id')).order_by()
+		for departamento_id, cantidad in abiertos:
+			filas[departamento_id][2] = cantidad
+		models.Inventario_Departamento.objects.bulk_create([
+			models.Inventario_Departamento(departamento_id=departamento_id, bienes=bienes, danados=danados, reportes_abiertos=reportes)
+			for departamento_id, (bienes, danados, reportes) in filas.items()
+		], batch_size=1000)
+		versiones.invalidar(models.Inventario_Departamento)
@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app import boletines, models
+
+
+class Command(BaseCommand):
+	help = (
+		'Genera en paralelo los boletines en PDF de todos los alumnos inscritos en las '
+		'asignaturas indicadas (o en todas) y los guarda en un ZIP o en un único PDF.'
+	)
+
+	def add_arguments(self, parser):
+		parser.add_argument('--asignatura', type=int, action='append', help='Id de una asignatura; se puede repetir.')
+		parser.add_argument('--salida', help='Archivo de destino (por defecto boletines.zip o boletines.pdf).')
+		parser.add_argument('--unir', action='store_true', help='Une todos los boletines en un solo PDF en lugar de un ZIP.')
+
+	def handle(self, *args, **options):
+		asignaturas = models.Asignatura.objects.all()
+		if options['asignatura']:
+			asignaturas = asignaturas.filter(pk__in=options['asignatura'])
+			if asignaturas.count() != len(set(options['asignatura'])):
+				raise CommandError('Alguna de las asignaturas no existe.')
+		salida = options['salida'] or ('boletines.pdf' if options['unir'] else 'boletines.zip')
+		inicio = time.monotonic()
+
+		def progreso(hechos, total):
+			duracion = time.monotonic() - inicio
+			restante = duracion / hechos * (total - hechos)
+			self.stdout.write('%d/%d boletines (%d %%), %.1f/s, faltan %.0f s' % (
+				hechos, total, hechos * 100 // total, hechos / duracion, restante,
+			))
+
+		generados, errores = boletines.generar(asignaturas, salida, options['unir'], progreso)
+		for cedula in errores:
+			self.stderr.write('No se pudo generar el boletín de %s.' % cedula)
+		self.stdout.write(self.style.SUCCESS('%d boletines guardados en %s en %.1f s.' % (generados, salida, time.monotonic() - inicio)))
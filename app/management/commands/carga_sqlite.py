@@ -0,0 +1,94 @@
+import datetime
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections, transaction
+from django.test.utils import override_settings
+
+from app import models
+
+
+class Command(BaseCommand):
+	help = (
+		'Prueba de carga de escrituras concurrentes sobre una base SQLite temporal, '
+		'primero con la configuración por defecto de Django y luego con la de settings.'
+	)
+
+	def add_arguments(self, parser):
+		parser.add_argument('--hilos', type=int, default=8)
+		parser.add_argument('--envios', type=int, default=40, help='Asistencias de clase guardadas por cada hilo.')
+		parser.add_argument('--alumnos', type=int, default=30)
+
+	def preparar(self, alias, ruta, ajustes):
+		connections.databases[alias] = dict(connections.databases['default'], NAME=str(ruta), **ajustes)
+		call_command('migrate', database=alias, verbosity=0)
+		usuario = User.objects.db_manager(alias).create_user('carga')
+		fecha = datetime.date(2000, 1, 1)
+		personal = models.Personal.objects.using(alias).create(
+			cedula='carga', nombre='Carga', telefono='0', direccion='-', cargo='P', horas=1,
+			salario=0, fecha_nacimiento=fecha, fecha_inicio=fecha, usuario=usuario,
+		)
+		asignatura = models.Asignatura.objects.using(alias).create(nombre='Carga', personal=personal)
+		representante = models.Representante.objects.using(alias).create(cedula='0', nombre='-', telefono='0', direccion='-')
+		inscripciones = []
+		for i in range(self.alumnos):
+			alumno = models.Alumno.objects.using(alias).create(
+				cedula=str(i), nombre='Alumno', telefono='0', direccion='-', fecha_nacimiento=fecha,
+				representante=representante, usuario=usuario,
+			)
+			inscripciones.append(models.Asignatura_Alumno.objects.using(alias).create(asignatura=asignatura, alumno=alumno).id)
+		connections[alias].close()
+		return inscripciones
+
+	def enviar(self, alias, hilo, inscripciones, resultados):
+		# Cada envío imita a AsistenciaClase: borra y vuelve a crear la lista
+		# del día en una transacción, y al final se cierra la conexión como
+		# lo hace Django al terminar cada petición.
+		conexion = connections[alias]
+		for i in range(self.envios):
+			fecha = datetime.date(2000, 1, 1) + datetime.timedelta(days=hilo * self.envios + i)
+			try:
+				with transaction.atomic(using=alias):
+					models.Asistencia_Alumno.objects.using(alias).filter(fecha=fecha).delete()
+					models.Asistencia_Alumno.objects.using(alias).bulk_create([
+						models.Asistencia_Alumno(asignatura_alumno_id=inscripcion, fecha=fecha) for inscripcion in inscripciones
+					])
+				resultados[hilo][0] += 1
+			except OperationalError:
+				resultados[hilo][1] += 1
+			conexion.close_if_unusable_or_obsolete()
+		conexion.close()
+
+	def medir(self, nombre, alias, ruta, ajustes, pragmas):
+		with override_settings(SQLITE_PRAGMAS=pragmas):
+			inscripciones = self.preparar(alias, ruta, ajustes)
+			resultados = [[0, 0] for i in range(self.hilos)]
+			hilos = [threading.Thread(target=self.enviar, args=(alias, i, inscripciones, resultados)) for i in range(self.hilos)]
+			inicio = time.perf_counter()
+			for hilo in hilos:
+				hilo.start()
+			for hilo in hilos:
+				hilo.join()
+			duracion = time.perf_counter() - inicio
+		guardados = sum(r[0] for r in resultados)
+		fallidos = sum(r[1] for r in resultados)
+		self.stdout.write('%-14s %6d guardados %6d bloqueados %8.2f s %8.1f envíos/s' % (nombre, guardados, fallidos, duracion, guardados / duracion))
+
+	def handle(self, *args, **options):
+		self.hilos = options['hilos']
+		self.envios = options['envios']
+		self.alumnos = options['alumnos']
+		por_defecto = {'CONN_MAX_AGE': 0, 'OPTIONS': {}}
+		configurada = {
+			'CONN_MAX_AGE': settings.DATABASES['default'].get('CONN_MAX_AGE', 0),
+			'OPTIONS': settings.DATABASES['default'].get('OPTIONS', {}),
+		}
+		with tempfile.TemporaryDirectory() as directorio:
+			self.medir('Por defecto', 'carga_defecto', Path(directorio) / 'defecto.sqlite3', por_defecto, {})
+			self.medir('Configurada', 'carga_configurada', Path(directorio) / 'configurada.sqlite3', configurada, settings.SQLITE_PRAGMAS)
@@ -0,0 +1,88 @@
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from app import busqueda
+
+
+def ordenar_modelos():
+	"""Modelos con tabla propia, cada uno después de los que referencia."""
+	ordenados = []
+	vistos = set()
+
+	def visitar(modelo):
+		if modelo in vistos:
+			return
+		vistos.add(modelo)
+		for campo in modelo._meta.concrete_fields:
+			if campo.related_model and campo.related_model is not modelo:
+				visitar(campo.related_model._meta.concrete_model)
+		ordenados.append(modelo)
+
+	for modelo in apps.get_models(include_auto_created=True):
+		if modelo._meta.managed and not modelo._meta.proxy:
+			visitar(modelo)
+	return ordenados
+
+
+class Command(BaseCommand):
+	help = (
+		'Copia todos los datos de una base SQLite a la base configurada en DATABASES '
+		'(por ejemplo PostgreSQL), en lotes y respetando las claves foráneas. '
+		'Los datos que tenga la base de destino se reemplazan.'
+	)
+
+	def add_arguments(self, parser):
+		parser.add_argument('--origen', default=str(settings.BASE_DIR / 'db.sqlite3'))
+		parser.add_argument('--lote', type=int, default=1000)
+
+	def handle(self, *args, **options):
+		destino = DEFAULT_DB_ALIAS
+		if str(connections[destino].settings_dict['NAME']) == options['origen']:
+			raise CommandError('La base de origen y la de destino son la misma.')
+		connections.databases['origen'] = {
+			'ENGINE': 'django.db.backends.sqlite3',
+			'NAME': options['origen'],
+		}
+		call_command('migrate', database=destino, verbosity=0)
+
+		tablas_origen = set(connections['origen'].introspection.table_names())
+		modelos = [modelo for modelo in ordenar_modelos() if modelo._meta.db_table in tablas_origen]
+		conexion = connections[destino]
+		inicio = time.monotonic()
+		with transaction.atomic(using=destino):
+			# migrate ya creó tipos de contenido y permisos: se reemplazan por
+			# los del origen para conservar los mismos id.
+			conexion.ops.execute_sql_flush(conexion.ops.sql_flush(
+				no_style(), [modelo._meta.db_table for modelo in modelos], allow_cascade=True,
+			))
+			for modelo in modelos:
+				copiados = self.copiar(modelo, destino, options['lote'])
+				self.stdout.write('%s: %d' % (modelo._meta.label, copiados))
+			with conexion.cursor() as cursor:
+				for sql in conexion.ops.sequence_reset_sql(no_style(), modelos):
+					cursor.execute(sql)
+			busqueda.reconstruir(destino)
+		self.stdout.write(self.style.SUCCESS('Copia terminada en %.1f s.' % (time.monotonic() - inicio)))
+
+	def copiar(self, modelo, destino, lote):
+		copiados = 0
+		pendientes = []
+		for obj in modelo._base_manager.using('origen').order_by('pk').iterator(chunk_size=lote):
+			pendientes.append(obj)
+			if len(pendientes) >= lote:
+				modelo._base_manager.using(destino).bulk_create(pendientes)
+				copiados += len(pendientes)
+				pendientes = []
+		if pendientes:
+			modelo._base_manager.using(destino).bulk_create(pendientes)
+			copiados += len(pendientes)
+		origen = modelo._base_manager.using('origen').count()
+		if copiados != origen:
+			raise CommandError('%s: se copiaron %d de %d filas.' % (modelo._meta.label, copiados, origen))
+		return copiados
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from django.core.files.storage import default_storage
+
+from app import miniaturas, models
+
+
+class Command(BaseCommand):
+	help = 'Genera las miniaturas que falten de las fotos de perfil.'
+
+	def add_arguments(self, parser):
+		parser.add_argument('--todas', action='store_true', help='Vuelve a generar también las existentes.')
+
+	def handle(self, *args, **options):
+		nombres = set()
+		for modelo in (models.Personal, models.Alumno):
+			nombres.update(modelo.objects.exclude(imagen='').exclude(imagen=None).values_list('imagen', flat=True))
+		nombres = [nombre for nombre in nombres if default_storage.exists(nombre)]
+		if not options['todas']:
+			nombres = [nombre for nombre in nombres if not miniaturas.existe(nombre)]
+		futuros = [miniaturas.pool.submit(miniaturas.generar, *miniaturas.get_argumentos(nombre)) for nombre in nombres]
+		generadas = sum(1 for futuro in futuros if futuro.result())
+		self.stdout.write(self.style.SUCCESS('%d de %d imágenes procesadas.' % (generadas, len(nombres))))
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from app.importar import IMPORTADORES
+
+
+class Command(BaseCommand):
+	help = 'Importa alumnos, personal o representantes desde un archivo CSV.'
+
+	def add_arguments(self, parser):
+		parser.add_argument('tipo', choices=sorted(IMPORTADORES))
+		parser.add_argument('archivo')
+		parser.add_argument('--lote', type=int, default=500)
+
+	def handle(self, *args, **options):
+		importador = IMPORTADORES[options['tipo']](lote=options['lote'])
+		inicio = time.monotonic()
+		with open(options['archivo'], encoding='utf-8-sig', newline='') as archivo:
+			importador.importar(archivo)
+		for linea, mensaje in importador.errores:
+			self.stderr.write('Línea %s: %s' % (linea, mensaje))
+		self.stdout.write(self.style.SUCCESS(
+			'%d registros importados, %d filas con errores en %.1f s.' % (importador.creados, len(importador.errores), time.monotonic() - inicio)
+		))
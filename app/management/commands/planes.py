@@ -0,0 +1,43 @@
+import datetime
+import time
+
+from django.core.management.base import BaseCommand
+
+from app import models
+
+
+class Command(BaseCommand):
+	help = 'Muestra el plan y el tiempo de las consultas más frecuentes.'
+
+	def add_arguments(self, parser):
+		parser.add_argument('--repeticiones', type=int, default=200)
+
+	def get_consultas(self):
+		hoy = datetime.date.today()
+		personal = models.Personal.objects.values_list('id', 'usuario_id', 'cedula').first() or (0, 0, '')
+		alumno = models.Alumno.objects.values_list('usuario_id', 'cedula').first() or (0, '')
+		inscripcion = models.Asignatura_Alumno.objects.values_list('id', flat=True).first() or 0
+		return [
+			('Personal por usuario', models.Personal.objects.filter(usuario_id=personal[1])),
+			('Personal por cédula', models.Personal.objects.filter(cedula=personal[2])),
+			('Alumno por usuario', models.Alumno.objects.filter(usuario_id=alumno[0])),
+			('Alumno por cédula', models.Alumno.objects.filter(cedula=alumno[1])),
+			('Representante por cédula', models.Representante.objects.filter(cedula=alumno[1])),
+			('Asistencia del personal en la semana', models.Asistencia_Personal.objects.filter(fecha__range=(hoy - datetime.timedelta(days=7), hoy))),
+			('Asistencia de un empleado en el mes', models.Asistencia_Personal.objects.filter(personal_id=personal[0], fecha__year=hoy.year, fecha__month=hoy.month)),
+			('Asistencia de un alumno en el día', models.Asistencia_Alumno.objects.filter(asignatura_alumno_id=inscripcion, fecha=hoy)),
+			('Asistencia de alumnos en el día', models.Asistencia_Alumno.objects.filter(fecha=hoy)),
+			('Permisos vigentes', models.Permiso.objects.filter(fecha_inicio__lte=hoy, fecha_fin__gte=hoy)),
+			('Permisos en espera', models.Permiso.objects.filter(status='E')),
+			('Reportes en espera', models.Reporte.objects.filter(status='E')),
+		]
+
+	def handle(self, *args, **options):
+		for nombre, consulta in self.get_consultas():
+			inicio = time.perf_counter()
+			for i in range(options['repeticiones']):
+				list(consulta.all())
+			promedio = (time.perf_counter() - inicio) / options['repeticiones'] * 1000
+			self.stdout.write(self.style.MIGRATE_HEADING('%s (%.3f ms)' % (nombre, promedio)))
+			self.stdout.write(consulta.explain())
+			self.stdout.write('')
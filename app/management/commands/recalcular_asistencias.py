@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from app import asistencias
+
+
+class Command(BaseCommand):
+	help = 'Vuelve a calcular los resúmenes diarios y mensuales de asistencia de los alumnos.'
+
+	def handle(self, *args, **options):
+		asistencias.recalcular()
+		self.stdout.write(self.style.SUCCESS('Resúmenes de asistencia recalculados.'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from app import inventario
+
+
+class Command(BaseCommand):
+	help = 'Vuelve a calcular los bienes, bienes dañados y reportes abiertos de cada departamento.'
+
+	def handle(self, *args, **options):
+		inventario.recalcular()
+		self.stdout.write(self.style.SUCCESS('Inventario recalculado.'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from app import notas
+
+
+class Command(BaseCommand):
+	help = 'Vuelve a calcular el resumen de promedios por alumno, asignatura y lapso.'
+
+	def handle(self, *args, **options):
+		notas.recalcular()
+		self.stdout.write(self.style.SUCCESS('Promedios recalculados.'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from app import busqueda
+
+
+class Command(BaseCommand):
+	help = 'Vuelve a generar el índice de la búsqueda global.'
+
+	def handle(self, *args, **options):
+		busqueda.reconstruir()
+		self.stdout.write(self.style.SUCCESS('Índice de búsqueda reconstruido.'))
@@ -0,0 +1,84 @@
+import json
+import os
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import override_settings
+
+from app import models, rendimiento, sinteticos
+
+
+class Command(BaseCommand):
+	help = (
+		'Crea una base de prueba, la puebla con datos sintéticos de un año escolar y mide '
+		'latencia (p50/p95) y rendimiento de las vistas de lista, detalle, creación y '
+		'exportación. El informe se guarda en JSON para compararlo entre versiones.'
+	)
+
+	def add_arguments(self, parser):
+		parser.add_argument('--escala', type=float, default=1.0, help='Multiplica los volúmenes de app/sinteticos.py.')
+		parser.add_argument('--repeticiones', type=int, default=20)
+		parser.add_argument('--tipo', action='append', choices=rendimiento.TIPOS, help='Mide solo estos tipos de vista.')
+		parser.add_argument('--salida', default='rendimiento.json')
+		parser.add_argument('--comparar', help='Informe anterior contra el que se comparan los p95.')
+		parser.add_argument('--umbral', type=float, default=10, help='Cambio mínimo en %% que se muestra al comparar.')
+		parser.add_argument('--conservar', action='store_true', help='Conserva la base de prueba y sus datos para la próxima corrida.')
+
+	def handle(self, *args, **options):
+		if connection.vendor == 'sqlite':
+			# En archivo y no en memoria, para medir como en producción y
+			# poder conservarla entre corridas.
+			connection.settings_dict['TEST']['NAME'] = str(settings.BASE_DIR / 'rendimiento.sqlite3')
+		nombre_original = connection.settings_dict['NAME']
+		connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options['conservar'])
+		try:
+			# La caché va aparte: los datos sintéticos no deben llegar a la del servidor.
+			with tempfile.TemporaryDirectory() as directorio, override_settings(
+				DEBUG=False, ALLOWED_HOSTS=['testserver'], EXPORTACIONES_DIR=directorio, METRICAS_ESTRICTO=False,
+				CACHES={'default': dict(settings.CACHES['default'], LOCATION=os.path.join(directorio, 'cache'))},
+			):
+				generacion = self.poblar(options['escala'])
+				resultados = self.medir(options['tipo'] or rendimiento.TIPOS, options['repeticiones'])
+				actual = rendimiento.informe(
+					resultados, rendimiento.get_volumenes(),
+					escala=options['escala'], repeticiones=options['repeticiones'], generacion_s=generacion,
+				)
+		finally:
+			connection.creation.destroy_test_db(nombre_original, verbosity=0, keepdb=options['conservar'])
+
+		with open(options['salida'], 'w') as archivo:
+			json.dump(actual, archivo, indent=2, sort_keys=True)
+		self.stdout.write(self.style.SUCCESS('Informe guardado en %s.' % options['salida']))
+		if options['comparar']:
+			with open(options['comparar']) as archivo:
+				anterior = json.load(archivo)
+			filas = rendimiento.comparar(anterior, actual, options['umbral'])
+			for nombre, antes, despues, cambio in filas:
+				estilo = self.style.ERROR if cambio > 0 else self.style.SUCCESS
+				self.stdout.write(estilo('%-40s %9.2f ms -> %9.2f ms %+7.1f %%' % (nombre, antes, despues, cambio)))
+			if not filas:
+				self.stdout.write('Ningún p95 cambió más de %g %%.' % options['umbral'])
+
+	def poblar(self, escala):
+		if rendimiento.primero(models.Alumno) is not None:
+			self.stdout.write('La base de prueba ya tiene datos, no se generan.')
+			return None
+		inicio = time.perf_counter()
+		creados = sinteticos.generar(escala)
+		duracion = time.perf_counter() - inicio
+		for etiqueta, cantidad in sorted(creados.items()):
+			self.stdout.write('%-35s %9d' % (etiqueta, cantidad))
+		self.stdout.write('Datos generados en %.1f s.' % duracion)
+		return round(duracion, 1)
+
+	def medir(self, tipos, repeticiones):
+		def progreso(nombre, resultado):
+			estilo = self.style.ERROR if resultado['estado'] >= 400 else str
+			self.stdout.write(estilo('%-40s %3d  p50 %8.2f ms  p95 %8.2f ms  %7.1f req/s  %5.1f consultas' % (
+				nombre, resultado['estado'], resultado['p50_ms'], resultado['p95_ms'], resultado['rps'], resultado['consultas'],
+			)))
+
+		return rendimiento.ejecutar(rendimiento.get_escenarios(tipos), repeticiones, progreso)
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from app import horarios
+
+
+class Command(BaseCommand):
+	help = 'Busca los bloques de horario que se solapan para un mismo profesor.'
+
+	def add_arguments(self, parser):
+		parser.add_argument('--estricto', action='store_true', help='Termina con error si hay conflictos.')
+
+	def handle(self, *args, **options):
+		conflictos = horarios.conflictos()
+		for primero, segundo in conflictos:
+			self.stdout.write('%s, %s: %s (%s - %s) con %s (%s - %s)' % (
+				primero.asignatura.personal.nombre, primero.get_dia_display(),
+				primero.asignatura.nombre, primero.hora_inicio.strftime('%H:%M'), primero.hora_fin.strftime('%H:%M'),
+				segundo.asignatura.nombre, segundo.hora_inicio.strftime('%H:%M'), segundo.hora_fin.strftime('%H:%M'),
+			))
+		if not conflictos:
+			self.stdout.write(self.style.SUCCESS('No hay conflictos de horario.'))
+		elif options['estricto']:
+			raise CommandError('%d conflictos de horario.' % len(conflictos))
+		else:
+			self.stdout.write(self.style.WARNING('%d conflictos de horario.' % len(conflictos)))
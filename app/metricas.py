@@ -0,0 +1,158 @@
+import logging
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+
+logger = logging.getLogger(__name__)
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class PresupuestoExcedido(AssertionError):
+	pass
+
+
+def presupuesto(consultas):
+	"""Declara el máximo de consultas de una vista basada en función."""
+	def decorador(vista):
+		vista.presupuesto_consultas = consultas
+		return vista
+	return decorador
+
+
+class Medicion:
+	"""execute_wrapper que cuenta las consultas de una petición y su duración."""
+
+	def __init__(self):
+		self.vista = 'sin_resolver'
+		self.presupuesto = None
+		self.consultas = 0
+		self.db = 0.0
+		self.fin_vista = None
+		self.plantillas = 0.0
+
+	def __call__(self, execute, sql, params, many, context):
+		inicio = time.perf_counter()
+		try:
+			return execute(sql, params, many, context)
+		finally:
+			self.db += time.perf_counter() - inicio
+			self.consultas += 1
+
+	def renderizada(self, response):
+		self.plantillas = time.perf_counter() - self.fin_vista
+
+
+class Registro:
+	"""Acumula las mediciones por vista en memoria del proceso."""
+
+	def __init__(self):
+		self.lock = threading.Lock()
+		self.vistas = {}
+
+	def agregar(self, medicion, metodo, estado, total):
+		with self.lock:
+			vista = self.vistas.setdefault(medicion.vista, {
+				'peticiones': {}, 'buckets': [0] * len(BUCKETS), 'total': 0.0,
+				'consultas': 0, 'db': 0.0, 'plantillas': 0.0,
+			})
+			clave = (metodo, estado)
+			vista['peticiones'][clave] = vista['peticiones'].get(clave, 0) + 1
+			for i, limite in enumerate(BUCKETS):
+				if total <= limite:
+					vista['buckets'][i] += 1
+			vista['total'] += total
+			vista['consultas'] += medicion.consultas
+			vista['db'] += medicion.db
+			vista['plantillas'] += medicion.plantillas
+
+	def exportar(self):
+		lineas = [
+			'# TYPE lca_peticiones_total counter',
+			'# TYPE lca_latencia_segundos histogram',
+			'# TYPE lca_consultas_total counter',
+			'# TYPE lca_db_segundos_total counter',
+			'# TYPE lca_plantillas_segundos_total counter',
+		]
+		with self.lock:
+			for nombre, vista in sorted(self.vistas.items()):
+				etiqueta = 'vista="%s"' % nombre.replace('\\', '\\\\').replace('"', '\\"')
+				cantidad = 0
+				for (metodo, estado), n in sorted(vista['peticiones'].items()):
+					lineas.append('lca_peticiones_total{%s,metodo="%s",estado="%s"} %d' % (etiqueta, metodo, estado, n))
+					cantidad += n
+				for limite, n in zip(BUCKETS, vista['buckets']):
+					lineas.append('lca_latencia_segundos_bucket{%s,le="%s"} %d' % (etiqueta, limite, n))
+				lineas.append('lca_latencia_segundos_bucket{%s,le="+Inf"} %d' % (etiqueta, cantidad))
+				lineas.append('lca_latencia_segundos_sum{%s} %f' % (etiqueta, vista['total']))
+				lineas.append('lca_latencia_segundos_count{%s} %d' % (etiqueta, cantidad))
+				lineas.append('lca_consultas_total{%s} %d' % (etiqueta, vista['consultas']))
+				lineas.append('lca_db_segundos_total{%s} %f' % (etiqueta, vista['db']))
+				lineas.append('lca_plantillas_segundos_total{%s} %f' % (etiqueta, vista['plantillas']))
+		return '\n'.join(lineas) + '\n'
+
+
+registro = Registro()
+
+
+class MetricasMiddleware:
+	"""
+	Mide cada petición: consultas, tiempo en la base de datos, tiempo de
+	render de las plantillas (TemplateResponse) y latencia total. Los
+	resultados se agregan a registro, que expone la vista metricas, y se
+	envían en el encabezado Server-Timing.
+
+	Las vistas pueden declarar presupuesto_consultas; si se excede se
+	registra una advertencia, o se lanza PresupuestoExcedido cuando
+	METRICAS_ESTRICTO está activo (en las pruebas).
+	"""
+
+	def __init__(self, get_response):
+		self.get_response = get_response
+
+	def __call__(self, request):
+		medicion = Medicion()
+		request._medicion = medicion
+		inicio = time.perf_counter()
+		with ExitStack() as pila:
+			for conexion in connections.all():
+				pila.enter_context(conexion.execute_wrapper(medicion))
+			response = self.get_response(request)
+		total = time.perf_counter() - inicio
+		registro.agregar(medicion, request.method, response.status_code, total)
+		if settings.METRICAS_SERVER_TIMING:
+			response['Server-Timing'] = ', '.join([
+				'db;dur=%.1f;desc="%d consultas"' % (medicion.db * 1000, medicion.consultas),
+				'tpl;dur=%.1f' % (medicion.plantillas * 1000),
+				'total;dur=%.1f' % (total * 1000),
+			])
+		if medicion.presupuesto is not None and medicion.consultas > medicion.presupuesto:
+			mensaje = '%s hizo %d consultas (presupuesto %d).' % (medicion.vista, medicion.consultas, medicion.presupuesto)
+			if settings.METRICAS_ESTRICTO:
+				raise PresupuestoExcedido(mensaje)
+			logger.warning(mensaje)
+		return response
+
+	def process_view(self, request, view_func, view_args, view_kwargs):
+		medicion = request._medicion
+		medicion.vista = request.resolver_match.view_name or request.resolver_match._func_path
+		medicion.presupuesto = getattr(getattr(view_func, 'view_class', view_func), 'presupuesto_consultas', None)
+
+	def process_template_response(self, request, response):
+		medicion = request._medicion
+		medicion.fin_vista = time.perf_counter()
+		response.add_post_render_callback(medicion.renderizada)
+		return response
+
+
+def metricas(request):
+	"""Métricas en el formato de texto de Prometheus."""
+	token = settings.METRICAS_TOKEN
+	autorizado = token and request.headers.get('Authorization') == 'Bearer %s' % token
+	if not autorizado and getattr(request, 'lca_group', None) != 'secretario':
+		return HttpResponseForbidden()
+	return HttpResponse(registro.exportar(), content_type='text/plain; version=0.0.4; charset=utf-8')
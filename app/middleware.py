@@ -0,0 +1,74 @@
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.functional import SimpleLazyObject
+
+from . import models
+
+SESION_PERFIL = 'lca_perfil'
+
+
+def clave_version(usuario_id):
+	return 'lca_perfil:%s' % usuario_id
+
+
+def get_version(usuario_id):
+	clave = clave_version(usuario_id)
+	version = cache.get(clave)
+	if version is None:
+		# Vence para que un proceso que no vio la invalidación no siga
+		# autorizando con un grupo viejo.
+		nueva = uuid.uuid4().hex
+		cache.add(clave, nueva, settings.PERFIL_VERSION_TIMEOUT)
+		version = cache.get(clave) or nueva
+	return version
+
+
+def invalidar_perfil(usuario_id):
+	cache.delete(clave_version(usuario_id))
+
+
+def resolver_perfil(usuario):
+	grupo = usuario.groups.values_list('name', flat=True).first()
+	if grupo == 'alumno':
+		modelo = 'alumno'
+		pk = models.Alumno.objects.filter(usuario_id=usuario.id).values_list('id', flat=True).first()
+	else:
+		modelo = 'personal'
+		pk = models.Personal.objects.filter(usuario_id=usuario.id).values_list('id', flat=True).first()
+	return {'grupo': grupo, 'modelo': modelo, 'id': pk}
+
+
+def cargar_perfil(datos):
+	if datos['id'] is None:
+		return None
+	modelo = models.Alumno if datos['modelo'] == 'alumno' else models.Personal
+	return modelo.objects.filter(id=datos['id']).first()
+
+
+class PerfilMiddleware:
+	"""
+	Agrega request.lca_group (nombre del grupo) y request.lca_profile
+	(Personal o Alumno del usuario, cargado de forma perezosa).
+
+	El grupo y la referencia al perfil se guardan en la sesión junto con
+	una versión por usuario que las señales de app.signals invalidan al
+	editar el perfil o los grupos del usuario.
+	"""
+
+	def __init__(self, get_response):
+		self.get_response = get_response
+
+	def __call__(self, request):
+		datos = {'grupo': None, 'modelo': None, 'id': None}
+		if request.user.is_authenticated:
+			version = get_version(request.user.id)
+			datos = request.session.get(SESION_PERFIL)
+			if not datos or datos.get('version') != version:
+				datos = resolver_perfil(request.user)
+				datos['version'] = version
+				request.session[SESION_PERFIL] = datos
+		request.lca_group = datos['grupo']
+		request.lca_profile = SimpleLazyObject(lambda: cargar_perfil(datos))
+		return self.get_response(request)
@@ -0,0 +1,41 @@
+# Generated by Django 3.2.25 on 2026-10-18 19:45
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+
+def calcular_horas(apps, schema_editor):
+    Asistencia_Personal = apps.get_model('app', 'Asistencia_Personal')
+    Horas_Personal = apps.get_model('app', 'Horas_Personal')
+    totales = Asistencia_Personal.objects.annotate(
+        anio=ExtractYear('fecha'), mes=ExtractMonth('fecha'),
+    ).values('personal_id', 'anio', 'mes').annotate(dias=Count('id'), horas=Sum('horas')).order_by()
+    Horas_Personal.objects.bulk_create([Horas_Personal(**fila) for fila in totales])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0021_rename_partipantes_actividad_participantes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Horas_Personal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('anio', models.IntegerField()),
+                ('mes', models.IntegerField()),
+                ('dias', models.IntegerField(default=0)),
+                ('horas', models.IntegerField(default=0)),
+                ('personal', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='app.personal')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='horas_personal',
+            constraint=models.UniqueConstraint(fields=('personal', 'anio', 'mes'), name='horas_personal_unico'),
+        ),
+        migrations.RunPython(calcular_horas, migrations.RunPython.noop),
+    ]
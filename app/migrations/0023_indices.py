@@ -0,0 +1,72 @@
+# Generated by Django 3.2.25 on 2026-10-18 19:50
+
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+
+def eliminar_repetidas(apps, schema_editor):
+    # Antes de crear las restricciones se deja una asistencia por día.
+    Asistencia_Personal = apps.get_model('app', 'Asistencia_Personal')
+    Asistencia_Alumno = apps.get_model('app', 'Asistencia_Alumno')
+    Horas_Personal = apps.get_model('app', 'Horas_Personal')
+    borradas = 0
+    for modelo, campo in ((Asistencia_Personal, 'personal'), (Asistencia_Alumno, 'asignatura_alumno')):
+        repetidas = modelo.objects.values(campo, 'fecha').annotate(n=Count('id'), primera=Min('id')).filter(n__gt=1).order_by()
+        for fila in repetidas:
+            borradas += modelo.objects.filter(**{campo: fila[campo], 'fecha': fila['fecha']}).exclude(id=fila['primera']).delete()[0]
+        if modelo is Asistencia_Personal and borradas:
+            Horas_Personal.objects.all().delete()
+            totales = Asistencia_Personal.objects.annotate(
+                anio=ExtractYear('fecha'), mes=ExtractMonth('fecha'),
+            ).values('personal_id', 'anio', 'mes').annotate(dias=Count('id'), horas=Sum('horas')).order_by()
+            Horas_Personal.objects.bulk_create([Horas_Personal(**fila) for fila in totales])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0022_horas_personal'),
+    ]
+
+    operations = [
+        migrations.RunPython(eliminar_repetidas, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='alumno',
+            name='cedula',
+            field=models.CharField(db_index=True, max_length=8),
+        ),
+        migrations.AlterField(
+            model_name='representante',
+            name='cedula',
+            field=models.CharField(db_index=True, max_length=8),
+        ),
+        migrations.AddIndex(
+            model_name='asistencia_alumno',
+            index=models.Index(fields=['fecha'], name='asistencia_alumno_fecha'),
+        ),
+        migrations.AddIndex(
+            model_name='asistencia_personal',
+            index=models.Index(fields=['fecha'], name='asistencia_personal_fecha'),
+        ),
+        migrations.AddIndex(
+            model_name='permiso',
+            index=models.Index(fields=['fecha_inicio', 'fecha_fin'], name='permiso_fechas'),
+        ),
+        migrations.AddIndex(
+            model_name='permiso',
+            index=models.Index(fields=['status'], name='permiso_status'),
+        ),
+        migrations.AddIndex(
+            model_name='reporte',
+            index=models.Index(fields=['status'], name='reporte_status'),
+        ),
+        migrations.AddConstraint(
+            model_name='asistencia_alumno',
+            constraint=models.UniqueConstraint(fields=('asignatura_alumno', 'fecha'), name='asistencia_alumno_unica'),
+        ),
+        migrations.AddConstraint(
+            model_name='asistencia_personal',
+            constraint=models.UniqueConstraint(fields=('personal', 'fecha'), name='asistencia_personal_unica'),
+        ),
+    ]
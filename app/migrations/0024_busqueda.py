@@ -0,0 +1,59 @@
+from django.db import migrations
+
+# Copia de app/busqueda.py al crear el índice: la migración no debe
+# cambiar si el módulo cambia después.
+TABLA = 'app_busqueda'
+
+FUENTES = {
+    'personal': ('Personal', [], lambda o: (o.nombre, [o.cedula, o.correo])),
+    'alumno': ('Alumno', [], lambda o: (o.nombre, [o.cedula, o.correo])),
+    'representante': ('Representante', [], lambda o: (o.nombre, [o.cedula])),
+    'bien': ('Bien', ['tipo'], lambda o: (o.nombre, [o.tipo.nombre])),
+    'reporte': ('Reporte', ['bien'], lambda o: (o.bien.nombre, [o.observacion])),
+    'memorandum': ('Memorandum', ['personal'], lambda o: (o.personal.nombre, [o.observacion])),
+}
+
+TIPOS = list(FUENTES)
+
+
+def crear_indice(apps, schema_editor):
+    conexion = schema_editor.connection
+    with conexion.cursor() as cursor:
+        if conexion.vendor == 'sqlite':
+            cursor.execute(
+                'CREATE VIRTUAL TABLE %s USING fts5(titulo, texto, tokenize="unicode61 remove_diacritics 2")' % TABLA
+            )
+            columna_id = 'rowid'
+        else:
+            cursor.execute(
+                "CREATE TABLE %s (id bigint PRIMARY KEY, titulo text NOT NULL, texto text NOT NULL, "
+                "documento tsvector GENERATED ALWAYS AS (to_tsvector('simple', titulo || ' ' || texto)) STORED)" % TABLA
+            )
+            cursor.execute('CREATE INDEX %s_documento ON %s USING gin (documento)' % (TABLA, TABLA))
+            columna_id = 'id'
+        for tipo, (nombre, relaciones, textos) in FUENTES.items():
+            consulta = apps.get_model('app', nombre)._default_manager.using(conexion.alias).select_related(*relaciones)
+            filas = []
+            for obj in consulta.iterator(chunk_size=2000):
+                titulo, partes = textos(obj)
+                filas.append((obj.pk * 8 + TIPOS.index(tipo), titulo, ' '.join(parte for parte in partes if parte)))
+            cursor.executemany(
+                'INSERT INTO %s (%s, titulo, texto) VALUES (%%s, %%s, %%s)' % (TABLA, columna_id),
+                filas,
+            )
+
+
+def eliminar_indice(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute('DROP TABLE %s' % TABLA)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0023_indices'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_indice, eliminar_indice),
+    ]
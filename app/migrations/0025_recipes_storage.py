@@ -0,0 +1,19 @@
+# Generated by Django 3.2.25 on 2026-10-18 20:02
+
+import app.almacenamiento
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0024_busqueda'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='permiso',
+            name='imagen',
+            field=models.ImageField(storage=app.almacenamiento.RecipesStorage(), upload_to='media/recipes'),
+        ),
+    ]
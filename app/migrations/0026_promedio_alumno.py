@@ -0,0 +1,51 @@
+# Generated by Django 3.2.25 on 2026-10-18 20:16
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, F, Sum
+
+
+def calcular_promedios(apps, schema_editor):
+    Evaluacion = apps.get_model('app', 'Evaluacion')
+    Evaluacion_Alumno = apps.get_model('app', 'Evaluacion_Alumno')
+    Promedio_Alumno = apps.get_model('app', 'Promedio_Alumno')
+    # El año escolar va de septiembre a julio: el lapso sale del mes de inicio.
+    for evaluacion in Evaluacion.objects.all():
+        mes = evaluacion.fecha_inicio.month
+        evaluacion.lapso = 1 if mes >= 9 else 2 if mes <= 3 else 3
+        evaluacion.save(update_fields=['lapso'])
+    totales = Evaluacion_Alumno.objects.values('asignatura_alumno_id', lapso=F('evaluacion__lapso')).annotate(
+        evaluaciones=Count('id'), puntos=Sum(F('nota') * F('evaluacion__nota')), ponderacion=Sum('evaluacion__nota'),
+    ).order_by()
+    Promedio_Alumno.objects.bulk_create([Promedio_Alumno(**fila) for fila in totales])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0025_recipes_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='evaluacion',
+            name='lapso',
+            field=models.IntegerField(choices=[(1, 'Primer lapso'), (2, 'Segundo lapso'), (3, 'Tercer lapso')], default=1),
+        ),
+        migrations.CreateModel(
+            name='Promedio_Alumno',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('lapso', models.IntegerField(choices=[(1, 'Primer lapso'), (2, 'Segundo lapso'), (3, 'Tercer lapso')])),
+                ('evaluaciones', models.IntegerField(default=0)),
+                ('puntos', models.IntegerField(default=0)),
+                ('ponderacion', models.IntegerField(default=0)),
+                ('asignatura_alumno', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='app.asignatura_alumno')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='promedio_alumno',
+            constraint=models.UniqueConstraint(fields=('asignatura_alumno', 'lapso'), name='promedio_alumno_unico'),
+        ),
+        migrations.RunPython(calcular_promedios, migrations.RunPython.noop),
+    ]
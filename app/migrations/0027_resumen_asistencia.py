@@ -0,0 +1,78 @@
+# Generated by Django 3.2.25 on 2026-10-18 20:21
+
+from django.db import migrations, models
+import django.db.models.deletion
+from collections import defaultdict
+from django.db.models import Count, F
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+
+def calcular_resumenes(apps, schema_editor):
+    Asignatura_Alumno = apps.get_model('app', 'Asignatura_Alumno')
+    Asistencia_Alumno = apps.get_model('app', 'Asistencia_Alumno')
+    Asistencia_Diaria = apps.get_model('app', 'Asistencia_Diaria')
+    Asistencia_Mensual = apps.get_model('app', 'Asistencia_Mensual')
+    inscritos = dict(Asignatura_Alumno.objects.values_list('asignatura_id').annotate(n=Count('id')).order_by())
+    dias = Asistencia_Alumno.objects.values('fecha', asignatura_id=F('asignatura_alumno__asignatura_id')).annotate(presentes=Count('id')).order_by()
+    Asistencia_Diaria.objects.bulk_create([
+        Asistencia_Diaria(inscritos=inscritos.get(fila['asignatura_id'], 0), **fila) for fila in dias
+    ], batch_size=1000)
+    meses = defaultdict(lambda: [0, 0])
+    presentes = Asistencia_Alumno.objects.values_list(
+        'asignatura_alumno__alumno_id', ExtractYear('fecha'), ExtractMonth('fecha'),
+    ).annotate(n=Count('id')).order_by()
+    for alumno_id, anio, mes, n in presentes:
+        meses[(alumno_id, anio, mes)][0] = n
+    clases = Asignatura_Alumno.objects.filter(asignatura__asistencia_diaria__isnull=False).values_list(
+        'alumno_id', ExtractYear('asignatura__asistencia_diaria__fecha'), ExtractMonth('asignatura__asistencia_diaria__fecha'),
+    ).annotate(n=Count('id')).order_by()
+    for alumno_id, anio, mes, n in clases:
+        meses[(alumno_id, anio, mes)][1] = n
+    Asistencia_Mensual.objects.bulk_create([
+        Asistencia_Mensual(alumno_id=alumno_id, anio=anio, mes=mes, presentes=presentes, clases=clases)
+        for (alumno_id, anio, mes), (presentes, clases) in meses.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0026_promedio_alumno'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Asistencia_Mensual',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('anio', models.IntegerField()),
+                ('mes', models.IntegerField()),
+                ('presentes', models.IntegerField(default=0)),
+                ('clases', models.IntegerField(default=0)),
+                ('alumno', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='app.alumno')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Asistencia_Diaria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField()),
+                ('presentes', models.IntegerField(default=0)),
+                ('inscritos', models.IntegerField(default=0)),
+                ('asignatura', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='app.asignatura')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='asistencia_mensual',
+            constraint=models.UniqueConstraint(fields=('alumno', 'anio', 'mes'), name='asistencia_mensual_unica'),
+        ),
+        migrations.AddIndex(
+            model_name='asistencia_diaria',
+            index=models.Index(fields=['fecha'], name='asistencia_diaria_fecha'),
+        ),
+        migrations.AddConstraint(
+            model_name='asistencia_diaria',
+            constraint=models.UniqueConstraint(fields=('asignatura', 'fecha'), name='asistencia_diaria_unica'),
+        ),
+        migrations.RunPython(calcular_resumenes, migrations.RunPython.noop),
+    ]
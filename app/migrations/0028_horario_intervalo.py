@@ -0,0 +1,17 @@
+# Generated by Django 3.2.25 on 2026-10-18 20:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0027_resumen_asistencia'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='horario',
+            index=models.Index(fields=['dia', 'hora_inicio', 'hora_fin'], name='horario_intervalo'),
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 3.2.25 on 2026-10-18 20:33
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import datetime
+from collections import defaultdict
+from django.db.models import Count, Q
+
+
+def calcular_inventario(apps, schema_editor):
+    Bien = apps.get_model('app', 'Bien')
+    Reporte = apps.get_model('app', 'Reporte')
+    Historial_Bien = apps.get_model('app', 'Historial_Bien')
+    Inventario_Departamento = apps.get_model('app', 'Inventario_Departamento')
+    # El historial empieza con el status actual de cada bien.
+    Historial_Bien.objects.bulk_create([
+        Historial_Bien(bien_id=bien.pk, status=bien.status, fecha=datetime.datetime.combine(bien.fecha, datetime.time(), datetime.timezone.utc))
+        for bien in Bien.objects.all()
+    ], batch_size=1000)
+    filas = defaultdict(lambda: [0, 0, 0])
+    bienes = Bien.objects.values_list('departamento_id').annotate(bienes=Count('id'), danados=Count('id', filter=Q(status='D'))).order_by()
+    for departamento_id, cantidad, danados in bienes:
+        filas[departamento_id][0] = cantidad
+        filas[departamento_id][1] = danados
+    abiertos = Reporte.objects.filter(status='E').values_list('bien__departamento_id').annotate(n=Count('id')).order_by()
+    for departamento_id, cantidad in abiertos:
+        filas[departamento_id][2] = cantidad
+    Inventario_Departamento.objects.bulk_create([
+        Inventario_Departamento(departamento_id=departamento_id, bienes=bienes, danados=danados, reportes_abiertos=reportes)
+        for departamento_id, (bienes, danados, reportes) in filas.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0028_horario_intervalo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Inventario_Departamento',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bienes', models.IntegerField(default=0)),
+                ('danados', models.IntegerField(default=0)),
+                ('reportes_abiertos', models.IntegerField(default=0)),
+                ('departamento', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='app.departamento')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Historial_Bien',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('A', 'Activo'), ('D', 'Dañado')], max_length=1)),
+                ('anterior', models.CharField(blank=True, choices=[('A', 'Activo'), ('D', 'Dañado')], max_length=1, null=True)),
+                ('fecha', models.DateTimeField(default=django.utils.timezone.now)),
+                ('bien', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='app.bien')),
+                ('reporte', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='app.reporte')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='inventario_departamento',
+            constraint=models.UniqueConstraint(fields=('departamento',), name='inventario_departamento_unico'),
+        ),
+        migrations.AddIndex(
+            model_name='historial_bien',
+            index=models.Index(fields=['bien', 'fecha'], name='historial_bien_fecha'),
+        ),
+        migrations.RunPython(calcular_inventario, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 3.2.25 on 2026-10-18 20:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0029_inventario_bien'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='horario',
+            name='horario_intervalo',
+        ),
+        migrations.AddIndex(
+            model_name='horario',
+            index=models.Index(fields=['asignatura', 'dia', 'hora_inicio', 'hora_fin'], name='horario_asignatura_intervalo'),
+        ),
+    ]
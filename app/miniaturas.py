@@ -0,0 +1,99 @@
+import logging
+import os
+import posixpath
+import shutil
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import Http404
+from PIL import Image, ImageOps
+
+from .almacenamiento import enviar_archivo
+from .procesos import Pool
+
+logger = logging.getLogger(__name__)
+
+pool = Pool('MINIATURAS_WORKERS')
+
+DIRECTORIO = 'media/miniaturas'
+
+# nombre: (lado máximo, recortar al cuadrado)
+RENDICIONES = {
+	'avatar': (96, True),
+	'tarjeta': (640, False),
+	'completa': (1600, False),
+}
+
+FORMATOS = {
+	'webp': ('WEBP', {'quality': 80, 'method': 4}),
+	'jpg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+
+def get_directorio(nombre):
+	"""media/perfiles/foto.jpg -> media/miniaturas/perfiles/foto"""
+	nombre = posixpath.splitext(nombre)[0]
+	if nombre.startswith('media/'):
+		nombre = nombre[len('media/'):]
+	return posixpath.join(DIRECTORIO, nombre)
+
+
+def get_ruta(nombre, rendicion, formato):
+	return posixpath.join(get_directorio(nombre), '%s.%s' % (rendicion, formato))
+
+
+def generar(origen, destino):
+	"""Se ejecuta en el pool: crea todas las rendiciones de la imagen origen en el directorio destino."""
+	try:
+		with Image.open(origen) as original:
+			imagen = ImageOps.exif_transpose(original).convert('RGB')
+		os.makedirs(destino, exist_ok=True)
+		for rendicion, (lado, recortar) in RENDICIONES.items():
+			if recortar:
+				copia = ImageOps.fit(imagen, (lado, lado), Image.LANCZOS)
+			else:
+				copia = imagen.copy()
+				copia.thumbnail((lado, lado), Image.LANCZOS)
+			for formato, (formato_pil, opciones) in FORMATOS.items():
+				ruta = os.path.join(destino, '%s.%s' % (rendicion, formato))
+				copia.save(ruta + '.tmp', formato_pil, **opciones)
+				os.replace(ruta + '.tmp', ruta)
+		return True
+	except Exception:
+		logger.exception('No se pudieron generar las miniaturas de %s', origen)
+		return False
+
+
+def get_argumentos(nombre):
+	return default_storage.path(nombre), default_storage.path(get_directorio(nombre))
+
+
+def existe(nombre):
+	return default_storage.exists(get_ruta(nombre, 'completa', 'jpg'))
+
+
+def encolar(nombre):
+	if nombre and default_storage.exists(nombre) and not existe(nombre):
+		pool.submit(generar, *get_argumentos(nombre))
+
+
+def eliminar(nombre):
+	shutil.rmtree(default_storage.path(get_directorio(nombre)), ignore_errors=True)
+
+
+def get_url(imagen, rendicion, webp=True):
+	"""URL de la rendición, o de la imagen original si aún no se generó."""
+	if not imagen:
+		return ''
+	if not existe(imagen.name):
+		return imagen.url
+	return default_storage.url(get_ruta(imagen.name, rendicion, 'webp' if webp else 'jpg'))
+
+
+def servir(request, ruta):
+	nombre = posixpath.normpath(posixpath.join(DIRECTORIO, ruta))
+	if not nombre.startswith(DIRECTORIO + '/'):
+		raise Http404
+	# El nombre de cada rendición depende del archivo original, que nunca se
+	# sobrescribe: el contenido de una URL no cambia y se puede cachear.
+	return enviar_archivo(nombre, 'public, max-age=%d, immutable' % settings.MINIATURAS_MAX_AGE)
@@ -1,7 +1,10 @@
+from django.core.exceptions import ValidationError
 from django.db import models
 from django.contrib.auth.models import User
 from django.utils import timezone
 
+from .almacenamiento import RecipesStorage
+
 CARGOS = [
 	('A', 'Administrativo'),
 	('O', 'Obrero'),
@@ -24,6 +27,12 @@ BOOLEANO = [
 	('N', 'No'),
 ]
 
+LAPSOS = [
+	(1, 'Primer lapso'),
+	(2, 'Segundo lapso'),
+	(3, 'Tercer lapso'),
+]
+
 DIAS = [
 	('LU', 'Lunes'),
 	('MA', 'Martes'),
@@ -74,6 +83,42 @@ class Bien(models.Model):
 		cadena = "{0} - {1}"
 		return cadena.format(self.tipo, self.nombre)
 
+class Historial_Bien(models.Model):
+	status = models.CharField(max_length=1, choices=STATUS)
+	anterior = models.CharField(max_length=1, choices=STATUS, null=True, blank=True)
+	fecha = models.DateTimeField(default=timezone.now)
+	bien = models.ForeignKey(Bien, on_delete=models.CASCADE)
+	reporte = models.ForeignKey('Reporte', on_delete=models.SET_NULL, null=True, blank=True)
+
+	class Meta:
+		indexes = [
+			models.Index(fields=['bien', 'fecha'], name='historial_bien_fecha'),
+		]
+
+	def __str__(self):
+		cadena = "{0} - {1}"
+		return cadena.format(self.bien.nombre, self.get_status_display())
+
+class Inventario_Departamento(models.Model):
+	bienes = models.IntegerField(default=0)
+	danados = models.IntegerField(default=0)
+	reportes_abiertos = models.IntegerField(default=0)
+	departamento = models.ForeignKey(Departamento, on_delete=models.CASCADE)
+
+	class Meta:
+		constraints = [
+			models.UniqueConstraint(fields=['departamento'], name='inventario_departamento_unico'),
+		]
+
+	@property
+	def porcentaje_danados(self):
+		if not self.bienes:
+			return None
+		return self.danados * 100 / self.bienes
+
+	def __str__(self):
+		return self.departamento.nombre
+
 class Reporte(models.Model):
 	observacion = models.CharField(max_length=100, null=True, blank=True)
 	status = models.CharField(max_length=1, choices=STATUS_2, default="E")
@@ -81,16 +126,27 @@ class Reporte(models.Model):
 	fecha_fin = models.DateField(null=True, blank=True)
 	bien = models.ForeignKey(Bien, on_delete=models.CASCADE)
 
+	class Meta:
+		indexes = [
+			models.Index(fields=['status'], name='reporte_status'),
+		]
+
 	def __str__(self):
 		return self.bien.nombre
 
 class Permiso(models.Model):
 	fecha_inicio = models.DateField()
 	fecha_fin = models.DateField()
-	imagen = models.ImageField(upload_to="media/recipes")
+	imagen = models.ImageField(upload_to="media/recipes", storage=RecipesStorage())
 	status = models.CharField(max_length=1, choices=STATUS_2, default="E")
 	personal = models.ForeignKey(Personal, on_delete=models.CASCADE)
 
+	class Meta:
+		indexes = [
+			models.Index(fields=['fecha_inicio', 'fecha_fin'], name='permiso_fechas'),
+			models.Index(fields=['status'], name='permiso_status'),
+		]
+
 	def __str__(self):
 		return self.personal.nombre
 
@@ -107,9 +163,33 @@ class Asistencia_Personal(models.Model):
 	horas = models.IntegerField()
 	personal = models.ForeignKey(Personal, on_delete=models.CASCADE)
 
+	class Meta:
+		indexes = [
+			models.Index(fields=['fecha'], name='asistencia_personal_fecha'),
+		]
+		constraints = [
+			models.UniqueConstraint(fields=['personal', 'fecha'], name='asistencia_personal_unica'),
+		]
+
 	def __str__(self):
 		return self.personal.nombre
 
+class Horas_Personal(models.Model):
+	anio = models.IntegerField()
+	mes = models.IntegerField()
+	dias = models.IntegerField(default=0)
+	horas = models.IntegerField(default=0)
+	personal = models.ForeignKey(Personal, on_delete=models.CASCADE)
+
+	class Meta:
+		constraints = [
+			models.UniqueConstraint(fields=['personal', 'anio', 'mes'], name='horas_personal_unico'),
+		]
+
+	def __str__(self):
+		cadena = "{0} - {1}/{2}"
+		return cadena.format(self.personal.nombre, self.mes, self.anio)
+
 class Asignatura(models.Model):
 	nombre = models.CharField(max_length=100)
 	guia = models.CharField(max_length=1, choices=BOOLEANO, default="N")
@@ -133,11 +213,37 @@ class Horario(models.Model):
 	hora_fin = models.TimeField()
 	asignatura = models.ForeignKey(Asignatura, on_delete=models.CASCADE)
 
+	class Meta:
+		indexes = [
+			models.Index(fields=['asignatura', 'dia', 'hora_inicio', 'hora_fin'], name='horario_asignatura_intervalo'),
+		]
+
 	def __str__(self):
 		return self.dia
 
+	def get_conflictos(self):
+		# Bloques del mismo profesor en el mismo día que se solapan con este,
+		# en una consulta: las asignaturas del profesor van en una subconsulta
+		# y cada una recorre horario_asignatura_intervalo.
+		profesor = Asignatura.objects.filter(pk=self.asignatura_id).values('personal_id')
+		return Horario.objects.filter(
+			asignatura__in=Asignatura.objects.filter(personal_id__in=profesor).values('id'), dia=self.dia,
+			hora_inicio__lt=self.hora_fin, hora_fin__gt=self.hora_inicio,
+		).exclude(pk=self.pk).select_related('asignatura').order_by('hora_inicio')
+
+	def clean(self):
+		if self.hora_inicio is None or self.hora_fin is None:
+			return
+		if self.hora_inicio >= self.hora_fin:
+			raise ValidationError({'hora_fin': 'La hora de fin debe ser posterior a la de inicio.'})
+		if self.asignatura_id is None or not self.dia:
+			return
+		conflictos = ['%s (%s - %s)' % (h.asignatura.nombre, h.hora_inicio.strftime('%H:%M'), h.hora_fin.strftime('%H:%M')) for h in self.get_conflictos()]
+		if conflictos:
+			raise ValidationError('El profesor ya tiene clases en ese horario: %s.' % ', '.join(conflictos))
+
 class Representante(models.Model):
-	cedula = models.CharField(max_length=8)
+	cedula = models.CharField(max_length=8, db_index=True)
 	nombre = models.CharField(max_length=50)
 	telefono = models.CharField(max_length=12)
 	direccion = models.CharField(max_length=100)
@@ -146,7 +252,7 @@ class Representante(models.Model):
 		return self.nombre
 
 class Alumno(models.Model):
-	cedula = models.CharField(max_length=8)
+	cedula = models.CharField(max_length=8, db_index=True)
 	nombre = models.CharField(max_length=50)
 	telefono = models.CharField(max_length=12)
 	direccion = models.CharField(max_length=100)
@@ -171,12 +277,67 @@ class Asistencia_Alumno(models.Model):
 	fecha = models.DateField()
 	asignatura_alumno = models.ForeignKey(Asignatura_Alumno, on_delete=models.CASCADE)
 
+	class Meta:
+		indexes = [
+			models.Index(fields=['fecha'], name='asistencia_alumno_fecha'),
+		]
+		constraints = [
+			models.UniqueConstraint(fields=['asignatura_alumno', 'fecha'], name='asistencia_alumno_unica'),
+		]
+
 	def __str__(self):
 		return self.asignatura_alumno.__str__()
 
+class Asistencia_Diaria(models.Model):
+	fecha = models.DateField()
+	presentes = models.IntegerField(default=0)
+	inscritos = models.IntegerField(default=0)
+	asignatura = models.ForeignKey(Asignatura, on_delete=models.CASCADE)
+
+	class Meta:
+		indexes = [
+			models.Index(fields=['fecha'], name='asistencia_diaria_fecha'),
+		]
+		constraints = [
+			models.UniqueConstraint(fields=['asignatura', 'fecha'], name='asistencia_diaria_unica'),
+		]
+
+	@property
+	def porcentaje(self):
+		if not self.inscritos:
+			return None
+		return self.presentes * 100 / self.inscritos
+
+	def __str__(self):
+		cadena = "{0} - {1}"
+		return cadena.format(self.asignatura.nombre, self.fecha)
+
+class Asistencia_Mensual(models.Model):
+	anio = models.IntegerField()
+	mes = models.IntegerField()
+	presentes = models.IntegerField(default=0)
+	clases = models.IntegerField(default=0)
+	alumno = models.ForeignKey(Alumno, on_delete=models.CASCADE)
+
+	class Meta:
+		constraints = [
+			models.UniqueConstraint(fields=['alumno', 'anio', 'mes'], name='asistencia_mensual_unica'),
+		]
+
+	@property
+	def porcentaje(self):
+		if not self.clases:
+			return None
+		return self.presentes * 100 / self.clases
+
+	def __str__(self):
+		cadena = "{0} - {1}/{2}"
+		return cadena.format(self.alumno.nombre, self.mes, self.anio)
+
 class Evaluacion(models.Model):
 	nombre = models.CharField(max_length=50)
 	nota = models.IntegerField()
+	lapso = models.IntegerField(choices=LAPSOS, default=1)
 	fecha_inicio = models.DateField()
 	fecha_fin = models.DateField()
 
@@ -193,6 +354,29 @@ class Evaluacion_Alumno(models.Model):
 		cadena = "{0} - {1}"
 		return cadena.format(self.asignatura_alumno.__str__(), self.evaluacion.nombre)
 
+class Promedio_Alumno(models.Model):
+	lapso = models.IntegerField(choices=LAPSOS)
+	evaluaciones = models.IntegerField(default=0)
+	puntos = models.IntegerField(default=0)
+	ponderacion = models.IntegerField(default=0)
+	asignatura_alumno = models.ForeignKey(Asignatura_Alumno, on_delete=models.CASCADE)
+
+	class Meta:
+		constraints = [
+			models.UniqueConstraint(fields=['asignatura_alumno', 'lapso'], name='promedio_alumno_unico'),
+		]
+
+	@property
+	def promedio(self):
+		# La nota de cada Evaluacion es su ponderación.
+		if not self.ponderacion:
+			return None
+		return self.puntos / self.ponderacion
+
+	def __str__(self):
+		cadena = "{0} - {1}"
+		return cadena.format(self.asignatura_alumno.__str__(), self.get_lapso_display())
+
 class Tipo_Solicitud(models.Model):
 	nombre = models.CharField(max_length=50)
 	costo = models.IntegerField()
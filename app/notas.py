@@ -0,0 +1,115 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+
+from . import models, versiones
+
+LAPSOS = [lapso for lapso, nombre in models.LAPSOS]
+
+
+class Deltas:
+	"""Acumula cambios de evaluaciones, puntos y ponderación por (inscripción, lapso)."""
+
+	def __init__(self):
+		self.cambios = defaultdict(lambda: [0, 0, 0])
+
+	def sumar(self, asignatura_alumno_id, lapso, nota, ponderacion):
+		cambio = self.cambios[(asignatura_alumno_id, lapso)]
+		cambio[0] += 1
+		cambio[1] += nota * ponderacion
+		cambio[2] += ponderacion
+
+	def restar(self, asignatura_alumno_id, lapso, nota, ponderacion):
+		cambio = self.cambios[(asignatura_alumno_id, lapso)]
+		cambio[0] -= 1
+		cambio[1] -= nota * ponderacion
+		cambio[2] -= ponderacion
+
+	def aplicar(self):
+		cambios = {clave: valor for clave, valor in self.cambios.items() if valor != [0, 0, 0]}
+		if not cambios:
+			return
+		with transaction.atomic():
+			existentes = {
+				(p.asignatura_alumno_id, p.lapso): p
+				for p in models.Promedio_Alumno.objects.select_for_update().filter(
+					asignatura_alumno_id__in={clave[0] for clave in cambios},
+					lapso__in={clave[1] for clave in cambios},
+				)
+			}
+			actualizar = []
+			crear = []
+			for clave, (evaluaciones, puntos, ponderacion) in cambios.items():
+				if clave in existentes:
+					fila = existentes[clave]
+					fila.evaluaciones += evaluaciones
+					fila.puntos += puntos
+					fila.ponderacion += ponderacion
+					actualizar.append(fila)
+				elif evaluaciones > 0:
+					# Igual que en horas.Deltas: un descuento sin fila previa
+					# solo ocurre si la inscripción ya se borró en cascada.
+					asignatura_alumno_id, lapso = clave
+					crear.append(models.Promedio_Alumno(
+						asignatura_alumno_id=asignatura_alumno_id, lapso=lapso,
+						evaluaciones=evaluaciones, puntos=puntos, ponderacion=ponderacion,
+					))
+			models.Promedio_Alumno.objects.bulk_update(actualizar, ['evaluaciones', 'puntos', 'ponderacion'])
+			models.Promedio_Alumno.objects.bulk_create(crear)
+			vacias = [fila.pk for fila in actualizar if fila.evaluaciones <= 0]
+			if vacias:
+				models.Promedio_Alumno.objects.filter(pk__in=vacias).delete()
+			versiones.invalidar(models.Promedio_Alumno)
+		self.cambios.clear()
+
+
+def calcular(filtro=Q()):
+	"""Promedios ponderados por inscripción y lapso en una sola consulta."""
+	return models.Evaluacion_Alumno.objects.filter(filtro).values(
+		'asignatura_alumno_id', lapso=F('evaluacion__lapso'),
+	).annotate(
+		evaluaciones=Count('id'),
+		puntos=Sum(F('nota') * F('evaluacion__nota')),
+		ponderacion=Sum('evaluacion__nota'),
+	).order_by()
+
+
+def recalcular(asignatura_alumno_ids=None):
+	"""Reemplaza el resumen de las inscripciones dadas (o de todas)."""
+	filtro = Q()
+	if asignatura_alumno_ids is not None:
+		filtro = Q(asignatura_alumno_id__in=asignatura_alumno_ids)
+	with transaction.atomic():
+		models.Promedio_Alumno.objects.filter(filtro).delete()
+		models.Promedio_Alumno.objects.bulk_create([models.Promedio_Alumno(**fila) for fila in calcular(filtro)], batch_size=1000)
+		versiones.invalidar(models.Promedio_Alumno)
+
+
+def get_definitiva(promedios):
+	"""Promedio de los lapsos que ya tienen notas."""
+	evaluados = [promedio for promedio in promedios if promedio is not None]
+	return sum(evaluados) / len(evaluados) if evaluados else None
+
+
+def matriz(asignatura):
+	"""
+	Una fila por alumno inscrito en la asignatura con su promedio de cada
+	lapso y la definitiva (promedio de los lapsos evaluados), en una
+	consulta sobre el resumen.
+	"""
+	anotaciones = {}
+	for lapso in LAPSOS:
+		filtro = Q(promedio_alumno__lapso=lapso)
+		anotaciones['puntos_%d' % lapso] = Sum('promedio_alumno__puntos', filter=filtro)
+		anotaciones['ponderacion_%d' % lapso] = Sum('promedio_alumno__ponderacion', filter=filtro)
+	inscripciones = models.Asignatura_Alumno.objects.filter(asignatura=asignatura).select_related('alumno').annotate(**anotaciones).order_by('alumno__nombre', 'pk')
+	filas = []
+	for inscripcion in inscripciones:
+		promedios = []
+		for lapso in LAPSOS:
+			puntos = getattr(inscripcion, 'puntos_%d' % lapso)
+			ponderacion = getattr(inscripcion, 'ponderacion_%d' % lapso)
+			promedios.append(puntos / ponderacion if ponderacion else None)
+		filas.append({'alumno': inscripcion.alumno, 'promedios': promedios, 'definitiva': get_definitiva(promedios)})
+	return filas
@@ -0,0 +1,123 @@
+import hashlib
+import os
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.http import FileResponse, Http404, JsonResponse
+from django.shortcuts import render
+from django.template.loader import get_template
+from django.urls import reverse
+from django.views import View
+
+from .procesos import Pool
+from .utils import render_pdf_bytes
+
+pool = Pool('PDF_WORKERS')
+
+
+def get_ruta(trabajo, extension='.pdf'):
+	return Path(settings.EXPORTACIONES_DIR) / (trabajo + extension)
+
+
+def generar_pdf(template_src, context, ruta):
+	"""Se ejecuta en el pool: renderiza el PDF y lo publica de forma atómica."""
+	ruta = Path(ruta)
+	try:
+		pdf = render_pdf_bytes(template_src, context)
+		if pdf is None:
+			ruta.with_suffix('.error').touch()
+			return False
+		temporal = ruta.with_suffix('.tmp')
+		temporal.write_bytes(pdf)
+		os.replace(temporal, ruta)
+		# Las versiones anteriores de la misma exportación ya no sirven.
+		prefijo = ruta.stem.rsplit('-', 1)[0]
+		for viejo in ruta.parent.glob(prefijo + '-*.pdf'):
+			if viejo != ruta:
+				viejo.unlink(missing_ok=True)
+		return True
+	except Exception:
+		ruta.with_suffix('.error').touch()
+		raise
+	finally:
+		ruta.with_suffix('.pendiente').unlink(missing_ok=True)
+
+
+def encolar_pdf(template_src, context, trabajo):
+	pendiente = get_ruta(trabajo, '.pendiente')
+	pendiente.parent.mkdir(parents=True, exist_ok=True)
+	try:
+		# Otro worker web ya lo está generando, salvo que haya quedado colgado.
+		if time.time() - pendiente.stat().st_mtime < settings.PDF_TIMEOUT:
+			return
+		pendiente.unlink(missing_ok=True)
+	except FileNotFoundError:
+		pass
+	try:
+		open(pendiente, 'x').close()
+	except FileExistsError:
+		return
+	get_ruta(trabajo, '.error').unlink(missing_ok=True)
+	pool.submit(generar_pdf, template_src, context, str(get_ruta(trabajo)))
+
+
+def get_estado(trabajo):
+	if get_ruta(trabajo).exists():
+		return 'listo'
+	if get_ruta(trabajo, '.error').exists():
+		return 'error'
+	if get_ruta(trabajo, '.pendiente').exists():
+		return 'pendiente'
+	return None
+
+
+class ExportarPDF(View):
+	"""
+	Exporta un queryset a PDF en segundo plano.
+
+	El nombre del trabajo incluye un hash de la plantilla y de los campos de
+	cada fila, así que mientras los datos no cambien se sirve el PDF ya
+	generado. Si no existe se encola en el pool de procesos y se responde
+	con una página de espera (o JSON) que consulta estado_pdf.
+	"""
+	template_name = None
+	queryset = None
+	context_object_name = None
+	filename = None
+
+	def get_queryset(self):
+		return self.queryset.all()
+
+	def get_trabajo(self, object_list):
+		huella = hashlib.sha256(self.template_name.encode())
+		huella.update(get_template(self.template_name).template.source.encode())
+		campos = [campo.attname for campo in self.queryset.model._meta.concrete_fields]
+		for obj in object_list:
+			huella.update(repr([getattr(obj, campo) for campo in campos]).encode())
+		return '%s-%s' % (Path(self.filename).stem, huella.hexdigest()[:32])
+
+	def get(self, request, *args, **kwargs):
+		object_list = list(self.get_queryset())
+		trabajo = self.get_trabajo(object_list)
+		ruta = get_ruta(trabajo)
+		if ruta.exists():
+			response = FileResponse(open(ruta, 'rb'), content_type='application/pdf')
+			content = "inline; filename='%s'" % self.filename
+			if request.GET.get("download"):
+				content = "attachment; filename='%s'" % self.filename
+			response['Content-Disposition'] = content
+			return response
+
+		encolar_pdf(self.template_name, {self.context_object_name: object_list}, trabajo)
+		estado_url = reverse('estado_pdf', args=[trabajo])
+		if 'application/json' in request.headers.get('Accept', ''):
+			return JsonResponse({'trabajo': trabajo, 'estado': get_estado(trabajo), 'estado_url': estado_url}, status=202)
+		return render(request, 'pdf/espera.html', {'estado_url': estado_url}, status=202)
+
+
+def estado_pdf(request, trabajo):
+	estado = get_estado(trabajo)
+	if estado is None:
+		raise Http404
+	return JsonResponse({'trabajo': trabajo, 'estado': estado})
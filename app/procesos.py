@@ -0,0 +1,44 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import django
+from django.conf import settings
+
+
+def iniciar_worker():
+	os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'lca.settings')
+	django.setup()
+
+
+class Pool:
+	"""
+	ProcessPoolExecutor que se crea al primer uso, con Django inicializado
+	en cada proceso. El número de procesos se lee del ajuste indicado.
+	"""
+
+	def __init__(self, ajuste):
+		self.ajuste = ajuste
+		self.executor = None
+		self.lock = threading.Lock()
+
+	def get(self, reiniciar=False):
+		with self.lock:
+			if reiniciar and self.executor is not None:
+				self.executor.shutdown(wait=False)
+				self.executor = None
+			if self.executor is None:
+				self.executor = ProcessPoolExecutor(
+					max_workers=getattr(settings, self.ajuste),
+					mp_context=multiprocessing.get_context('spawn'),
+					initializer=iniciar_worker,
+				)
+			return self.executor
+
+	def submit(self, *args, **kwargs):
+		try:
+			return self.get().submit(*args, **kwargs)
+		except BrokenProcessPool:
+			return self.get(reiniciar=True).submit(*args, **kwargs)
@@ -0,0 +1,212 @@
+import datetime
+import math
+import platform
+import time
+
+import django
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+from django.views.generic import CreateView, DetailView, ListView
+
+from . import models, urls
+from .datatables import DataTableView
+from .exportar import ExportarTabla
+from .metricas import Medicion
+from .pdf import ExportarPDF
+
+TIPOS = ('lista', 'detalle', 'crear', 'exportar')
+
+
+def primero(model):
+	return model.objects.order_by('pk').values_list('pk', flat=True).first()
+
+
+def fecha(i):
+	return (datetime.date(2030, 1, 1) + datetime.timedelta(days=i)).isoformat()
+
+
+# Bloques de un minuto de 13:00 a 23:59 en cada día de clase, para no
+# chocar con los del profesor: alcanzan para 3295 repeticiones sin repetirse.
+BLOQUES_POR_DIA = 659
+
+
+def horario(i):
+	i %= BLOQUES_POR_DIA * len(models.DIAS)
+	dia, minuto = divmod(i, BLOQUES_POR_DIA)
+	inicio = datetime.datetime(2030, 1, 1, 13) + datetime.timedelta(minutes=minuto)
+	fin = inicio + datetime.timedelta(minutes=1)
+	return {'dia': models.DIAS[dia][0], 'hora_inicio': inicio.strftime('%H:%M'), 'hora_fin': fin.strftime('%H:%M')}
+
+
+# Datos de los formularios de creación que se envían por POST. Reciben el
+# número de repetición para no chocar con las restricciones de unicidad.
+CREAR = {
+	'agregar_tipo_bien': lambda i: {'nombre': 'Tipo %d' % i},
+	'agregar_departamento': lambda i: {'nombre': 'Departamento %d' % i, 'personal': [primero(models.Personal)]},
+	'agregar_bien': lambda i: {
+		'nombre': 'Bien %d' % i, 'status': 'A', 'fecha': fecha(i),
+		'tipo': primero(models.Tipo_Bien), 'departamento': primero(models.Departamento),
+	},
+	'agregar_reporte': lambda i: {'bien': primero(models.Bien)},
+	'agregar_memorandum': lambda i: {'personal': primero(models.Personal), 'fecha': fecha(i), 'observacion': '-'},
+	'agregar_asistencia_personal': lambda i: {'personal': primero(models.Personal), 'fecha': fecha(i), 'horas': 8},
+	'agregar_asignatura': lambda i: {'nombre': 'Asignatura %d' % i, 'personal': primero(models.Personal), 'guia': 'N'},
+	'agregar_horario': lambda i: dict(horario(i), asignatura=primero(models.Asignatura)),
+	'agregar_representante': lambda i: {'cedula': str(90000000 + i), 'nombre': 'Representante', 'telefono': '0', 'direccion': '-'},
+	'agregar_asignatura_alumno': lambda i: {'asignatura': primero(models.Asignatura), 'alumno': primero(models.Alumno)},
+	'agregar_actividad': lambda i: {'fecha': fecha(i), 'descripcion': '-', 'participantes': [primero(models.Personal)]},
+}
+
+
+class Escenario:
+
+	def __init__(self, nombre, tipo, url, grupo, metodo='get', datos=None):
+		self.nombre = nombre
+		self.tipo = tipo
+		self.url = url
+		self.grupo = grupo
+		self.metodo = metodo
+		self.datos = datos
+
+	def get_datos(self, i):
+		return self.datos(i) if self.datos else {}
+
+
+def get_grupo(vista):
+	grupos = getattr(vista, 'group_required', None) or 'secretario'
+	if isinstance(grupos, str):
+		return grupos
+	return 'secretario' if 'secretario' in grupos else grupos[0]
+
+
+def get_escenarios(tipos=TIPOS):
+	"""
+	Recorre app.urls y arma un escenario por cada vista de lista, detalle,
+	creación (GET del formulario y POST si está en CREAR) y exportación.
+	"""
+	escenarios = []
+	for patron in urls.urlpatterns:
+		vista = getattr(patron.callback, 'view_class', None)
+		if vista is None:
+			continue
+		nombre = patron.name
+		parametros = patron.pattern.converters
+		grupo = get_grupo(vista)
+		if issubclass(vista, (ExportarTabla, ExportarPDF)):
+			if issubclass(vista, ExportarPDF):
+				escenarios.append(Escenario(nombre, 'exportar', reverse(nombre), grupo))
+			else:
+				for formato in ExportarTabla.formatos:
+					escenarios.append(Escenario('%s:%s' % (nombre, formato), 'exportar', reverse(nombre, args=[formato]), grupo))
+		elif issubclass(vista, DetailView) and nombre.startswith('ver_') and 'pk' in parametros:
+			pk = primero(vista.model)
+			if pk is not None:
+				escenarios.append(Escenario(nombre, 'detalle', reverse(nombre, args=[pk]), grupo))
+		elif issubclass(vista, CreateView) and not parametros:
+			escenarios.append(Escenario(nombre, 'crear', reverse(nombre), grupo))
+			if nombre in CREAR:
+				escenarios.append(Escenario(nombre + ':post', 'crear', reverse(nombre), grupo, 'post', CREAR[nombre]))
+		elif issubclass(vista, (ListView, DataTableView)) or nombre in ('index', 'horario_semanal'):
+			if not parametros:
+				escenarios.append(Escenario(nombre, 'lista', reverse(nombre), grupo))
+	return [escenario for escenario in escenarios if escenario.tipo in tipos]
+
+
+def percentil(valores, p):
+	"""Percentil por rango más cercano sobre valores ordenados."""
+	return valores[max(0, math.ceil(p / 100 * len(valores)) - 1)]
+
+
+def medir(escenario, cliente, repeticiones):
+	latencias = []
+	medicion = Medicion()
+	for i in range(repeticiones + 1):
+		datos = escenario.get_datos(i)
+		actual = Medicion()
+		with connection.execute_wrapper(actual):
+			inicio = time.perf_counter()
+			respuesta = getattr(cliente, escenario.metodo)(escenario.url, datos)
+			if respuesta.streaming:
+				b''.join(respuesta.streaming_content)
+			duracion = time.perf_counter() - inicio
+		# La primera petición calienta plantillas y cachés y no se cuenta.
+		if i:
+			latencias.append(duracion)
+			medicion.consultas += actual.consultas
+			medicion.db += actual.db
+	latencias.sort()
+	return {
+		'tipo': escenario.tipo,
+		'metodo': escenario.metodo.upper(),
+		'url': escenario.url,
+		'grupo': escenario.grupo,
+		'estado': respuesta.status_code,
+		'repeticiones': repeticiones,
+		'p50_ms': round(percentil(latencias, 50) * 1000, 2),
+		'p95_ms': round(percentil(latencias, 95) * 1000, 2),
+		'media_ms': round(sum(latencias) / repeticiones * 1000, 2),
+		'max_ms': round(latencias[-1] * 1000, 2),
+		'rps': round(repeticiones / sum(latencias), 1),
+		'consultas': medicion.consultas / repeticiones,
+		'db_ms': round(medicion.db / repeticiones * 1000, 2),
+	}
+
+
+def ejecutar(escenarios, repeticiones=20, progreso=None):
+	"""Mide cada escenario con el cliente de pruebas logueado según su grupo."""
+	clientes = {}
+	resultados = {}
+	for escenario in escenarios:
+		if escenario.grupo not in clientes:
+			usuario = User.objects.filter(groups__name=escenario.grupo).order_by('pk').first()
+			clientes[escenario.grupo] = Client(raise_request_exception=False)
+			if usuario:
+				clientes[escenario.grupo].force_login(usuario)
+				# La primera petición de la sesión carga el perfil en caché.
+				clientes[escenario.grupo].get(reverse('perfil'))
+		resultados[escenario.nombre] = medir(escenario, clientes[escenario.grupo], repeticiones)
+		if progreso:
+			progreso(escenario.nombre, resultados[escenario.nombre])
+	return resultados
+
+
+def get_volumenes():
+	return {
+		model._meta.label: model._base_manager.count()
+		for model in (
+			User, models.Personal, models.Alumno, models.Representante, models.Asignatura,
+			models.Asignatura_Alumno, models.Asistencia_Alumno, models.Asistencia_Personal,
+			models.Evaluacion_Alumno, models.Bien,
+		)
+	}
+
+
+def informe(resultados, volumenes, **extra):
+	return dict(
+		fecha=timezone.now().isoformat(),
+		python=platform.python_version(),
+		django=django.get_version(),
+		base=connection.vendor,
+		volumenes=volumenes,
+		vistas=resultados,
+		**extra,
+	)
+
+
+def comparar(anterior, actual, umbral=10):
+	"""
+	Filas (vista, p95 anterior, p95 actual, cambio %) de las vistas de
+	ambos informes cuyo p95 cambió más que umbral por ciento.
+	"""
+	filas = []
+	for nombre, resultado in actual['vistas'].items():
+		previo = anterior['vistas'].get(nombre)
+		if not previo or not previo['p95_ms']:
+			continue
+		cambio = (resultado['p95_ms'] - previo['p95_ms']) / previo['p95_ms'] * 100
+		if abs(cambio) >= umbral:
+			filas.append((nombre, previo['p95_ms'], resultado['p95_ms'], cambio))
+	return sorted(filas, key=lambda fila: -abs(fila[3]))
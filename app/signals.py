@@ -0,0 +1,288 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import asistencias, busqueda, inventario, miniaturas, models, notas, versiones
+from .horas import Deltas
+from .middleware import invalidar_perfil
+
+
+@receiver(post_save, sender=models.Personal)
+@receiver(post_delete, sender=models.Personal)
+@receiver(post_save, sender=models.Alumno)
+@receiver(post_delete, sender=models.Alumno)
+def perfil_modificado(sender, instance, **kwargs):
+	invalidar_perfil(instance.usuario_id)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def grupos_modificados(sender, instance, action, reverse, pk_set, **kwargs):
+	if action not in ('post_add', 'post_remove', 'pre_clear'):
+		return
+	if not reverse:
+		invalidar_perfil(instance.pk)
+	elif action == 'pre_clear':
+		for usuario_id in instance.user_set.values_list('id', flat=True):
+			invalidar_perfil(usuario_id)
+	else:
+		for usuario_id in pk_set:
+			invalidar_perfil(usuario_id)
+
+
+@receiver(pre_save, sender=models.Asistencia_Personal)
+def asistencia_personal_anterior(sender, instance, **kwargs):
+	instance._anterior = None
+	if instance.pk:
+		instance._anterior = sender.objects.filter(pk=instance.pk).values('personal_id', 'fecha', 'horas').first()
+
+
+@receiver(post_save, sender=models.Asistencia_Personal)
+def asistencia_personal_guardada(sender, instance, raw=False, **kwargs):
+	if raw:
+		return
+	deltas = Deltas()
+	anterior = getattr(instance, '_anterior', None)
+	if anterior:
+		deltas.restar(anterior['personal_id'], anterior['fecha'], anterior['horas'])
+	deltas.sumar(instance.personal_id, instance.fecha, instance.horas)
+	deltas.aplicar()
+
+
+@receiver(post_delete, sender=models.Asistencia_Personal)
+def asistencia_personal_eliminada(sender, instance, **kwargs):
+	deltas = Deltas()
+	deltas.restar(instance.personal_id, instance.fecha, instance.horas)
+	deltas.aplicar()
+
+
+@receiver(pre_save, sender=models.Asistencia_Alumno)
+def asistencia_alumno_anterior(sender, instance, **kwargs):
+	instance._anterior = None
+	if instance.pk:
+		instance._anterior = sender.objects.filter(pk=instance.pk).values(
+			'fecha', 'asignatura_alumno__asignatura_id', 'asignatura_alumno__alumno_id',
+		).first()
+
+
+@receiver(post_save, sender=models.Asistencia_Alumno)
+def asistencia_alumno_guardada(sender, instance, raw=False, **kwargs):
+	if raw:
+		return
+	deltas = asistencias.Deltas()
+	anterior = getattr(instance, '_anterior', None)
+	if anterior:
+		deltas.restar(anterior['asignatura_alumno__asignatura_id'], anterior['asignatura_alumno__alumno_id'], anterior['fecha'])
+	inscripcion = instance.asignatura_alumno
+	deltas.sumar(inscripcion.asignatura_id, inscripcion.alumno_id, instance.fecha)
+	deltas.aplicar()
+
+
+@receiver(post_delete, sender=models.Asistencia_Alumno)
+def asistencia_alumno_eliminada(sender, instance, **kwargs):
+	inscripcion = models.Asignatura_Alumno.objects.filter(pk=instance.asignatura_alumno_id).values('asignatura_id', 'alumno_id').first()
+	if inscripcion:
+		deltas = asistencias.Deltas()
+		deltas.restar(inscripcion['asignatura_id'], inscripcion['alumno_id'], instance.fecha)
+		deltas.aplicar()
+
+
+@receiver(pre_save, sender=models.Asignatura_Alumno)
+def asignatura_alumno_anterior(sender, instance, **kwargs):
+	instance._anterior = None
+	if instance.pk:
+		instance._anterior = sender.objects.filter(pk=instance.pk).values('asignatura_id', 'alumno_id').first()
+
+
+@receiver(post_save, sender=models.Asignatura_Alumno)
+def asignatura_alumno_guardada(sender, instance, raw=False, **kwargs):
+	# Inscribir o mover una inscripción cambia los inscritos de cada día y
+	# las clases de cada mes: se recalculan solo las filas afectadas.
+	if raw:
+		return
+	actual = {'asignatura_id': instance.asignatura_id, 'alumno_id': instance.alumno_id}
+	anterior = getattr(instance, '_anterior', None)
+	if anterior == actual:
+		return
+	anterior = anterior or actual
+	asignaturas = {actual['asignatura_id'], anterior['asignatura_id']}
+	alumnos = {actual['alumno_id'], anterior['alumno_id']}
+	if len(asignaturas) > 1:
+		# Sus asistencias pueden abrir o cerrar días de clase de los demás inscritos.
+		alumnos.update(models.Asignatura_Alumno.objects.filter(asignatura_id__in=asignaturas).values_list('alumno_id', flat=True))
+	asistencias.recalcular(asignaturas, alumnos)
+
+
+@receiver(post_delete, sender=models.Asignatura_Alumno)
+def asignatura_alumno_eliminada(sender, instance, **kwargs):
+	# Sus asistencias ya se borraron en cascada y descontaron sus días.
+	asistencias.recalcular([instance.asignatura_id], [instance.alumno_id])
+
+
+@receiver(pre_save, sender=models.Evaluacion_Alumno)
+def evaluacion_alumno_anterior(sender, instance, **kwargs):
+	instance._anterior = None
+	if instance.pk:
+		instance._anterior = sender.objects.filter(pk=instance.pk).values(
+			'asignatura_alumno_id', 'nota', 'evaluacion__lapso', 'evaluacion__nota',
+		).first()
+
+
+@receiver(post_save, sender=models.Evaluacion_Alumno)
+def evaluacion_alumno_guardada(sender, instance, raw=False, **kwargs):
+	if raw:
+		return
+	deltas = notas.Deltas()
+	anterior = getattr(instance, '_anterior', None)
+	if anterior:
+		deltas.restar(anterior['asignatura_alumno_id'], anterior['evaluacion__lapso'], anterior['nota'], anterior['evaluacion__nota'])
+	deltas.sumar(instance.asignatura_alumno_id, instance.evaluacion.lapso, instance.nota, instance.evaluacion.nota)
+	deltas.aplicar()
+
+
+@receiver(post_delete, sender=models.Evaluacion_Alumno)
+def evaluacion_alumno_eliminada(sender, instance, **kwargs):
+	evaluacion = models.Evaluacion.objects.filter(pk=instance.evaluacion_id).values('lapso', 'nota').first()
+	if evaluacion:
+		deltas = notas.Deltas()
+		deltas.restar(instance.asignatura_alumno_id, evaluacion['lapso'], instance.nota, evaluacion['nota'])
+		deltas.aplicar()
+
+
+@receiver(pre_save, sender=models.Evaluacion)
+def evaluacion_anterior(sender, instance, **kwargs):
+	instance._anterior = None
+	if instance.pk:
+		instance._anterior = sender.objects.filter(pk=instance.pk).values('lapso', 'nota').first()
+
+
+@receiver(post_save, sender=models.Evaluacion)
+def evaluacion_guardada(sender, instance, created, raw=False, **kwargs):
+	# Cambiar la ponderación o el lapso afecta a todas sus notas.
+	anterior = getattr(instance, '_anterior', None)
+	if raw or not anterior or anterior == {'lapso': instance.lapso, 'nota': instance.nota}:
+		return
+	notas.recalcular(models.Evaluacion_Alumno.objects.filter(evaluacion=instance).values('asignatura_alumno_id'))
+
+
+@receiver(pre_save, sender=models.Bien)
+def bien_anterior(sender, instance, **kwargs):
+	instance._anterior = None
+	if instance.pk:
+		instance._anterior = sender.objects.filter(pk=instance.pk).values('departamento_id', 'status').first()
+
+
+@receiver(post_save, sender=models.Bien)
+def bien_guardado(sender, instance, raw=False, **kwargs):
+	if raw:
+		return
+	anterior = getattr(instance, '_anterior', None)
+	deltas = inventario.Deltas()
+	if anterior:
+		deltas.bien(anterior['departamento_id'], anterior['status'], -1)
+		if anterior['departamento_id'] != instance.departamento_id:
+			# Los reportes abiertos del bien se mudan con él.
+			abiertos = models.Reporte.objects.filter(bien=instance, status='E').count()
+			deltas.reporte(anterior['departamento_id'], -abiertos)
+			deltas.reporte(instance.departamento_id, abiertos)
+	deltas.bien(instance.departamento_id, instance.status, 1)
+	deltas.aplicar()
+	if not anterior or anterior['status'] != instance.status:
+		models.Historial_Bien.objects.create(
+			bien=instance, status=instance.status, anterior=anterior['status'] if anterior else None,
+			reporte=getattr(instance, '_reporte', None),
+		)
+
+
+@receiver(post_delete, sender=models.Bien)
+def bien_eliminado(sender, instance, **kwargs):
+	deltas = inventario.Deltas()
+	deltas.bien(instance.departamento_id, instance.status, -1)
+	deltas.aplicar()
+
+
+@receiver(pre_save, sender=models.Reporte)
+def reporte_anterior(sender, instance, **kwargs):
+	instance._anterior = None
+	if instance.pk:
+		instance._anterior = sender.objects.filter(pk=instance.pk).values('bien_id', 'status', 'bien__departamento_id').first()
+
+
+@receiver(post_save, sender=models.Reporte)
+def reporte_guardado(sender, instance, raw=False, **kwargs):
+	anterior = getattr(instance, '_anterior', None)
+	if raw or (anterior and anterior['bien_id'] == instance.bien_id and anterior['status'] == instance.status):
+		return
+	deltas = inventario.Deltas()
+	if anterior and anterior['status'] == 'E':
+		deltas.reporte(anterior['bien__departamento_id'], -1)
+	if instance.status == 'E':
+		deltas.reporte(inventario.get_departamento_id(instance.bien_id), 1)
+	deltas.aplicar()
+
+
+@receiver(post_delete, sender=models.Reporte)
+def reporte_eliminado(sender, instance, **kwargs):
+	if instance.status == 'E':
+		deltas = inventario.Deltas()
+		deltas.reporte(inventario.get_departamento_id(instance.bien_id), -1)
+		deltas.aplicar()
+
+
+@receiver(connection_created)
+def configurar_sqlite(sender, connection, **kwargs):
+	if connection.vendor != 'sqlite':
+		return
+	with connection.cursor() as cursor:
+		for pragma, valor in settings.SQLITE_PRAGMAS.items():
+			cursor.execute('PRAGMA %s = %s' % (pragma, valor))
+
+
+@receiver(request_started)
+def verificar_conexiones(sender, **kwargs):
+	# Django 3.2 no implementa CONN_HEALTH_CHECKS: una conexión persistente
+	# que el servidor cerró se descarta antes de reutilizarla.
+	for conexion in connections.all():
+		if conexion.settings_dict.get('CONN_HEALTH_CHECKS') and conexion.connection is not None and not conexion.is_usable():
+			conexion.close()
+
+
+@receiver(post_save)
+def busqueda_guardado(sender, instance, raw=False, using='default', **kwargs):
+	if not raw:
+		busqueda.actualizar(instance, using)
+
+
+@receiver(post_delete)
+def busqueda_eliminado(sender, instance, using='default', **kwargs):
+	busqueda.eliminar(instance, using)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def version_modificada(sender, **kwargs):
+	if sender._meta.app_label == 'app':
+		versiones.invalidar(sender)
+
+
+@receiver(m2m_changed)
+def version_relacion_modificada(sender, instance, action, model, **kwargs):
+	if action.startswith('post_'):
+		versiones.invalidar(*[modelo for modelo in (type(instance), model) if modelo._meta.app_label == 'app'])
+
+
+@receiver(post_save, sender=models.Personal)
+@receiver(post_save, sender=models.Alumno)
+def imagen_guardada(sender, instance, raw=False, **kwargs):
+	if not raw and instance.imagen:
+		miniaturas.encolar(instance.imagen.name)
+
+
+@receiver(post_delete, sender=models.Personal)
+@receiver(post_delete, sender=models.Alumno)
+def imagen_eliminada(sender, instance, **kwargs):
+	if instance.imagen:
+		miniaturas.eliminar(instance.imagen.name)
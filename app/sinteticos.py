@@ -0,0 +1,287 @@
+import datetime
+import random
+from collections import Counter
+
+from django.apps import apps
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Group, User
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+
+from . import asistencias, busqueda, inventario, models, notas, versiones
+from .horas import Deltas
+
+# Volúmenes de un liceo típico con escala 1. Los mínimos aseguran que con
+# escalas pequeñas (en las pruebas) haya al menos una fila de cada caso.
+VOLUMENES = {
+	'personal': (150, 6),
+	'alumnos': (2000, 4),
+	'asignaturas': (60, 2),
+	'tipos_bien': (12, 1),
+	'departamentos': (10, 1),
+	'bienes': (600, 2),
+	'reportes': (150, 1),
+	'permisos': (200, 1),
+	'memorandums': (200, 1),
+	'actividades': (40, 1),
+}
+
+ASIGNATURAS_POR_ALUMNO = 6
+EVALUACIONES_POR_LAPSO = 4
+LAPSOS = 3
+HORAS = [datetime.time(hora) for hora in range(7, 13)]
+CLAVE = 'sintetico'
+
+
+def get_cantidad(nombre, escala):
+	cantidad, minimo = VOLUMENES[nombre]
+	return max(minimo, round(cantidad * escala))
+
+
+def get_dias(inicio, fin):
+	"""Días hábiles entre inicio y fin."""
+	dias = []
+	dia = inicio
+	while dia <= fin:
+		if dia.weekday() < 5:
+			dias.append(dia)
+		dia += datetime.timedelta(days=1)
+	return dias
+
+
+class Generador:
+	"""
+	Puebla la base con datos sintéticos de un año escolar.
+
+	Las filas se crean con bulk_create en lotes y con id asignados a partir
+	del máximo existente, así que se puede correr sobre una base con datos.
+	La semilla fija hace que dos corridas con la misma escala generen lo
+	mismo y los informes de rendimiento sean comparables.
+	"""
+
+	def __init__(self, escala=1.0, anio=2021, semilla=0, lote=5000):
+		self.escala = escala
+		self.inicio = datetime.date(anio, 9, 15)
+		self.fin = datetime.date(anio + 1, 7, 15)
+		self.dias = get_dias(self.inicio, self.fin)
+		self.random = random.Random(semilla)
+		self.lote = lote
+		self.creados = Counter()
+
+	def cantidad(self, nombre):
+		return get_cantidad(nombre, self.escala)
+
+	def crear(self, model, objs):
+		"""Guarda objs (cualquier iterable) en lotes y devuelve sus id."""
+		siguiente = (model._base_manager.aggregate(n=Max('pk'))['n'] or 0) + 1
+		ids = []
+		pendientes = []
+		for obj in objs:
+			obj.pk = siguiente
+			ids.append(siguiente)
+			siguiente += 1
+			pendientes.append(obj)
+			if len(pendientes) >= self.lote:
+				model._base_manager.bulk_create(pendientes)
+				pendientes = []
+		model._base_manager.bulk_create(pendientes)
+		self.creados[model._meta.label] += len(ids)
+		return ids
+
+	def fecha(self):
+		return self.random.choice(self.dias)
+
+	def generar(self):
+		with transaction.atomic():
+			self.generar_personal()
+			self.generar_bienes()
+			self.generar_personal_registros()
+			self.generar_alumnos()
+			self.generar_clases()
+			self.generar_evaluaciones()
+			with connection.cursor() as cursor:
+				for etiqueta in ('auth', 'app'):
+					modelos = apps.get_app_config(etiqueta).get_models(include_auto_created=True)
+					for sql in connection.ops.sequence_reset_sql(no_style(), list(modelos)):
+						cursor.execute(sql)
+			busqueda.reconstruir()
+		versiones.invalidar(*apps.get_app_config('app').get_models())
+		return self.creados
+
+	def crear_usuarios(self, prefijo, inicio, grupos):
+		"""Un usuario por grupo de la lista; el nombre es la cédula."""
+		clave = make_password(CLAVE)
+		ids_grupo = {nombre: Group.objects.get_or_create(name=nombre)[0].id for nombre in set(grupos)}
+		ids = self.crear(User, (
+			User(username='%s%07d' % (prefijo, inicio + i), password=clave)
+			for i in range(len(grupos))
+		))
+		self.crear(User.groups.through, (
+			User.groups.through(user_id=usuario_id, group_id=ids_grupo[grupo])
+			for usuario_id, grupo in zip(ids, grupos)
+		))
+		return ids
+
+	def generar_personal(self):
+		cantidad = self.cantidad('personal')
+		# Dos secretarios, 60 % profesores y el resto administrativos y obreros.
+		cargos = ['A', 'A'] + ['P' if i % 5 < 3 else 'A' if i % 5 == 3 else 'O' for i in range(cantidad - 2)]
+		grupos = ['secretario', 'secretario'] + [dict(models.CARGOS)[cargo].casefold() for cargo in cargos[2:]]
+		inicio = (models.Personal.objects.aggregate(n=Max('pk'))['n'] or 0) + 1
+		usuarios = self.crear_usuarios('1', inicio, grupos)
+		self.personal = self.crear(models.Personal, (
+			models.Personal(
+				cedula='1%07d' % (inicio + i), nombre='Personal %d' % (inicio + i), telefono='04140000000',
+				direccion='Dirección', correo='personal%d@lca.edu.ve' % (inicio + i), cargo=cargo,
+				horas=20 if cargo == 'P' else None, salario=self.random.randint(300, 900),
+				fecha_nacimiento=datetime.date(1960, 1, 1) + datetime.timedelta(days=self.random.randint(0, 12000)),
+				fecha_inicio=self.inicio, usuario_id=usuario_id,
+			)
+			for i, (cargo, usuario_id) in enumerate(zip(cargos, usuarios))
+		))
+		self.cargos = dict(zip(self.personal, cargos))
+		self.profesores = [pk for pk in self.personal if self.cargos[pk] == 'P']
+
+	def generar_bienes(self):
+		tipos = self.crear(models.Tipo_Bien, (models.Tipo_Bien(nombre='Tipo %d' % i) for i in range(self.cantidad('tipos_bien'))))
+		departamentos = self.crear(models.Departamento, (
+			models.Departamento(nombre='Departamento %d' % i) for i in range(self.cantidad('departamentos'))
+		))
+		self.crear(models.Departamento.personal.through, (
+			models.Departamento.personal.through(departamento_id=departamentos[i % len(departamentos)], personal_id=personal_id)
+			for i, personal_id in enumerate(self.personal)
+		))
+		objs = [
+			models.Bien(
+				nombre='Bien %d' % i, status='D' if self.random.random() < 0.1 else 'A', fecha=self.fecha(),
+				tipo_id=self.random.choice(tipos), departamento_id=self.random.choice(departamentos),
+			)
+			for i in range(self.cantidad('bienes'))
+		]
+		bienes = self.crear(models.Bien, objs)
+		self.crear(models.Historial_Bien, inventario.get_historial_inicial(objs))
+		self.crear(models.Reporte, (
+			models.Reporte(
+				observacion='Reporte %d' % i, status=self.random.choice('EAR'), fecha_inicio=self.fecha(),
+				bien_id=self.random.choice(bienes),
+			)
+			for i in range(self.cantidad('reportes'))
+		))
+		# bulk_create no emite señales: el inventario se calcula de una vez.
+		inventario.recalcular()
+
+	def generar_personal_registros(self):
+		self.crear(models.Permiso, (
+			models.Permiso(
+				fecha_inicio=fecha, fecha_fin=fecha + datetime.timedelta(days=self.random.randint(0, 3)),
+				imagen='media/recipes/sintetico.jpg', status=self.random.choice('EAR'),
+				personal_id=self.random.choice(self.personal),
+			)
+			for fecha in (self.fecha() for i in range(self.cantidad('permisos')))
+		))
+		self.crear(models.Memorandum, (
+			models.Memorandum(observacion='Memorandum %d' % i, fecha=self.fecha(), personal_id=self.random.choice(self.personal))
+			for i in range(self.cantidad('memorandums'))
+		))
+		actividades = self.crear(models.Actividad, (
+			models.Actividad(fecha=self.fecha(), descripcion='Actividad %d' % i) for i in range(self.cantidad('actividades'))
+		))
+		self.crear(models.Actividad.participantes.through, (
+			models.Actividad.participantes.through(actividad_id=actividad_id, personal_id=personal_id)
+			for actividad_id in actividades
+			for personal_id in self.random.sample(self.personal, min(10, len(self.personal)))
+		))
+		# bulk_create no emite señales: el acumulado de horas se suma aparte.
+		deltas = Deltas()
+
+		def presentes():
+			for personal_id in self.personal:
+				horas = 4 if self.cargos[personal_id] == 'P' else 8
+				for fecha in self.dias:
+					if self.random.random() < 0.95:
+						deltas.sumar(personal_id, fecha, horas)
+						yield models.Asistencia_Personal(fecha=fecha, horas=horas, personal_id=personal_id)
+
+		self.crear(models.Asistencia_Personal, presentes())
+		deltas.aplicar()
+
+	def generar_alumnos(self):
+		cantidad = self.cantidad('alumnos')
+		inicio = (models.Alumno.objects.aggregate(n=Max('pk'))['n'] or 0) + 1
+		representantes = self.crear(models.Representante, (
+			models.Representante(cedula='3%07d' % (inicio + i), nombre='Representante %d' % (inicio + i), telefono='04140000000', direccion='Dirección')
+			for i in range(max(1, cantidad * 3 // 4))
+		))
+		usuarios = self.crear_usuarios('2', inicio, ['alumno'] * cantidad)
+		self.alumnos = self.crear(models.Alumno, (
+			models.Alumno(
+				cedula='2%07d' % (inicio + i), nombre='Alumno %d' % (inicio + i), telefono='04140000000',
+				direccion='Dirección', correo='alumno%d@lca.edu.ve' % (inicio + i),
+				fecha_nacimiento=datetime.date(2005, 1, 1) + datetime.timedelta(days=self.random.randint(0, 2500)),
+				representante_id=representantes[i % len(representantes)], usuario_id=usuario_id,
+			)
+			for i, usuario_id in enumerate(usuarios)
+		))
+
+	def generar_clases(self):
+		asignaturas = self.crear(models.Asignatura, (
+			models.Asignatura(nombre='Asignatura %d' % i, guia='S' if i % 10 == 0 else 'N', personal_id=self.profesores[i % len(self.profesores)])
+			for i in range(self.cantidad('asignaturas'))
+		))
+		# Dos bloques semanales por asignatura en días distintos.
+		dias = {}
+		horarios = []
+		for asignatura_id in asignaturas:
+			dias[asignatura_id] = self.random.sample(range(5), 2)
+			for dia in dias[asignatura_id]:
+				hora = self.random.choice(HORAS[:-1])
+				horarios.append(models.Horario(
+					dia=models.DIAS[dia][0], hora_inicio=hora, hora_fin=HORAS[HORAS.index(hora) + 1], asignatura_id=asignatura_id,
+				))
+		self.crear(models.Horario, horarios)
+		inscripciones = []
+		for alumno_id in self.alumnos:
+			for asignatura_id in self.random.sample(asignaturas, min(ASIGNATURAS_POR_ALUMNO, len(asignaturas))):
+				inscripciones.append((asignatura_id, alumno_id))
+		self.inscripciones = self.crear(models.Asignatura_Alumno, (
+			models.Asignatura_Alumno(asignatura_id=asignatura_id, alumno_id=alumno_id) for asignatura_id, alumno_id in inscripciones
+		))
+
+		def presentes():
+			for inscripcion_id, (asignatura_id, alumno_id) in zip(self.inscripciones, inscripciones):
+				for fecha in self.dias:
+					if fecha.weekday() in dias[asignatura_id] and self.random.random() < 0.92:
+						yield models.Asistencia_Alumno(fecha=fecha, asignatura_alumno_id=inscripcion_id)
+
+		self.crear(models.Asistencia_Alumno, presentes())
+		# bulk_create no emite señales: los resúmenes se calculan de una vez.
+		asistencias.recalcular()
+
+	def generar_evaluaciones(self):
+		# Cada lapso tiene evaluaciones que suman 100 % (la nota de Evaluacion
+		# es su ponderación) y las notas de los alumnos van de 1 a 20.
+		duracion = (self.fin - self.inicio) / LAPSOS
+		evaluaciones = []
+		for lapso in range(LAPSOS):
+			inicio_lapso = self.inicio + duracion * lapso
+			for i in range(EVALUACIONES_POR_LAPSO):
+				fecha_inicio = inicio_lapso + duracion * i / EVALUACIONES_POR_LAPSO
+				evaluaciones.append(models.Evaluacion(
+					nombre='Evaluación %d.%d' % (lapso + 1, i + 1), nota=100 // EVALUACIONES_POR_LAPSO, lapso=lapso + 1,
+					fecha_inicio=fecha_inicio, fecha_fin=fecha_inicio + datetime.timedelta(days=7),
+				))
+		ids = self.crear(models.Evaluacion, evaluaciones)
+		self.crear(models.Evaluacion_Alumno, (
+			models.Evaluacion_Alumno(
+				nota=min(20, max(1, round(self.random.gauss(14, 3)))), fecha=evaluacion.fecha_fin,
+				asignatura_alumno_id=inscripcion_id, evaluacion_id=evaluacion_id,
+			)
+			for inscripcion_id in self.inscripciones
+			for evaluacion_id, evaluacion in zip(ids, evaluaciones)
+		))
+		notas.recalcular()
+
+
+def generar(escala=1.0, anio=2021, semilla=0):
+	return Generador(escala, anio, semilla).generar()
@@ -1,16 +1,30 @@
 from django import template
+from app import miniaturas
 from app.models import Personal, Alumno
 
 register = template.Library()
 
-@register.simple_tag
-def get_user_lca(usuario):
+@register.simple_tag(takes_context=True)
+def get_user_lca(context, usuario):
+	request = context.get('request')
+	if hasattr(request, 'lca_profile') and request.user == usuario:
+		return request.lca_profile
 	grupo = usuario.groups.all()[0].name
 	if grupo == 'alumno':
 		return Alumno.objects.get(usuario_id=usuario.id)
 	else:
 		return Personal.objects.get(usuario_id=usuario.id)
 
-@register.simple_tag
-def get_grupo_lca(grupos):
-	return grupos.all()[0].name
\ No newline at end of file
+@register.simple_tag(takes_context=True)
+def get_grupo_lca(context, grupos):
+	request = context.get('request')
+	if hasattr(request, 'lca_group') and request.user == grupos.instance:
+		return request.lca_group
+	return grupos.all()[0].name
+
+@register.simple_tag(takes_context=True)
+def miniatura(context, imagen, rendicion='avatar'):
+	request = context.get('request')
+	# Los navegadores que aceptan WebP lo anuncian también al pedir la página.
+	webp = request is None or 'image/webp' in request.headers.get('Accept', '')
+	return miniaturas.get_url(imagen, rendicion, webp)
@@ -1,3 +1,482 @@
-from django.test import TestCase
+import datetime
+import json
+import posixpath
+import io
+import random
+import tempfile
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User, Group
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.db.models import Sum
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from PIL import Image
+
+from . import asistencias, horarios, inventario, models, notas, rendimiento, sinteticos, versiones, views
+from .almacenamiento import RecipesStorage
+from .metricas import PresupuestoExcedido
+
+GRUPOS = ['secretario', 'profesor', 'administrativo', 'obrero', 'alumno']
+
+FECHA = datetime.date(2021, 7, 16)
+
+# Las pruebas no tocan la caché en archivos del servidor.
+CACHE_PRUEBAS = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+def crear_personal(cedula, cargo='A', grupo='secretario'):
+	usuario = User.objects.create_user(cedula, None, cedula)
+	Group.objects.get(name=grupo).user_set.add(usuario)
+	return models.Personal.objects.create(
+		cedula=cedula, nombre='Personal %s' % cedula, telefono='0', direccion='-',
+		cargo=cargo, horas=20 if cargo == 'P' else None, salario=100,
+		fecha_nacimiento=FECHA, fecha_inicio=FECHA, imagen='media/perfiles/%s.jpg' % cedula,
+		usuario=usuario,
+	)
+
+
+def poblar(indice):
+	"""Crea una fila de cada modelo con sus relaciones."""
+	cedula = str(1000 + indice)
+	personal = crear_personal(cedula, 'P', 'profesor')
+	tipo = models.Tipo_Bien.objects.create(nombre='Tipo %d' % indice)
+	departamento = models.Departamento.objects.create(nombre='Departamento %d' % indice)
+	departamento.personal.add(personal)
+	bien = models.Bien.objects.create(nombre='Bien %d' % indice, status='A', fecha=FECHA, tipo=tipo, departamento=departamento)
+	models.Reporte.objects.create(bien=bien)
+	models.Permiso.objects.create(fecha_inicio=FECHA, fecha_fin=FECHA, imagen='media/recipes/x.png', personal=personal)
+	models.Memorandum.objects.create(observacion='-', fecha=FECHA, personal=personal)
+	models.Asistencia_Personal.objects.create(fecha=FECHA, horas=4, personal=personal)
+	asignatura = models.Asignatura.objects.create(nombre='Asignatura %d' % indice, personal=personal)
+	models.Horario.objects.create(dia='LU', hora_inicio=datetime.time(7), hora_fin=datetime.time(8), asignatura=asignatura)
+	representante = models.Representante.objects.create(cedula=cedula, nombre='Representante', telefono='0', direccion='-')
+	usuario = User.objects.create_user('a' + cedula, None, cedula)
+	alumno = models.Alumno.objects.create(
+		cedula=cedula, nombre='Alumno %d' % indice, telefono='0', direccion='-',
+		fecha_nacimiento=FECHA, imagen='media/perfiles/a%s.jpg' % cedula,
+		representante=representante, usuario=usuario,
+	)
+	inscripcion = models.Asignatura_Alumno.objects.create(asignatura=asignatura, alumno=alumno)
+	models.Asistencia_Alumno.objects.create(fecha=FECHA, asignatura_alumno=inscripcion)
+	actividad = models.Actividad.objects.create(fecha=FECHA, descripcion='-')
+	actividad.participantes.add(personal)
+
+
+@override_settings(METRICAS_ESTRICTO=True, CACHES=CACHE_PRUEBAS)
+class BaseTest(TestCase):
+
+	def setUp(self):
+		# La caché sobrevive entre pruebas y los id se repiten.
+		cache.clear()
+		for nombre in GRUPOS:
+			Group.objects.create(name=nombre)
+		self.secretario = crear_personal('1')
+		self.client.force_login(self.secretario.usuario)
+		self.client.get('/perfil/')
+
+	def contar_consultas(self, url):
+		with CaptureQueriesContext(connection) as consultas:
+			respuesta = self.client.get(url)
+		self.assertEqual(respuesta.status_code, 200, url)
+		return len(consultas)
+
+
+class ConsultasTest(BaseTest):
+	"""Las páginas deben costar las mismas consultas sin importar las filas."""
+
+	DATOS = [
+		'tipo_bien', 'personal', 'departamento', 'bien', 'reporte', 'permiso',
+		'memorandum', 'asistencia_personal', 'asignatura', 'horario',
+		'representante', 'alumno', 'asignatura_alumno', 'asistencia_alumno', 'actividad',
+	]
+
+	DETALLES = ['departamento', 'bien', 'reporte', 'permiso', 'memorandum', 'asignatura', 'horario', 'alumno', 'actividad']
+
+	def test_datos(self):
+		poblar(1)
+		antes = {nombre: self.contar_consultas('/%s/datos/' % nombre) for nombre in self.DATOS}
+		for indice in range(2, 6):
+			poblar(indice)
+		for nombre in self.DATOS:
+			self.assertEqual(self.contar_consultas('/%s/datos/' % nombre), antes[nombre], nombre)
+
+	def test_detalles(self):
+		poblar(1)
+		antes = {nombre: self.contar_consultas('/%s/ver/1/' % nombre) for nombre in self.DETALLES}
+		departamento = models.Departamento.objects.get(id=1)
+		actividad = models.Actividad.objects.get(id=1)
+		for indice in range(2, 6):
+			personal = crear_personal(str(2000 + indice))
+			departamento.personal.add(personal)
+			actividad.participantes.add(personal)
+		for nombre in self.DETALLES:
+			self.assertEqual(self.contar_consultas('/%s/ver/1/' % nombre), antes[nombre], nombre)
+
+
+class PerfilTest(BaseTest):
+	"""Un cambio de grupo se respeta en la petición siguiente."""
+
+	def test_grupo_quitado(self):
+		self.assertEqual(self.client.get('/tipo_bien/').status_code, 200)
+		self.secretario.usuario.groups.clear()
+		self.assertEqual(self.client.get('/tipo_bien/').status_code, 302)
+
+	def test_version_vence(self):
+		# Sin m2m_changed, como un proceso que no vio la invalidación.
+		User.groups.through.objects.filter(user_id=self.secretario.usuario_id).delete()
+		self.assertEqual(self.client.get('/tipo_bien/').status_code, 200)
+		despues = time.time() + settings.PERFIL_VERSION_TIMEOUT + 1
+		with mock.patch('time.time', return_value=despues):
+			self.assertEqual(self.client.get('/tipo_bien/').status_code, 302)
+
+
+class PlanillaTest(BaseTest):
+	"""La planilla de asistencia no se guarda a medias."""
+
+	def get_campo(self, dia):
+		return 'h_%d_%s' % (self.secretario.id, dia.strftime('%Y%m%d'))
+
+	def test_celdas_invalidas(self):
+		datos = {'desde': '2021-07-12', 'periodo': 'semana'}
+		datos[self.get_campo(datetime.date(2021, 7, 12))] = '25'
+		datos[self.get_campo(datetime.date(2021, 7, 13))] = '4'
+		respuesta = self.client.post('/asistencia_personal/planilla/', datos)
+		self.assertContains(respuesta, 'is-invalid')
+		self.assertContains(respuesta, '"25"')
+		self.assertContains(respuesta, 'value="4"')
+		self.assertFalse(models.Asistencia_Personal.objects.exists())
+
+
+class ImportarTest(BaseTest):
+	"""La importación guarda las filas válidas y reporta las demás."""
+
+	def importar(self, tipo, lineas, codificacion='utf-8'):
+		archivo = SimpleUploadedFile('datos.csv', '\n'.join(lineas).encode(codificacion), 'text/csv')
+		respuesta = self.client.post('/importar/', {'tipo': tipo, 'archivo': archivo})
+		self.assertEqual(respuesta.status_code, 200)
+		return respuesta.context['errores']
+
+	def test_filas_validas(self):
+		lineas = ['cedula,nombre,telefono,direccion,correo,cargo,horas,salario,fecha_nacimiento,fecha_inicio']
+		lineas += ['%d,Personal %d,0,-,p%d@lca.com,P,20,100,2000-01-01,2021-01-01' % (2000 + i, i, i) for i in range(3)]
+		transacciones = []
+
+		def hashear(claves):
+			transacciones.append(len(connection.savepoint_ids))
+			return ['!'] * len(claves)
+
+		with mock.patch('app.importar.hashear', side_effect=hashear):
+			errores = self.importar('personal', lineas)
+		self.assertEqual(errores, [])
+		# Las claves se calculan antes de abrir la transacción de escritura.
+		self.assertEqual(transacciones, [len(connection.savepoint_ids)])
+		self.assertEqual(models.Personal.objects.filter(cedula__startswith='2').count(), 3)
+		self.assertEqual(Group.objects.get(name='profesor').user_set.count(), 3)
+
+	def test_cedula_repetida(self):
+		models.Representante.objects.create(cedula='10', nombre='Representante', telefono='0', direccion='-')
+		errores = self.importar('representante', [
+			'cedula,nombre,telefono,direccion', '10,Uno,0,-', '11,Dos,0,-', '11,Tres,0,-',
+		])
+		self.assertEqual([linea for linea, mensaje in errores], [4, 2])
+		self.assertEqual(models.Representante.objects.count(), 2)
+
+	def test_faltan_columnas(self):
+		errores = self.importar('representante', ['cedula,nombre', '10,Uno'])
+		self.assertEqual(errores, [(1, 'Faltan columnas: telefono, direccion.')])
+		self.assertFalse(models.Representante.objects.exists())
+
+	def test_codificacion(self):
+		# El error de codificación llega después de varios lotes leídos.
+		lineas = ['cedula,nombre,telefono,direccion']
+		lineas += ['%d,Representante %d,0,-' % (10 + i, i) for i in range(2000)]
+		lineas.append('9999,Peña,0,-')
+		errores = self.importar('representante', lineas, 'latin-1')
+		self.assertEqual(errores, [(None, 'El archivo debe estar codificado en UTF-8. No se importó ningún registro.')])
+		self.assertFalse(models.Representante.objects.exists())
+
+	def test_csv_invalido(self):
+		lineas = ['cedula,nombre,telefono,direccion', '10,Uno,0,-', '11,%s,0,-' % ('x' * 200000)]
+		errores = self.importar('representante', lineas)
+		self.assertEqual(len(errores), 1)
+		self.assertIn('no es un CSV válido', errores[0][1])
+		self.assertFalse(models.Representante.objects.exists())
+
+
+class NotasTest(BaseTest):
+	"""El resumen incremental de notas coincide con recalcularlo."""
+
+	def get_resumen(self):
+		return sorted(models.Promedio_Alumno.objects.values_list('asignatura_alumno_id', 'lapso', 'evaluaciones', 'puntos', 'ponderacion'))
+
+	def assertResumen(self):
+		resumen = self.get_resumen()
+		notas.recalcular()
+		self.assertEqual(resumen, self.get_resumen())
+
+	def test_resumen(self):
+		poblar(1)
+		poblar(2)
+		primera, segunda = models.Asignatura_Alumno.objects.order_by('pk')
+		evaluaciones = [
+			models.Evaluacion.objects.create(nombre='Evaluación %d' % i, nota=nota, lapso=lapso, fecha_inicio=FECHA, fecha_fin=FECHA)
+			for i, (nota, lapso) in enumerate([(20, 1), (30, 1), (50, 2)])
+		]
+		for inscripcion in (primera, segunda):
+			for i, evaluacion in enumerate(evaluaciones):
+				models.Evaluacion_Alumno.objects.create(nota=10 + i, fecha=FECHA, asignatura_alumno=inscripcion, evaluacion=evaluacion)
+		self.assertResumen()
+		nota = models.Evaluacion_Alumno.objects.filter(asignatura_alumno=primera).first()
+		nota.nota = 20
+		nota.save()
+		self.assertResumen()
+		nota.asignatura_alumno = segunda
+		nota.save()
+		self.assertResumen()
+		evaluaciones[0].nota = 40
+		evaluaciones[0].save()
+		self.assertResumen()
+		evaluaciones[1].lapso = 3
+		evaluaciones[1].save()
+		self.assertResumen()
+		nota.delete()
+		self.assertResumen()
+		evaluaciones[2].delete()
+		self.assertResumen()
+		primera.delete()
+		self.assertResumen()
+		segunda.alumno.delete()
+		self.assertResumen()
+		self.assertFalse(models.Promedio_Alumno.objects.exists())
+
+
+class AsistenciasTest(BaseTest):
+	"""Los resúmenes de asistencia incrementales coinciden con recalcularlos."""
+
+	def get_resumenes(self):
+		return (
+			sorted(models.Asistencia_Diaria.objects.values_list('asignatura_id', 'fecha', 'presentes', 'inscritos')),
+			sorted(models.Asistencia_Mensual.objects.values_list('alumno_id', 'anio', 'mes', 'presentes', 'clases')),
+		)
+
+	def assertResumenes(self):
+		resumenes = self.get_resumenes()
+		asistencias.recalcular()
+		self.assertEqual(resumenes, self.get_resumenes())
+
+	def test_inscripciones(self):
+		for indice in range(1, 4):
+			poblar(indice)
+		primera, segunda, tercera = models.Asignatura_Alumno.objects.order_by('pk')
+		otro_dia = FECHA + datetime.timedelta(days=20)
+		models.Asistencia_Alumno.objects.create(fecha=otro_dia, asignatura_alumno=primera)
+		self.assertResumenes()
+		# Inscripción tardía en una asignatura que ya tiene días de clase.
+		tarde = models.Asignatura_Alumno.objects.create(asignatura=primera.asignatura, alumno=segunda.alumno)
+		self.assertResumenes()
+		models.Asistencia_Alumno.objects.filter(asignatura_alumno=primera, fecha=otro_dia).delete()
+		self.assertResumenes()
+		tarde.alumno = tercera.alumno
+		tarde.save()
+		self.assertResumenes()
+		primera.asignatura = segunda.asignatura
+		primera.save()
+		self.assertResumenes()
+		primera.alumno = tercera.alumno
+		primera.asignatura = tercera.asignatura
+		primera.save()
+		self.assertResumenes()
+		tarde.delete()
+		self.assertResumenes()
+		segunda.asignatura.delete()
+		self.assertResumenes()
+		tercera.alumno.delete()
+		self.assertResumenes()
+
+
+class SolapamientosTest(SimpleTestCase):
+	"""El barrido encuentra los mismos pares que comparar todos contra todos."""
+
+	def test_fuerza_bruta(self):
+		azar = random.Random(0)
+		for prueba in range(200):
+			intervalos = []
+			for valor in range(azar.randint(0, 30)):
+				inicio = azar.randint(0, 20)
+				intervalos.append((inicio, inicio + azar.randint(1, 6), valor))
+			esperados = {
+				frozenset((a[2], b[2])) for i, a in enumerate(intervalos) for b in intervalos[i + 1:]
+				if a[0] < b[1] and b[0] < a[1]
+			}
+			pares = [frozenset(par) for par in horarios.solapamientos(intervalos)]
+			self.assertEqual(len(pares), len(esperados), intervalos)
+			self.assertEqual(set(pares), esperados, intervalos)
+
+
+class VersionesTest(BaseTest):
+	"""Una versión que desaparece de la caché no rompe las páginas."""
+
+	@override_settings(METRICAS_ESTRICTO=False)
+	def test_version_perdida(self):
+		# Como si otro proceso la invalidara justo después de crearla. Sin
+		# caché también se pierden los perfiles: hay más consultas.
+		with mock.patch('django.core.cache.backends.locmem.LocMemCache.get', return_value=None):
+			marcas = versiones.get_versiones([models.Tipo_Bien])
+			self.assertIsNotNone(marcas[0])
+			self.assertEqual(self.client.get('/tipo_bien/').status_code, 200)
+			self.assertEqual(self.client.get('/tipo_bien/datos/').status_code, 200)
+
+
+class CondicionalTest(BaseTest):
+	"""GET condicional: 304 mientras nada cambie y 200 después de un cambio."""
+
+	def get(self, **encabezados):
+		return self.client.get('/tipo_bien/', **encabezados)
+
+	def test_cambio_en_el_mismo_segundo(self):
+		with mock.patch('time.time', return_value=time.time()):
+			respuesta = self.get()
+			self.assertEqual(respuesta.status_code, 200)
+			etag, modificado = respuesta['ETag'], respuesta['Last-Modified']
+			self.assertEqual(self.get(HTTP_IF_NONE_MATCH=etag).status_code, 304)
+			self.assertEqual(self.get(HTTP_IF_MODIFIED_SINCE=modificado).status_code, 304)
+			models.Tipo_Bien.objects.create(nombre='Nuevo')
+			self.assertEqual(self.get(HTTP_IF_NONE_MATCH=etag).status_code, 200)
+			respuesta = self.get(HTTP_IF_MODIFIED_SINCE=modificado)
+			self.assertEqual(respuesta.status_code, 200)
+			self.assertNotEqual(respuesta['Last-Modified'], modificado)
+			self.assertEqual(self.get(HTTP_IF_MODIFIED_SINCE=respuesta['Last-Modified']).status_code, 304)
+
+
+@override_settings(RECIPES_MAX_LADO=100)
+class RecipesStorageTest(SimpleTestCase):
+	"""Los recipes idénticos se guardan una sola vez."""
+
+	def setUp(self):
+		directorio = tempfile.TemporaryDirectory()
+		self.addCleanup(directorio.cleanup)
+		self.storage = RecipesStorage(location=directorio.name)
+
+	def get_imagen(self):
+		salida = io.BytesIO()
+		Image.new('RGB', (300, 200), 'red').save(salida, 'PNG')
+		return ContentFile(salida.getvalue())
+
+	def test_imagen_grande(self):
+		nombre = self.storage.save('media/recipes/a.png', self.get_imagen())
+		self.assertTrue(nombre.endswith('.jpg'))
+		with mock.patch.object(RecipesStorage, 'comprimir') as comprimir:
+			self.assertEqual(self.storage.save('media/recipes/b.png', self.get_imagen()), nombre)
+		comprimir.assert_not_called()
+
+	def test_carrera(self):
+		# Las dos subidas pasan la comprobación antes de que exista el archivo.
+		contenido = b'%PDF-1.4 recipe'
+		nombre = self.storage.save('media/recipes/a.pdf', ContentFile(contenido))
+		with mock.patch.object(RecipesStorage, 'exists', return_value=False):
+			self.assertEqual(self.storage.save('media/recipes/b.pdf', ContentFile(contenido)), nombre)
+		self.assertEqual(self.storage.listdir('media/recipes'), ([], [posixpath.basename(nombre)]))
+
+
+class InventarioTest(BaseTest):
+	"""El inventario incremental por departamento coincide con recalcularlo."""
+
+	def get_inventario(self):
+		return sorted(models.Inventario_Departamento.objects.values_list('departamento_id', 'bienes', 'danados', 'reportes_abiertos'))
+
+	def assertInventario(self):
+		inventario_actual = self.get_inventario()
+		inventario.recalcular()
+		self.assertEqual(inventario_actual, self.get_inventario())
+
+	def get_historial(self, bien):
+		return list(models.Historial_Bien.objects.filter(bien=bien).order_by('pk').values_list('anterior', 'status', 'reporte_id'))
+
+	def test_inventario(self):
+		poblar(1)
+		poblar(2)
+		primero, segundo = models.Departamento.objects.order_by('pk')
+		bien = models.Bien.objects.get(departamento=primero)
+		reporte = models.Reporte.objects.get(bien=bien)
+		self.assertInventario()
+		models.Bien.objects.create(nombre='Otro', status='A', fecha=FECHA, tipo=bien.tipo, departamento=primero)
+		self.assertInventario()
+		# El bien se muda con su reporte abierto.
+		bien.departamento = segundo
+		bien.save()
+		self.assertInventario()
+		self.assertEqual(self.get_inventario(), [(primero.pk, 1, 0, 0), (segundo.pk, 2, 0, 2)])
+		respuesta = self.client.post('/reporte/editar/%d/' % reporte.pk, {'observacion': 'Roto', 'status': 'A'})
+		self.assertEqual(respuesta.status_code, 302)
+		self.assertInventario()
+		self.assertEqual(self.get_inventario(), [(primero.pk, 1, 0, 0), (segundo.pk, 2, 1, 1)])
+		inventario.cambiar_status(bien.pk, 'A')
+		self.assertInventario()
+		self.assertEqual(self.get_historial(bien), [(None, 'A', None), ('A', 'D', reporte.pk), ('D', 'A', None)])
+		bien.delete()
+		self.assertInventario()
+		segundo.delete()
+		self.assertInventario()
+		self.assertEqual(self.get_inventario(), [(primero.pk, 1, 0, 0)])
+
+
+class MetricasTest(BaseTest):
+	"""Los presupuestos de consultas se cumplen y se exponen las métricas."""
+
+	def setUp(self):
+		super().setUp()
+		for indice in range(1, 4):
+			poblar(indice)
+
+	def test_presupuestos(self):
+		urls = ['/', '/personal/', '/asistencia_personal/planilla/', '/asistencia_personal/horas/', '/buscar/?q=personal']
+		urls += ['/%s/datos/' % nombre for nombre in ConsultasTest.DATOS]
+		urls += ['/%s/ver/1/' % nombre for nombre in ConsultasTest.DETALLES]
+		for url in urls:
+			self.assertEqual(self.client.get(url).status_code, 200, url)
+
+	def test_presupuesto_excedido(self):
+		with mock.patch.object(views.DatosBien, 'presupuesto_consultas', 1):
+			with self.assertRaises(PresupuestoExcedido):
+				self.client.get('/bien/datos/')
+
+	def test_server_timing(self):
+		respuesta = self.client.get('/bien/datos/')
+		self.assertIn('desc="', respuesta['Server-Timing'])
+		self.assertIn('total;dur=', respuesta['Server-Timing'])
+
+	@override_settings(METRICAS_TOKEN='secreto')
+	def test_endpoint(self):
+		self.client.get('/bien/datos/')
+		respuesta = self.client.get('/metricas/')
+		self.assertContains(respuesta, 'lca_peticiones_total{vista="datos_bien",metodo="GET",estado="200"}')
+		self.client.logout()
+		self.assertEqual(self.client.get('/metricas/').status_code, 403)
+		respuesta = self.client.get('/metricas/', HTTP_AUTHORIZATION='Bearer secreto')
+		self.assertEqual(respuesta.status_code, 200)
+
+
+class RendimientoTest(BaseTest):
+	"""El generador y el banco de pruebas cubren todas las vistas sin errores."""
+
+	def test_escenarios(self):
+		creados = sinteticos.generar(escala=0.002)
+		self.assertEqual(creados['app.Personal'], sinteticos.VOLUMENES['personal'][1])
+		self.assertEqual(models.Horas_Personal.objects.aggregate(n=Sum('dias'))['n'], models.Asistencia_Personal.objects.count())
+		escenarios = [escenario for escenario in rendimiento.get_escenarios() if escenario.nombre != 'personal_pdf']
+		self.assertEqual({escenario.tipo for escenario in escenarios}, set(rendimiento.TIPOS))
+		resultados = rendimiento.ejecutar(escenarios, repeticiones=2)
+		for nombre, resultado in resultados.items():
+			esperado = 302 if resultado['metodo'] == 'POST' else 200
+			self.assertEqual(resultado['estado'], esperado, nombre)
+			self.assertLessEqual(resultado['p50_ms'], resultado['p95_ms'])
+		actual = rendimiento.informe(resultados, rendimiento.get_volumenes())
+		anterior = json.loads(json.dumps(actual))
+		anterior['vistas']['datos_bien']['p95_ms'] = actual['vistas']['datos_bien']['p95_ms'] * 2
+		self.assertEqual(rendimiento.comparar(anterior, actual)[0][0], 'datos_bien')
@@ -1,76 +1,115 @@
 from django.urls import path
 from . import views
+from .pdf import estado_pdf
+from .miniaturas import servir as servir_miniatura
+from .metricas import metricas
 
 urlpatterns = [
 	path('', views.Index.as_view(), name="index"),
 	path('perfil/', views.Perfil.as_view(), name="perfil"),
 	path('perfil/editar/', views.EditarPerfil.as_view(), name="editar_perfil"),
 	path('tipo_bien/', views.TipoBien.as_view(), name="tipo_bien"),
+	path('tipo_bien/datos/', views.DatosTipoBien.as_view(), name="datos_tipo_bien"),
 	path('tipo_bien/agregar/', views.AgregarTipoBien.as_view(), name="agregar_tipo_bien"),
 	path('tipo_bien/ver/<int:pk>/', views.VerTipoBien.as_view(), name="ver_tipo_bien"),
 	path('tipo_bien/editar/<int:pk>/', views.EditarTipoBien.as_view(), name="editar_tipo_bien"),
 	path('tipo_bien/eliminar/<int:pk>/', views.EliminarTipoBien.as_view(), name="eliminar_tipo_bien"),
 	path('personal/', views.Personal.as_view(), name="personal"),
+	path('personal/datos/', views.DatosPersonal.as_view(), name="datos_personal"),
 	path('personal/agregar/', views.AgregarPersonal.as_view(), name="agregar_personal"),
 	path('personal/ver/<int:pk>/', views.VerPersonal.as_view(), name="ver_personal"),
 	path('personal/editar/<int:pk>/', views.EditarPersonal.as_view(), name="editar_personal"),
 	path('personal/incorporar/<personal_id>/', views.IncorporarPersonal.as_view(), name="incorporar_personal"),
 	path('personal/desincorporar/<personal_id>/', views.DesincorporarPersonal.as_view(), name="desincorporar_personal"),
 	path('departamento/', views.Departamento.as_view(), name="departamento"),
+	path('departamento/datos/', views.DatosDepartamento.as_view(), name="datos_departamento"),
 	path('departamento/agregar/', views.AgregarDepartamento.as_view(), name="agregar_departamento"),
 	path('departamento/ver/<int:pk>/', views.VerDepartamento.as_view(), name="ver_departamento"),
 	path('departamento/editar/<int:pk>/', views.EditarDepartamento.as_view(), name="editar_departamento"),
 	path('bien/', views.Bien.as_view(), name="bien"),
+	path('bien/datos/', views.DatosBien.as_view(), name="datos_bien"),
+	path('bien/inventario/', views.Inventario.as_view(), name="inventario"),
 	path('bien/agregar/', views.AgregarBien.as_view(), name="agregar_bien"),
 	path('bien/ver/<int:pk>/', views.VerBien.as_view(), name="ver_bien"),
 	path('bien/editar/<int:pk>/', views.EditarBien.as_view(), name="editar_bien"),
 	path('bien/eliminar/<int:pk>/', views.EliminarBien.as_view(), name="eliminar_bien"),
 	path('reporte/', views.Reporte.as_view(), name="reporte"),
+	path('reporte/datos/', views.DatosReporte.as_view(), name="datos_reporte"),
 	path('reporte/agregar/', views.AgregarReporte.as_view(), name="agregar_reporte"),
 	path('reporte/ver/<int:pk>/', views.VerReporte.as_view(), name="ver_reporte"),
 	path('reporte/editar/<int:pk>/', views.EditarReporte.as_view(), name="editar_reporte"),
 	path('permiso/', views.Permiso.as_view(), name="permiso"),
+	path('permiso/datos/', views.DatosPermiso.as_view(), name="datos_permiso"),
 	path('permiso/agregar/secretario/', views.AgregarSecretarioPermiso.as_view(), name="agregar_secretario_permiso"),
 	path('permiso/agregar/personal/', views.AgregarPersonalPermiso.as_view(), name="agregar_personal_permiso"),
 	path('permiso/ver/<int:pk>/', views.VerPermiso.as_view(), name="ver_permiso"),
+	path('permiso/recipe/<int:pk>/', views.RecipePermiso.as_view(), name="recipe_permiso"),
 	path('permiso/editar/<int:pk>/', views.EditarPermiso.as_view(), name="editar_permiso"),
 	path('memorandum/', views.Memorandum.as_view(), name="memorandum"),
+	path('memorandum/datos/', views.DatosMemorandum.as_view(), name="datos_memorandum"),
 	path('memorandum/agregar/', views.AgregarMemorandum.as_view(), name="agregar_memorandum"),
 	path('memorandum/ver/<int:pk>/', views.VerMemorandum.as_view(), name="ver_memorandum"),
 	path('memorandum/editar/<int:pk>/', views.EditarMemorandum.as_view(), name="editar_memorandum"),
 	path('memorandum/eliminar/<int:pk>/', views.EliminarMemorandum.as_view(), name="eliminar_memorandum"),
 	path('asistencia_personal/', views.AsistenciaPersonal.as_view(), name="asistencia_personal"),
+	path('asistencia_personal/datos/', views.DatosAsistenciaPersonal.as_view(), name="datos_asistencia_personal"),
 	path('asistencia_personal/agregar/', views.AgregarAsistenciaPersonal.as_view(), name="agregar_asistencia_personal"),
+	path('asistencia_personal/planilla/', views.PlanillaAsistenciaPersonal.as_view(), name="planilla_asistencia_personal"),
+	path('asistencia_personal/horas/', views.HorasPersonal.as_view(), name="horas_personal"),
 	path('asistencia_personal/editar/<int:pk>/', views.EditarAsistenciaPersonal.as_view(), name="editar_asistencia_personal"),
 	path('asistencia_personal/eliminar/<int:pk>/', views.EliminarAsistenciaPersonal.as_view(), name="eliminar_asistencia_personal"),
 	path('asignatura/', views.Asignatura.as_view(), name="asignatura"),
+	path('asignatura/datos/', views.DatosAsignatura.as_view(), name="datos_asignatura"),
 	path('asignatura/agregar/', views.AgregarAsignatura.as_view(), name="agregar_asignatura"),
 	path('asignatura/ver/<int:pk>/', views.VerAsignatura.as_view(), name="ver_asignatura"),
 	path('asignatura/editar/<int:pk>/', views.EditarAsignatura.as_view(), name="editar_asignatura"),
+	path('asignatura/notas/<int:pk>/', views.NotasAsignatura.as_view(), name="notas_asignatura"),
+	path('asignatura/horario/<int:pk>/', views.HorarioAsignatura.as_view(), name="horario_asignatura"),
 	path('horario/', views.Horario.as_view(), name="horario"),
+	path('horario/datos/', views.DatosHorario.as_view(), name="datos_horario"),
+	path('horario/semanal/', views.HorarioSemanal.as_view(), name="horario_semanal"),
+	path('horario/semanal/<int:pk>/', views.HorarioSemanal.as_view(), name="horario_personal"),
 	path('horario/agregar/', views.AgregarHorario.as_view(), name="agregar_horario"),
 	path('horario/ver/<int:pk>/', views.VerHorario.as_view(), name="ver_horario"),
 	path('horario/editar/<int:pk>/', views.EditarHorario.as_view(), name="editar_horario"),
 	path('horario/eliminar/<int:pk>/', views.EliminarHorario.as_view(), name="eliminar_horario"),
 	path('representante/', views.Representante.as_view(), name="representante"),
+	path('representante/datos/', views.DatosRepresentante.as_view(), name="datos_representante"),
 	path('representante/agregar/', views.AgregarRepresentante.as_view(), name="agregar_representante"),
 	path('representante/ver/<int:pk>/', views.VerRepresentante.as_view(), name="ver_representante"),
 	path('representante/editar/<int:pk>/', views.EditarRepresentante.as_view(), name="editar_representante"),
 	path('alumno/', views.Alumno.as_view(), name="alumno"),
+	path('alumno/datos/', views.DatosAlumno.as_view(), name="datos_alumno"),
 	path('alumno/agregar/', views.AgregarAlumno.as_view(), name="agregar_alumno"),
+	path('importar/', views.Importar.as_view(), name="importar"),
+	path('buscar/', views.Buscar.as_view(), name="buscar"),
+	path('metricas/', metricas, name="metricas"),
+	path('media/miniaturas/<path:ruta>', servir_miniatura, name="miniatura"),
 	path('alumno/ver/<int:pk>/', views.VerAlumno.as_view(), name="ver_alumno"),
 	path('alumno/editar/<int:pk>/', views.EditarAlumno.as_view(), name="editar_alumno"),
 	path('asignatura_alumno/', views.AsignaturaAlumno.as_view(), name="asignatura_alumno"),
+	path('asignatura_alumno/datos/', views.DatosAsignaturaAlumno.as_view(), name="datos_asignatura_alumno"),
 	path('asignatura_alumno/agregar/', views.AgregarAsignaturaAlumno.as_view(), name="agregar_asignatura_alumno"),
 	path('asignatura_alumno/editar/<int:pk>/', views.EditarAsignaturaAlumno.as_view(), name="editar_asignatura_alumno"),
 	path('asignatura_alumno/eliminar/<int:pk>/', views.EliminarAsignaturaAlumno.as_view(), name="eliminar_asignatura_alumno"),
 	path('asistencia_alumno/', views.AsistenciaAlumno.as_view(), name="asistencia_alumno"),
+	path('asistencia_alumno/datos/', views.DatosAsistenciaAlumno.as_view(), name="datos_asistencia_alumno"),
 	path('asistencia_alumno/agregar/', views.AgregarAsistenciaAlumno.as_view(), name="agregar_asistencia_alumno"),
+	path('asistencia_alumno/clase/', views.AsistenciaClase.as_view(), name="asistencia_clase"),
+	path('asistencia_alumno/estadisticas/', views.EstadisticasAsistencia.as_view(), name="estadisticas_asistencia"),
 	path('asistencia_alumno/editar/<int:pk>/', views.EditarAsistenciaAlumno.as_view(), name="editar_asistencia_alumno"),
 	path('asistencia_alumno/eliminar/<int:pk>/', views.EliminarAsistenciaAlumno.as_view(), name="eliminar_asistencia_alumno"),
 	path('actividad/', views.Actividad.as_view(), name="actividad"),
+	path('actividad/datos/', views.DatosActividad.as_view(), name="datos_actividad"),
 	path('actividad/agregar/', views.AgregarActividad.as_view(), name="agregar_actividad"),
 	path('actividad/ver/<int:pk>/', views.VerActividad.as_view(), name="ver_actividad"),
 	path('actividad/editar/<int:pk>/', views.EditarActividad.as_view(), name="editar_actividad"),
 	path('export/personal/', views.personal_pdf, name="personal_pdf"),
+	path('export/estado/<slug:trabajo>/', estado_pdf, name="estado_pdf"),
+	path('export/alumno/<str:formato>/', views.ExportarAlumno.as_view(), name="exportar_alumno"),
+	path('export/asistencia_alumno/<str:formato>/', views.ExportarAsistenciaAlumno.as_view(), name="exportar_asistencia_alumno"),
+	path('export/asistencia_personal/<str:formato>/', views.ExportarAsistenciaPersonal.as_view(), name="exportar_asistencia_personal"),
+	path('export/evaluacion_alumno/<str:formato>/', views.ExportarEvaluacionAlumno.as_view(), name="exportar_evaluacion_alumno"),
+	path('export/bien/<str:formato>/', views.ExportarBien.as_view(), name="exportar_bien"),
+	path('export/reporte/<str:formato>/', views.ExportarReporte.as_view(), name="exportar_reporte"),
 ]
\ No newline at end of file
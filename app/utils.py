@@ -3,11 +3,18 @@ from io import BytesIO
 import xhtml2pdf.pisa as pisa
 from django.http import HttpResponse
 
-def render_to_pdf(template_src, context_dict={}):
-    template = get_template(template_src)
+def render_pdf_bytes(template_src, context_dict={}):
+    # Acepta el nombre de la plantilla o una ya compilada
+    template = get_template(template_src) if isinstance(template_src, str) else template_src
     html = template.render(context_dict)
     result = BytesIO()
-    pdf = pisa.pisaDocument(BytesIO(html.encode("ISO-8859-1")), result)
+    pdf = pisa.pisaDocument(BytesIO(html.encode("utf-8")), result, encoding="utf-8")
     if not pdf.err:
-        return HttpResponse(result.getvalue(), content_type='application/pdf')
+        return result.getvalue()
+    return None
+
+def render_to_pdf(template_src, context_dict={}):
+    pdf = render_pdf_bytes(template_src, context_dict)
+    if pdf is not None:
+        return HttpResponse(pdf, content_type='application/pdf')
     return None
\ No newline at end of file
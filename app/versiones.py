@@ -0,0 +1,75 @@
+import datetime
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+
+
+def clave_version(model):
+	return 'lca_version:%s' % model._meta.label_lower
+
+
+def clave_cambio(model):
+	return 'lca_cambio:%s' % model._meta.label_lower
+
+
+def get_versiones(modelos):
+	"""
+	Versión actual de cada modelo. Cambiar un modelo borra su versión y la
+	próxima lectura crea otra, así que las claves que la incluyen caducan.
+	Las versiones también vencen a los VERSIONES_TIMEOUT segundos. Cada una
+	lleva el segundo del último cambio del modelo, su fecha de modificación.
+	"""
+	claves = [clave_version(model) for model in modelos]
+	versiones = cache.get_many(claves)
+	for model, clave in zip(modelos, claves):
+		if versiones.get(clave) is None:
+			segundos = cache.get(clave_cambio(model)) or int(time.time())
+			nueva = '%s.%d' % (uuid.uuid4().hex, segundos)
+			cache.add(clave, nueva, settings.VERSIONES_TIMEOUT)
+			# Otro proceso pudo invalidarla (o la caché descartarla) entre
+			# add y get: esta petición usa la que acaba de crear.
+			versiones[clave] = cache.get(clave) or nueva
+	return [versiones[clave] for clave in claves]
+
+
+def get_segundos(version):
+	return int(version.rsplit('.', 1)[1])
+
+
+def get_fecha(versiones):
+	"""La fecha más reciente de un grupo de versiones."""
+	segundos = max([get_segundos(version) for version in versiones] or [0])
+	return datetime.datetime.fromtimestamp(segundos, datetime.timezone.utc)
+
+
+def registrar_cambio(modelos):
+	"""
+	Anota el segundo del cambio y borra las versiones. Last-Modified solo
+	tiene segundos: si ya se sirvió una versión con el segundo actual (o
+	uno posterior), el cambio queda un segundo después de ella para que
+	If-Modified-Since no responda 304 con datos viejos.
+	"""
+	claves = [clave_version(model) for model in modelos]
+	cambios = [clave_cambio(model) for model in modelos]
+	actuales = cache.get_many(claves + cambios)
+	ahora = int(time.time()) + 1
+	marcas = {}
+	for clave, cambio in zip(claves, cambios):
+		if actuales.get(clave):
+			marcas[cambio] = max(ahora, get_segundos(actuales[clave]) + 1)
+		else:
+			marcas[cambio] = max(ahora, actuales.get(cambio) or 0)
+	# Perder la marca solo hace que la próxima versión use la hora actual.
+	cache.set_many(marcas, None)
+	cache.delete_many(claves)
+
+
+def invalidar(*modelos):
+	registrar_cambio(modelos)
+	# Dentro de una transacción se repite al confirmarla: otra petición pudo
+	# leer los datos anteriores y guardarlos con la versión nueva.
+	if connection.in_atomic_block:
+		transaction.on_commit(lambda: registrar_cambio(modelos))
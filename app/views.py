@@ -2,34 +2,111 @@ from django.views import View
 from django.views.generic import TemplateView
 from django.views.generic.detail import DetailView
 from django.views.generic.list import ListView
-from django.views.generic.edit import CreateView, UpdateView, DeleteView
+from django.views.generic.edit import CreateView, UpdateView, DeleteView, FormView
 from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
 from django.contrib import messages
 from django.contrib.messages.views import SuccessMessageMixin
 from django.utils import timezone
-from django.http import HttpResponse
-
-from .utils import render_to_pdf
+from django.utils.dateparse import parse_date
+from django.utils.formats import localize
+from django.db import transaction
+from django.db.models import Min, Prefetch
+from django.http import Http404, JsonResponse
+from django.conf import settings
+from django.core.cache import cache
+
+from . import asistencias, busqueda, horarios, inventario, notas, versiones
+from .almacenamiento import enviar_archivo
+from .pdf import ExportarPDF
+from .exportar import ExportarTabla
+from .forms import AsistenciaClaseForm, ImportarForm
+from .importar import IMPORTADORES
+from .horas import Deltas
+from .datatables import DataTableView
+from .condicional import CondicionalMixin
 
 from django.contrib.auth.models import User, Group
 from . import models
 
-from braces.views import LoginRequiredMixin, GroupRequiredMixin
+from braces.views import LoginRequiredMixin
+from braces.views import GroupRequiredMixin as BracesGroupRequiredMixin
 
+import csv
 import datetime
+import hashlib
+import io
+
+class GroupRequiredMixin(BracesGroupRequiredMixin):
+
+	def check_membership(self, groups):
+		if self.request.user.is_superuser:
+			return True
+		return self.request.lca_group in groups
+
+class RelacionesMixin:
+	select_related = ()
+	prefetch_related = ()
+
+	def get_queryset(self):
+		queryset = super().get_queryset()
+		if self.select_related:
+			queryset = queryset.select_related(*self.select_related)
+		if self.prefetch_related:
+			queryset = queryset.prefetch_related(*self.prefetch_related)
+		return queryset
+
+class CacheMixin:
+	"""
+	Guarda las filas de un DataTableView en la caché. La clave lleva la
+	vista, el grupo (y el usuario con cache_por_usuario), los parámetros y
+	la versión de cada modelo de modelos_cache, que las señales cambian al
+	modificarlos (app/versiones.py). Sin modelos_cache no se guarda nada.
+	"""
+	modelos_cache = ()
+	cache_por_usuario = False
+	# Parámetros que cambian en cada petición de DataTables.
+	parametros_ignorados = ('draw', '_')
+
+	def get_clave_cache(self, params):
+		partes = [type(self).__name__, self.get_grupo() or '']
+		if self.cache_por_usuario:
+			partes.append(str(self.request.user.id))
+		partes.extend(versiones.get_versiones(self.modelos_cache))
+		partes.extend('%s=%s' % (nombre, valores) for nombre, valores in sorted(params.lists()) if nombre not in self.parametros_ignorados)
+		return 'lca_datos:%s' % hashlib.sha1('\n'.join(partes).encode()).hexdigest()
+
+	def get_datos(self, params):
+		if not self.modelos_cache:
+			return super().get_datos(params)
+		clave = self.get_clave_cache(params)
+		datos = cache.get(clave)
+		if datos is None:
+			datos = super().get_datos(params)
+			cache.set(clave, datos, settings.CACHE_VISTAS_TIMEOUT)
+		return datos
+
+class Datos(CacheMixin, RelacionesMixin, GroupRequiredMixin, DataTableView):
+	presupuesto_consultas = 4
+
+	def get_grupo(self):
+		return self.request.lca_group
+
+	def get_actions_context(self):
+		return {'usuario_grupo': self.get_grupo()}
 
 class Index(LoginRequiredMixin, TemplateView):
 	template_name = "index.html"
+	presupuesto_consultas = 3
 
-class Perfil(LoginRequiredMixin, DetailView):
+class Perfil(CondicionalMixin, LoginRequiredMixin, DetailView):
 	template_name = "perfil.html"
+	modelos_condicional = [models.Personal, models.Alumno]
 
 	def get_object(self):
-		grupo = self.request.user.groups.all()[0].name
-		if grupo == "alumno":
-			return get_object_or_404(models.Alumno, usuario_id=self.request.user.id)
-		else:
-			return get_object_or_404(models.Personal, usuario_id=self.request.user.id)
+		if not self.request.lca_profile:
+			raise Http404
+		return self.request.lca_profile
 
 class EditarPerfil(LoginRequiredMixin, UpdateView):
 	template_name = "editar.html"
@@ -37,15 +114,13 @@ class EditarPerfil(LoginRequiredMixin, UpdateView):
 	success_url = "/perfil/"
 
 	def get_object(self):
-		grupo = self.request.user.groups.all()[0].name
-		if grupo == "alumno":
-			return get_object_or_404(models.Alumno, usuario_id=self.request.user.id)
-		else:
-			return get_object_or_404(models.Personal, usuario_id=self.request.user.id)
+		if not self.request.lca_profile:
+			raise Http404
+		return self.request.lca_profile
 
 	def get_context_data(self, **kwargs):
 		context = super().get_context_data(**kwargs)
-		context['grupo'] = self.request.user.groups.all()[0].name
+		context['grupo'] = self.request.lca_group
 		return context
 
 	def form_valid(self, form):
@@ -62,11 +137,19 @@ class EditarPerfil(LoginRequiredMixin, UpdateView):
 			obj.save()
 		return super().form_valid(form)
 
-class TipoBien(GroupRequiredMixin, ListView):
+class TipoBien(CondicionalMixin, GroupRequiredMixin, ListView):
 	group_required = u'secretario'
 	template_name = "tipo_bien/index.html"
 	model = models.Tipo_Bien
 
+class DatosTipoBien(Datos):
+	group_required = u'secretario'
+	model = models.Tipo_Bien
+	modelos_cache = [models.Tipo_Bien]
+	columns = [('id', 'id'), ('nombre', 'nombre')]
+	search_fields = ['nombre']
+	actions_template = "tipo_bien/acciones.html"
+
 class AgregarTipoBien(SuccessMessageMixin, GroupRequiredMixin, CreateView):
 	group_required = u'secretario'
 	template_name = "tipo_bien/agregar.html"
@@ -75,7 +158,7 @@ class AgregarTipoBien(SuccessMessageMixin, GroupRequiredMixin, CreateView):
 	success_url = "/tipo_bien/"
 	success_message = "Creado con éxito."
 
-class VerTipoBien(GroupRequiredMixin, DetailView):
+class VerTipoBien(CondicionalMixin, GroupRequiredMixin, DetailView):
 	group_required = u'secretario'
 	template_name = "tipo_bien/ver.html"
 	model = models.Tipo_Bien
@@ -97,11 +180,18 @@ class EliminarTipoBien(SuccessMessageMixin, GroupRequiredMixin, DeleteView):
 		messages.add_message(self.request, messages.INFO, 'Eliminado con éxito.')
 		return self.post(*args, **kwargs)
 
-class Personal(GroupRequiredMixin, ListView):
+class Personal(CondicionalMixin, GroupRequiredMixin, ListView):
 	group_required = u'secretario'
 	template_name = "personal/index.html"
 	model = models.Personal
 
+class DatosPersonal(Datos):
+	group_required = u'secretario'
+	model = models.Personal
+	columns = [('id', 'id'), ('nombre', 'nombre'), ('cargo', 'get_cargo_display'), ('telefono', 'telefono')]
+	search_fields = ['nombre', 'cedula', 'telefono']
+	actions_template = "personal/acciones.html"
+
 class AgregarPersonal(SuccessMessageMixin, GroupRequiredMixin, CreateView):
 	group_required = u'secretario'
 	template_name = "personal/agregar.html"
@@ -122,7 +212,7 @@ class AgregarPersonal(SuccessMessageMixin, GroupRequiredMixin, CreateView):
 		obj.save()
 		return super().form_valid(form)
 
-class VerPersonal(GroupRequiredMixin, DetailView):
+class VerPersonal(CondicionalMixin, GroupRequiredMixin, DetailView):
 	group_required = u'secretario'
 	template_name = "personal/ver.html"
 	model = models.Personal
@@ -145,10 +235,8 @@ class EditarPersonal(SuccessMessageMixin, GroupRequiredMixin, UpdateView):
 		if obj.cargo != 'P':
 			obj.horas = None
 		usuario = User.objects.get(id=obj.usuario.id)
-		usuario_grupo = User.groups.through.objects.get(user=usuario)
 		grupo = Group.objects.get(name=obj.get_cargo_display().casefold())
-		usuario_grupo.group = grupo
-		usuario_grupo.save()
+		usuario.groups.set([grupo])
 		return super().form_valid(form)
 
 class DesincorporarPersonal(GroupRequiredMixin, View):
@@ -171,11 +259,25 @@ class IncorporarPersonal(GroupRequiredMixin, View):
 		messages.add_message(self.request, messages.INFO, 'Incorporado con éxito.')
 		return redirect('/personal/')
 
-class Departamento(GroupRequiredMixin, ListView):
+class Departamento(CondicionalMixin, GroupRequiredMixin, ListView):
 	group_required = u'secretario'
 	template_name = "departamento/index.html"
 	model = models.Departamento
 
+class DatosDepartamento(Datos):
+	group_required = u'secretario'
+	model = models.Departamento
+	modelos_cache = [models.Departamento, models.Personal]
+	columns = [
+		('id', 'id'),
+		('nombre', 'nombre'),
+		(None, lambda obj: ', '.join(str(p) for p in obj.personal.all())),
+	]
+	search_fields = ['nombre']
+	actions_template = "departamento/acciones.html"
+	prefetch_related = ['personal']
+	presupuesto_consultas = 5
+
 class AgregarDepartamento(SuccessMessageMixin, GroupRequiredMixin, CreateView):
 	group_required = u'secretario'
 	template_name = "departamento/agregar.html"
@@ -184,10 +286,12 @@ class AgregarDepartamento(SuccessMessageMixin, GroupRequiredMixin, CreateView):
 	success_url = "/departamento/"
 	success_message = "Creado con éxito."
 
-class VerDepartamento(GroupRequiredMixin, DetailView):
+class VerDepartamento(CondicionalMixin, RelacionesMixin, GroupRequiredMixin, DetailView):
 	group_required = u'secretario'
 	template_name = "departamento/ver.html"
 	model = models.Departamento
+	prefetch_related = ['personal']
+	presupuesto_consultas = 5
 
 class EditarDepartamento(SuccessMessageMixin, GroupRequiredMixin, UpdateView):
 	group_required = u'secretario'
@@ -197,11 +301,28 @@ class EditarDepartamento(SuccessMessageMixin, GroupRequiredMixin, UpdateView):
 	success_url = "/departamento/"
 	success_message = "Editado con éxito."
 
-class Bien(GroupRequiredMixin, ListView):
+class Bien(CondicionalMixin, GroupRequiredMixin, ListView):
 	group_required = [u'secretario', u'profesor']
 	template_name = "bien/index.html"
 	model = models.Bien
 
+class DatosBien(Datos):
+	group_required = [u'secretario', u'profesor']
+	model = models.Bien
+	modelos_cache = [models.Bien, models.Tipo_Bien, models.Departamento, models.Personal]
+	cache_por_usuario = True
+	columns = [('id', 'id'), ('tipo__nombre', 'tipo'), ('nombre', 'nombre'), ('departamento__nombre', 'departamento')]
+	search_fields = ['tipo__nombre', 'nombre', 'departamento__nombre']
+	actions_template = "bien/acciones.html"
+	select_related = ['tipo', 'departamento']
+
+	def get_queryset(self):
+		queryset = super().get_queryset()
+		if self.get_grupo() != 'secretario':
+			encargado = models.Personal.objects.filter(usuario_id=self.request.user.id).values('id')
+			queryset = queryset.annotate(encargado=Min('departamento__personal')).filter(encargado__in=encargado)
+		return queryset
+
 class AgregarBien(SuccessMessageMixin, GroupRequiredMixin, CreateView):
 	group_required = u'secretario'
 	template_name = "bien/agregar.html"
@@ -210,10 +331,14 @@ class AgregarBien(SuccessMessageMixin, GroupRequiredMixin, CreateView):
 	success_url = "/bien/"
 	success_message = "Creado con éxito."
 
-class VerBien(GroupRequiredMixin, DetailView):
+class VerBien(CondicionalMixin, RelacionesMixin, GroupRequiredMixin, DetailView):
 	group_required = u'secretario'
 	template_name = "bien/ver.html"
 	model = models.Bien
+	modelos_condicional = [models.Bien, models.Tipo_Bien, models.Departamento, models.Historial_Bien]
+	select_related = ['tipo', 'departamento']
+	prefetch_related = [Prefetch('historial_bien_set', queryset=models.Historial_Bien.objects.order_by('-fecha', '-pk'))]
+	presupuesto_consultas = 5
 
 class EditarBien(SuccessMessageMixin, GroupRequiredMixin, UpdateView):
 	group_required = u'secretario'
@@ -223,6 +348,26 @@ class EditarBien(SuccessMessageMixin, GroupRequiredMixin, UpdateView):
 	success_url = "/bien/"
 	success_message = "Editado con éxito."
 
+class Inventario(CondicionalMixin, GroupRequiredMixin, ListView):
+	"""Bienes, bienes dañados y reportes abiertos por departamento, desde Inventario_Departamento."""
+	group_required = u'secretario'
+	template_name = "bien/inventario.html"
+	model = models.Inventario_Departamento
+	presupuesto_consultas = 4
+
+	def get_queryset(self):
+		return models.Inventario_Departamento.objects.select_related('departamento').order_by('-danados', '-reportes_abiertos', 'departamento__nombre')
+
+	def get_context_data(self, **kwargs):
+		context = super().get_context_data(**kwargs)
+		filas = context['object_list']
+		context['totales'] = {
+			'bienes': sum(fila.bienes for fila in filas),
+			'danados': sum(fila.danados for fila in filas),
+			'reportes_abiertos': sum(fila.reportes_abiertos for fila in filas),
+		}
+		return context
+
 class EliminarBien(SuccessMessageMixin, GroupRequiredMixin, DeleteView):
 	group_required = u'secretario'
 	model = models.Bien
@@ -232,11 +377,26 @@ class EliminarBien(SuccessMessageMixin, GroupRequiredMixin, DeleteView):
 		messages.add_message(self.request, messages.INFO, 'Eliminado con éxito.')
 		return self.post(*args, **kwargs)
 
-class Reporte(GroupRequiredMixin, ListView):
+class Reporte(CondicionalMixin, GroupRequiredMixin, ListView):
 	group_required = [u'secretario', u'profesor']
 	template_name = "reporte/index.html"
 	model = models.Reporte
 
+class DatosReporte(Datos):
+	group_required = [u'secretario', u'profesor']
+	model = models.Reporte
+	columns = [('id', 'id'), ('bien__nombre', 'bien'), ('status', 'get_status_display'), ('fecha_inicio', 'fecha_inicio')]
+	search_fields = ['bien__nombre']
+	actions_template = "reporte/acciones.html"
+	select_related = ['bien__tipo']
+
+	def get_queryset(self):
+		queryset = super().get_queryset()
+		if self.get_grupo() != 'secretario':
+			encargado = models.Personal.objects.filter(usuario_id=self.request.user.id).values('id')
+			queryset = queryset.annotate(encargado=Min('bien__departamento__personal')).filter(encargado__in=encargado)
+		return queryset
+
 class AgregarReporte(SuccessMessageMixin, GroupRequiredMixin, CreateView):
 	group_required = [u'profesor']
 	template_name = "reporte/agregar.html"
@@ -247,15 +407,18 @@ class AgregarReporte(SuccessMessageMixin, GroupRequiredMixin, CreateView):
 
 	def get_context_data(self, **kwargs):
 		context = super().get_context_data(**kwargs)
-		usuario = models.Personal.objects.filter(cedula=self.request.user.username)[0]
-		departamento = models.Departamento.objects.filter(personal=usuario)[0]
-		context['form'].fields['bien'].queryset = models.Bien.objects.filter(departamento=departamento)
+		departamento = models.Departamento.objects.filter(personal=self.request.lca_profile)[0]
+		context['form'].fields['bien'].queryset = models.Bien.objects.filter(departamento=departamento).select_related('tipo')
 		return context
 
-class VerReporte(GroupRequiredMixin, DetailView):
+class VerReporte(CondicionalMixin, RelacionesMixin, GroupRequiredMixin, DetailView):
 	group_required = [u'secretario', u'profesor']
 	template_name = "reporte/ver.html"
 	model = models.Reporte
+	modelos_condicional = [models.Reporte, models.Bien, models.Tipo_Bien, models.Departamento, models.Personal]
+	select_related = ['bien__tipo', 'bien__departamento']
+	prefetch_related = ['bien__departamento__personal']
+	presupuesto_consultas = 5
 
 class EditarReporte(SuccessMessageMixin, GroupRequiredMixin, UpdateView):
 	group_required = u'secretario'
@@ -266,20 +429,34 @@ class EditarReporte(SuccessMessageMixin, GroupRequiredMixin, UpdateView):
 	success_message = "Editado con éxito."
 
 	def form_valid(self, form):
-		obj = form.save(commit=False)
-		if obj.status != 'E':
-			obj.fecha_fin = timezone.now()
-		if obj.status == 'A':
-			obj.bien.status = "D"
-			obj.bien.save()
-		obj.save()
-		return super().form_valid(form)
+		self.object = inventario.resolver_reporte(form.save(commit=False))
+		messages.success(self.request, self.get_success_message(form.cleaned_data))
+		return redirect(self.get_success_url())
 
-class Permiso(GroupRequiredMixin, ListView):
+class Permiso(CondicionalMixin, GroupRequiredMixin, ListView):
 	group_required = [u'secretario', u'administrativo', u'profesor', u'obrero']
 	template_name = "permiso/index.html"
 	model = models.Permiso
 
+class DatosPermiso(Datos):
+	group_required = [u'secretario', u'administrativo', u'profesor', u'obrero']
+	model = models.Permiso
+	columns = [
+		('id', 'id'),
+		('personal__nombre', 'personal'),
+		('status', 'get_status_display'),
+		('fecha_inicio', lambda obj: '%s - %s' % (localize(obj.fecha_inicio), localize(obj.fecha_fin))),
+	]
+	search_fields = ['personal__nombre']
+	actions_template = "permiso/acciones.html"
+	select_related = ['personal']
+
+	def get_queryset(self):
+		queryset = super().get_queryset()
+		if self.get_grupo() != 'secretario':
+			queryset = queryset.filter(personal__usuario_id=self.request.user.id)
+		return queryset
+
 class AgregarSecretarioPermiso(SuccessMessageMixin, GroupRequiredMixin, CreateView):
 	group_required = [u'secretario']
 	template_name = "permiso/agregar_secretario.html"
@@ -304,14 +481,26 @@ class AgregarPersonalPermiso(SuccessMessageMixin, GroupRequiredMixin, CreateView
 
 	def form_valid(self, form):
 		obj = form.save(commit=False)
-		obj.personal = models.Personal.objects.filter(cedula=self.request.user.username)[0]
+		obj.personal = self.request.lca_profile
 		obj.save()
 		return super().form_valid(form)
 
-class VerPermiso(GroupRequiredMixin, DetailView):
+class VerPermiso(CondicionalMixin, RelacionesMixin, GroupRequiredMixin, DetailView):
 	group_required = [u'secretario', u'administrativo', u'profesor', u'obrero']
 	template_name = "permiso/ver.html"
 	model = models.Permiso
+	select_related = ['personal']
+	presupuesto_consultas = 4
+
+class RecipePermiso(GroupRequiredMixin, View):
+	group_required = [u'secretario', u'administrativo', u'profesor', u'obrero']
+
+	def get(self, request, *args, **kwargs):
+		permiso = get_object_or_404(models.Permiso, pk=kwargs['pk'])
+		if request.lca_group != 'secretario' and permiso.personal_id != getattr(request.lca_profile, 'id', None):
+			raise Http404
+		# El nombre es el hash del contenido: no cambia mientras exista.
+		return enviar_archivo(permiso.imagen.name, 'private, max-age=31536000, immutable', permiso.imagen.storage)
 
 class EditarPermiso(SuccessMessageMixin, GroupRequiredMixin, UpdateView):
 	group_required = u'secretario'
@@ -321,11 +510,25 @@ class EditarPermiso(SuccessMessageMixin, GroupRequiredMixin, UpdateView):
 	success_url = "/permiso/"
 	success_message = "Respondido con éxito."
 
-class Memorandum(GroupRequiredMixin, ListView):
+class Memorandum(CondicionalMixin, GroupRequiredMixin, ListView):
 	group_required = [u'secretario', u'administrativo', u'profesor', u'obrero']
 	template_name = "memorandum/index.html"
 	model = models.Memorandum
 
+class DatosMemorandum(Datos):
+	group_required = [u'secretario', u'administrativo', u'profesor', u'obrero']
+	model = models.Memorandum
+	columns = [('id', 'id'), ('personal__nombre', 'personal'), ('fecha', 'fecha')]
+	search_fields = ['personal__nombre', 'observacion']
+	actions_template = "memorandum/acciones.html"
+	select_related = ['personal']
+
+	def get_queryset(self):
+		queryset = super().get_queryset()
+		if self.get_grupo() != 'secretario':
+			queryset = queryset.filter(personal__usuario_id=self.request.user.id)
+		return queryset
+
 class AgregarMemorandum(SuccessMessageMixin, GroupRequiredMixin, CreateView):
 	group_required = u'secretario'
 	template_name = "memorandum/agregar.html"
@@ -334,10 +537,12 @@ class AgregarMemorandum(SuccessMessageMixin, GroupRequiredMixin, CreateView):
 	success_url = "/memorandum/"
 	success_message = "Creado con éxito."
 
-class VerMemorandum(GroupRequiredMixin, DetailView):
+class VerMemorandum(CondicionalMixin, RelacionesMixin, GroupRequiredMixin, DetailView):
 	group_required = [u'secretario', u'administrativo', u'profesor', u'obrero']
 	template_name = "memorandum/ver.html"
 	model = models.Memorandum
+	select_related = ['personal']
+	presupuesto_consultas = 4
 
 class EditarMemorandum(SuccessMessageMixin, GroupRequiredMixin, UpdateView):
 	group_required = u'secretario'
@@ -356,11 +561,19 @@ class EliminarMemorandum(SuccessMessageMixin, GroupRequiredMixin, DeleteView):
 		messages.add_message(self.request, messages.INFO, 'Eliminado con éxito.')
 		return self.post(*args, **kwargs)
 
-class AsistenciaPersonal(GroupRequiredMixin, ListView):
+class AsistenciaPersonal(CondicionalMixin, GroupRequiredMixin, ListView):
 	group_required = u'secretario'
 	template_name = "asistencia_personal/index.html"
 	model = models.Asistencia_Personal
 
+class DatosAsistenciaPersonal(Datos):
+	group_required = u'secretario'
+	model = models.Asistencia_Personal
+	columns = [('id', 'id'), ('personal__nombre', 'personal'), ('fecha', 'fecha'), ('horas', 'horas')]
+	search_fields = ['personal__nombre']
+	actions_template = "asistencia_personal/acciones.html"
+	select_related = ['personal']
+
 class AgregarAsistenciaPersonal(SuccessMessageMixin, GroupRequiredMixin, CreateView):
 	group_required = u'secretario'
 	template_name = "asistencia_personal/agregar.html"
@@ -369,6 +582,121 @@ class AgregarAsistenciaPersonal(SuccessMessageMixin, GroupRequiredMixin, CreateV
 	success_url = "/asistencia_personal/"
 	success_message = "Creado con éxito."
 
+class PlanillaAsistenciaPersonal(GroupRequiredMixin, TemplateView):
+	group_required = u'secretario'
+	template_name = "asistencia_personal/planilla.html"
+	presupuesto_consultas = 5
+
+	def get_periodo(self, datos):
+		desde = parse_date(datos.get('desde') or '') or timezone.localdate()
+		periodo = 'mes' if datos.get('periodo') == 'mes' else 'semana'
+		if periodo == 'mes':
+			inicio = desde.replace(day=1)
+			fin = (inicio + datetime.timedelta(days=32)).replace(day=1) - datetime.timedelta(days=1)
+		else:
+			inicio = desde - datetime.timedelta(days=desde.weekday())
+			fin = inicio + datetime.timedelta(days=4)
+		dias = [inicio + datetime.timedelta(days=i) for i in range((fin - inicio).days + 1)]
+		return inicio, periodo, [dia for dia in dias if dia.weekday() < 5]
+
+	def get_campo(self, personal_id, dia):
+		return 'h_%d_%s' % (personal_id, dia.strftime('%Y%m%d'))
+
+	def get_personal(self):
+		return models.Personal.objects.filter(fecha_fin__isnull=True).order_by('nombre')
+
+	def get_context_data(self, enviados=None, errores=(), personal=None, **kwargs):
+		context = super().get_context_data(**kwargs)
+		inicio, periodo, dias = self.get_periodo(self.request.GET if enviados is None else enviados)
+		if enviados is None:
+			registradas = {}
+			for personal_id, fecha, horas in models.Asistencia_Personal.objects.filter(fecha__range=(dias[0], dias[-1])).values_list('personal_id', 'fecha', 'horas'):
+				registradas.setdefault((personal_id, fecha), horas)
+			valor = lambda p, dia: registradas.get((p.id, dia))
+		else:
+			# Al rechazar la planilla se muestra lo que se envió.
+			valor = lambda p, dia: enviados.get(self.get_campo(p.id, dia), '').strip()
+		invalidos = {campo for campo, nombre, dia, texto in errores}
+		context['filas'] = [
+			(p, [(self.get_campo(p.id, dia), valor(p, dia), self.get_campo(p.id, dia) in invalidos) for dia in dias])
+			for p in (self.get_personal() if personal is None else personal)
+		]
+		context['errores'] = errores
+		context['desde'] = inicio
+		context['periodo'] = periodo
+		context['dias'] = dias
+		return context
+
+	def post(self, request, *args, **kwargs):
+		inicio, periodo, dias = self.get_periodo(request.POST)
+		personal = list(self.get_personal())
+		existentes = {}
+		for asistencia in models.Asistencia_Personal.objects.filter(fecha__range=(dias[0], dias[-1])).order_by('pk'):
+			existentes.setdefault((asistencia.personal_id, asistencia.fecha), asistencia)
+		crear = []
+		actualizar = []
+		eliminar = []
+		errores = []
+		deltas = Deltas()
+		for p in personal:
+			personal_id = p.id
+			for dia in dias:
+				campo = self.get_campo(personal_id, dia)
+				valor = request.POST.get(campo, '').strip()
+				actual = existentes.get((personal_id, dia))
+				if not valor:
+					if actual:
+						eliminar.append(actual.pk)
+					continue
+				if not valor.isdigit() or int(valor) > 24:
+					errores.append((campo, p.nombre, dia, valor))
+					continue
+				horas = int(valor)
+				if actual is None:
+					crear.append(models.Asistencia_Personal(personal_id=personal_id, fecha=dia, horas=horas))
+					deltas.sumar(personal_id, dia, horas)
+				elif actual.horas != horas:
+					deltas.restar(personal_id, dia, actual.horas)
+					deltas.sumar(personal_id, dia, horas)
+					actual.horas = horas
+					actualizar.append(actual)
+		if errores:
+			# No se guarda nada hasta que todas las celdas sean válidas.
+			return self.render_to_response(self.get_context_data(enviados=request.POST, errores=errores, personal=personal))
+		# bulk_create y bulk_update no emiten señales, así que el acumulado
+		# mensual se actualiza aquí; delete() sí las emite.
+		with transaction.atomic():
+			models.Asistencia_Personal.objects.bulk_create(crear)
+			models.Asistencia_Personal.objects.bulk_update(actualizar, ['horas'])
+			versiones.invalidar(models.Asistencia_Personal)
+			deltas.aplicar()
+			if eliminar:
+				models.Asistencia_Personal.objects.filter(pk__in=eliminar).delete()
+		messages.add_message(self.request, messages.INFO, 'Asistencia guardada con éxito.')
+		return redirect('%s?desde=%s&periodo=%s' % (reverse('planilla_asistencia_personal'), inicio.isoformat(), periodo))
+
+class HorasPersonal(CondicionalMixin, GroupRequiredMixin, ListView):
+	group_required = u'secretario'
+	template_name = "asistencia_personal/horas.html"
+	model = models.Horas_Personal
+	presupuesto_consultas = 4
+
+	def get_mes(self):
+		try:
+			anio, mes = [int(parte) for parte in self.request.GET.get('mes', '').split('-')]
+			return datetime.date(anio, mes, 1)
+		except ValueError:
+			return timezone.localdate().replace(day=1)
+
+	def get_queryset(self):
+		mes = self.get_mes()
+		return models.Horas_Personal.objects.filter(anio=mes.year, mes=mes.month).select_related('personal').order_by('personal__nombre')
+
+	def get_context_data(self, **kwargs):
+		context = super().get_context_data(**kwargs)
+		context['mes'] = self.get_mes()
+		return context
+
 class EditarAsistenciaPersonal(SuccessMessageMixin, GroupRequiredMixin, UpdateView):
 	group_required = u'secretario'
 	template_name = "asistencia_personal/editar.html"
@@ -386,11 +714,27 @@ class EliminarAsistenciaPersonal(SuccessMessageMixin, GroupRequiredMixin, Delete
 		messages.add_message(self.request, messages.INFO, 'Eliminado con éxito.')
 		return self.post(*args, **kwargs)
 
-class Asignatura(GroupRequiredMixin, ListView):
+class Asignatura(CondicionalMixin, GroupRequiredMixin, ListView):
 	group_required = [u'secretario', u'profesor']
 	template_name = "asignatura/index.html"
 	model = models.Asignatura
 
+class DatosAsignatura(Datos):
+	group_required = [u'secretario', u'profesor']
+	model = models.Asignatura
+	modelos_cache = [models.Asignatura, models.Personal]
+	cache_por_usuario = True
+	columns = [('id', 'id'), ('nombre', 'nombre'), ('personal__nombre', 'personal')]
+	search_fields = ['nombre', 'personal__nombre']
+	actions_template = "asignatura/acciones.html"
+	select_related = ['personal']
+
+	def get_queryset(self):
+		queryset = super().get_queryset()
+		if self.get_grupo() != 'secretario':
+			queryset = queryset.filter(personal__usuario_id=self.request.user.id)
+		return queryset
+
 class AgregarAsignatura(SuccessMessageMixin, GroupRequiredMixin, CreateView):
 	group_required = u'secretario'
 	template_name = "asignatura/agregar.html"
@@ -399,10 +743,32 @@ class AgregarAsignatura(SuccessMessageMixin, GroupRequiredMixin, CreateView):
 	success_url = "/asignatura/"
 	success_message = "Creado con éxito."
 
-class VerAsignatura(GroupRequiredMixin, DetailView):
+class VerAsignatura(CondicionalMixin, RelacionesMixin, GroupRequiredMixin, DetailView):
 	group_required = u'secretario'
 	template_name = "asignatura/ver.html"
 	model = models.Asignatura
+	select_related = ['personal']
+	presupuesto_consultas = 4
+
+class NotasAsignatura(CondicionalMixin, RelacionesMixin, GroupRequiredMixin, DetailView):
+	group_required = [u'secretario', u'profesor']
+	template_name = "asignatura/notas.html"
+	model = models.Asignatura
+	modelos_condicional = [models.Asignatura, models.Personal, models.Asignatura_Alumno, models.Alumno, models.Promedio_Alumno]
+	select_related = ['personal']
+	presupuesto_consultas = 5
+
+	def get_queryset(self):
+		queryset = super().get_queryset()
+		if self.request.lca_group == 'profesor':
+			queryset = queryset.filter(personal=self.request.lca_profile)
+		return queryset
+
+	def get_context_data(self, **kwargs):
+		context = super().get_context_data(**kwargs)
+		context['lapsos'] = models.LAPSOS
+		context['filas'] = notas.matriz(self.object)
+		return context
 
 class EditarAsignatura(SuccessMessageMixin, GroupRequiredMixin, UpdateView):
 	group_required = u'secretario'
@@ -412,11 +778,32 @@ class EditarAsignatura(SuccessMessageMixin, GroupRequiredMixin, UpdateView):
 	success_url = "/asignatura/"
 	success_message = "Editado con éxito."
 
-class Horario(GroupRequiredMixin, ListView):
+class Horario(CondicionalMixin, GroupRequiredMixin, ListView):
 	group_required = [u'secretario', u'profesor']
 	template_name = "horario/index.html"
 	model = models.Horario
 
+class DatosHorario(Datos):
+	group_required = [u'secretario', u'profesor']
+	model = models.Horario
+	modelos_cache = [models.Horario, models.Asignatura, models.Personal]
+	cache_por_usuario = True
+	columns = [
+		('id', 'id'),
+		('asignatura__nombre', 'asignatura'),
+		('dia', 'get_dia_display'),
+		('hora_inicio', lambda obj: '%s - %s' % (localize(obj.hora_inicio), localize(obj.hora_fin))),
+	]
+	search_fields = ['asignatura__nombre']
+	actions_template = "horario/acciones.html"
+	select_related = ['asignatura']
+
+	def get_queryset(self):
+		queryset = super().get_queryset()
+		if self.get_grupo() != 'secretario':
+			queryset = queryset.filter(asignatura__personal__usuario_id=self.request.user.id)
+		return queryset
+
 class AgregarHorario(SuccessMessageMixin, GroupRequiredMixin, CreateView):
 	group_required = u'secretario'
 	template_name = "horario/agregar.html"
@@ -425,10 +812,58 @@ class AgregarHorario(SuccessMessageMixin, GroupRequiredMixin, CreateView):
 	success_url = "/horario/"
 	success_message = "Creado con éxito."
 
-class VerHorario(GroupRequiredMixin, DetailView):
+class VerHorario(CondicionalMixin, RelacionesMixin, GroupRequiredMixin, DetailView):
 	group_required = u'secretario'
 	template_name = "horario/ver.html"
 	model = models.Horario
+	select_related = ['asignatura']
+	presupuesto_consultas = 4
+
+class HorarioSemanal(CondicionalMixin, GroupRequiredMixin, DetailView):
+	"""Grilla semanal de un profesor; sin pk, la del usuario."""
+	group_required = [u'secretario', u'profesor']
+	template_name = "horario/semanal.html"
+	model = models.Personal
+	modelos_condicional = [models.Personal, models.Asignatura, models.Horario]
+	presupuesto_consultas = 5
+
+	def get_queryset(self):
+		queryset = super().get_queryset()
+		if self.request.lca_group == 'profesor':
+			queryset = queryset.filter(usuario_id=self.request.user.id)
+		return queryset
+
+	def get_object(self, queryset=None):
+		if 'pk' in self.kwargs:
+			return super().get_object(queryset)
+		if self.request.lca_profile is None:
+			raise Http404
+		return self.request.lca_profile
+
+	def get_context_data(self, **kwargs):
+		context = super().get_context_data(**kwargs)
+		context['titulo'] = 'Horario de %s' % self.object.nombre
+		context['grilla'] = horarios.get_grilla(self.object.pk)
+		return context
+
+class HorarioAsignatura(CondicionalMixin, RelacionesMixin, GroupRequiredMixin, DetailView):
+	group_required = [u'secretario', u'profesor']
+	template_name = "horario/semanal.html"
+	model = models.Asignatura
+	modelos_condicional = [models.Asignatura, models.Personal, models.Horario]
+	presupuesto_consultas = 5
+
+	def get_queryset(self):
+		queryset = super().get_queryset()
+		if self.request.lca_group == 'profesor':
+			queryset = queryset.filter(personal__usuario_id=self.request.user.id)
+		return queryset
+
+	def get_context_data(self, **kwargs):
+		context = super().get_context_data(**kwargs)
+		context['titulo'] = 'Horario de %s' % self.object.nombre
+		context['grilla'] = horarios.filtrar_grilla(horarios.get_grilla(self.object.personal_id), self.object.pk)
+		return context
 
 class EditarHorario(SuccessMessageMixin, GroupRequiredMixin, UpdateView):
 	group_required = u'secretario'
@@ -447,11 +882,18 @@ class EliminarHorario(SuccessMessageMixin, GroupRequiredMixin, DeleteView):
 		messages.add_message(self.request, messages.INFO, 'Eliminado con éxito.')
 		return self.post(*args, **kwargs)
 
-class Representante(GroupRequiredMixin, ListView):
+class Representante(CondicionalMixin, GroupRequiredMixin, ListView):
 	group_required = u'secretario'
 	template_name = "representante/index.html"
 	model = models.Representante
 
+class DatosRepresentante(Datos):
+	group_required = u'secretario'
+	model = models.Representante
+	columns = [('id', 'id'), ('nombre', 'nombre'), ('telefono', 'telefono')]
+	search_fields = ['nombre', 'cedula', 'telefono']
+	actions_template = "representante/acciones.html"
+
 class AgregarRepresentante(SuccessMessageMixin, GroupRequiredMixin, CreateView):
 	group_required = u'secretario'
 	template_name = "representante/agregar.html"
@@ -460,7 +902,7 @@ class AgregarRepresentante(SuccessMessageMixin, GroupRequiredMixin, CreateView):
 	success_url = "/representante/"
 	success_message = "Creado con éxito."
 
-class VerRepresentante(GroupRequiredMixin, DetailView):
+class VerRepresentante(CondicionalMixin, GroupRequiredMixin, DetailView):
 	group_required = u'secretario'
 	template_name = "representante/ver.html"
 	model = models.Representante
@@ -473,11 +915,18 @@ class EditarRepresentante(SuccessMessageMixin, GroupRequiredMixin, UpdateView):
 	success_url = "/representante/"
 	success_message = "Editado con éxito."
 
-class Alumno(GroupRequiredMixin, ListView):
+class Alumno(CondicionalMixin, GroupRequiredMixin, ListView):
 	group_required = u'secretario'
 	template_name = "alumno/index.html"
 	model = models.Alumno
 
+class DatosAlumno(Datos):
+	group_required = u'secretario'
+	model = models.Alumno
+	columns = [('id', 'id'), ('nombre', 'nombre'), ('telefono', 'telefono')]
+	search_fields = ['nombre', 'cedula', 'telefono']
+	actions_template = "alumno/acciones.html"
+
 class AgregarAlumno(SuccessMessageMixin, GroupRequiredMixin, CreateView):
 	group_required = u'secretario'
 	template_name = "alumno/agregar.html"
@@ -495,10 +944,45 @@ class AgregarAlumno(SuccessMessageMixin, GroupRequiredMixin, CreateView):
 		obj.save()
 		return super().form_valid(form)
 
-class VerAlumno(GroupRequiredMixin, DetailView):
+class Buscar(GroupRequiredMixin, TemplateView):
+	group_required = u'secretario'
+	template_name = "buscar/index.html"
+	presupuesto_consultas = 4
+
+	def get(self, request, *args, **kwargs):
+		consulta = request.GET.get('q', '').strip()
+		resultados = busqueda.buscar(consulta)
+		if 'application/json' in request.headers.get('Accept', ''):
+			return JsonResponse({'q': consulta, 'resultados': resultados})
+		return self.render_to_response(self.get_context_data(q=consulta, resultados=resultados))
+
+class Importar(GroupRequiredMixin, FormView):
+	group_required = u'secretario'
+	template_name = "importar/index.html"
+	form_class = ImportarForm
+
+	def get_initial(self):
+		return {'tipo': self.request.GET.get('tipo')}
+
+	def form_valid(self, form):
+		importador = IMPORTADORES[form.cleaned_data['tipo']]()
+		archivo = io.TextIOWrapper(form.cleaned_data['archivo'].file, encoding='utf-8-sig', newline='')
+		try:
+			importador.importar(archivo)
+		except UnicodeDecodeError:
+			importador.errores.append((None, 'El archivo debe estar codificado en UTF-8. No se importó ningún registro.'))
+		except csv.Error as e:
+			importador.errores.append((None, 'El archivo no es un CSV válido (%s). No se importó ningún registro.' % e))
+		if importador.creados:
+			messages.add_message(self.request, messages.INFO, 'Se importaron %d registros.' % importador.creados)
+		return self.render_to_response(self.get_context_data(form=form, errores=importador.errores))
+
+class VerAlumno(CondicionalMixin, RelacionesMixin, GroupRequiredMixin, DetailView):
 	group_required = u'secretario'
 	template_name = "alumno/ver.html"
 	model = models.Alumno
+	select_related = ['representante']
+	presupuesto_consultas = 4
 
 class EditarAlumno(SuccessMessageMixin, GroupRequiredMixin, UpdateView):
 	group_required = u'secretario'
@@ -517,11 +1001,25 @@ class EditarAlumno(SuccessMessageMixin, GroupRequiredMixin, UpdateView):
 		obj.save()
 		return super().form_valid(form)
 
-class AsignaturaAlumno(GroupRequiredMixin, ListView):
+class AsignaturaAlumno(CondicionalMixin, GroupRequiredMixin, ListView):
 	group_required = [u'secretario', u'profesor']
 	template_name = "asignatura_alumno/index.html"
 	model = models.Asignatura_Alumno
 
+class DatosAsignaturaAlumno(Datos):
+	group_required = [u'secretario', u'profesor']
+	model = models.Asignatura_Alumno
+	columns = [('id', 'id'), ('asignatura__nombre', 'asignatura'), ('alumno__nombre', 'alumno')]
+	search_fields = ['asignatura__nombre', 'alumno__nombre']
+	actions_template = "asignatura_alumno/acciones.html"
+	select_related = ['asignatura', 'alumno']
+
+	def get_queryset(self):
+		queryset = super().get_queryset()
+		if self.get_grupo() != 'secretario':
+			queryset = queryset.filter(asignatura__personal__usuario_id=self.request.user.id)
+		return queryset
+
 class AgregarAsignaturaAlumno(SuccessMessageMixin, GroupRequiredMixin, CreateView):
 	group_required = u'secretario'
 	template_name = "asignatura_alumno/agregar.html"
@@ -547,11 +1045,19 @@ class EliminarAsignaturaAlumno(SuccessMessageMixin, GroupRequiredMixin, DeleteVi
 		messages.add_message(self.request, messages.INFO, 'Eliminado con éxito.')
 		return self.post(*args, **kwargs)
 
-class AsistenciaAlumno(GroupRequiredMixin, ListView):
+class AsistenciaAlumno(CondicionalMixin, GroupRequiredMixin, ListView):
 	group_required = [u'secretario', u'profesor']
 	template_name = "asistencia_alumno/index.html"
 	model = models.Asistencia_Alumno
 
+class DatosAsistenciaAlumno(Datos):
+	group_required = [u'secretario', u'profesor']
+	model = models.Asistencia_Alumno
+	columns = [('id', 'id'), ('asignatura_alumno__asignatura__nombre', 'asignatura_alumno'), ('fecha', 'fecha')]
+	search_fields = ['asignatura_alumno__asignatura__nombre', 'asignatura_alumno__alumno__nombre']
+	actions_template = "asistencia_alumno/acciones.html"
+	select_related = ['asignatura_alumno__asignatura', 'asignatura_alumno__alumno']
+
 class AgregarAsistenciaAlumno(SuccessMessageMixin, GroupRequiredMixin, CreateView):
 	group_required = u'profesor'
 	template_name = "asistencia_alumno/agregar.html"
@@ -562,14 +1068,65 @@ class AgregarAsistenciaAlumno(SuccessMessageMixin, GroupRequiredMixin, CreateVie
 
 	def get_context_data(self, **kwargs):
 		context = super().get_context_data(**kwargs)
-		usuario = models.Personal.objects.filter(cedula=self.request.user.username)[0]
-		asignatura = models.Asignatura.objects.filter(personal=usuario)
-		aa = models.Asignatura_Alumno.objects.none()
-		for a in asignatura:
-			aa = aa | models.Asignatura_Alumno.objects.filter(asignatura=a)
-		context['form'].fields['asignatura_alumno'].queryset = aa
+		aa = models.Asignatura_Alumno.objects.filter(asignatura__personal=self.request.lca_profile)
+		context['form'].fields['asignatura_alumno'].queryset = aa.select_related('asignatura', 'alumno')
+		return context
+
+class AsistenciaClase(GroupRequiredMixin, FormView):
+	group_required = u'profesor'
+	template_name = "asistencia_alumno/clase.html"
+	form_class = AsistenciaClaseForm
+	success_url = "/asistencia_alumno/"
+
+	def get_form_kwargs(self):
+		kwargs = super().get_form_kwargs()
+		kwargs['personal'] = self.request.lca_profile
+		if self.request.method == 'GET' and 'asignatura' in self.request.GET:
+			kwargs['data'] = self.request.GET
+		return kwargs
+
+	def get_context_data(self, **kwargs):
+		context = super().get_context_data(**kwargs)
+		form = context['form']
+		context['inscripciones'] = None
+		if form.is_bound and form.is_valid():
+			asignatura = form.cleaned_data['asignatura']
+			context['inscripciones'] = models.Asignatura_Alumno.objects.filter(asignatura=asignatura).select_related('alumno').order_by('alumno__nombre')
+			context['presentes'] = set(models.Asistencia_Alumno.objects.filter(
+				asignatura_alumno__asignatura=asignatura, fecha=form.cleaned_data['fecha']
+			).values_list('asignatura_alumno_id', flat=True))
 		return context
 
+	def form_valid(self, form):
+		asignatura = form.cleaned_data['asignatura']
+		fecha = form.cleaned_data['fecha']
+		inscripciones = set(models.Asignatura_Alumno.objects.filter(asignatura=asignatura).values_list('id', flat=True))
+		presentes = {int(i) for i in self.request.POST.getlist('presentes') if i.isdigit()} & inscripciones
+		with transaction.atomic():
+			registradas = models.Asistencia_Alumno.objects.filter(asignatura_alumno__asignatura=asignatura, fecha=fecha)
+			registrados = set(registradas.values_list('asignatura_alumno_id', flat=True))
+			if registrados - presentes:
+				registradas.exclude(asignatura_alumno_id__in=presentes).delete()
+			nuevos = presentes - registrados
+			models.Asistencia_Alumno.objects.bulk_create([
+				models.Asistencia_Alumno(fecha=fecha, asignatura_alumno_id=i) for i in nuevos
+			])
+			# bulk_create no emite señales: los resúmenes se actualizan aquí.
+			versiones.invalidar(models.Asistencia_Alumno)
+			deltas = asistencias.Deltas()
+			for alumno_id in models.Asignatura_Alumno.objects.filter(id__in=nuevos).values_list('alumno_id', flat=True):
+				deltas.sumar(asignatura.id, alumno_id, fecha)
+			deltas.aplicar()
+		messages.add_message(self.request, messages.INFO, 'Asistencia guardada con éxito.')
+		return super().form_valid(form)
+
+class EstadisticasAsistencia(GroupRequiredMixin, View):
+	group_required = u'secretario'
+	presupuesto_consultas = 6
+
+	def get(self, request, *args, **kwargs):
+		return JsonResponse(asistencias.estadisticas())
+
 class EditarAsistenciaAlumno(SuccessMessageMixin, GroupRequiredMixin, UpdateView):
 	group_required = u'profesor'
 	template_name = "asistencia_alumno/editar.html"
@@ -578,6 +1135,11 @@ class EditarAsistenciaAlumno(SuccessMessageMixin, GroupRequiredMixin, UpdateView
 	success_url = "/asistencia_alumno/"
 	success_message = "Editado con éxito."
 
+	def get_form(self, form_class=None):
+		form = super().get_form(form_class)
+		form.fields['asignatura_alumno'].queryset = form.fields['asignatura_alumno'].queryset.select_related('asignatura', 'alumno')
+		return form
+
 class EliminarAsistenciaAlumno(SuccessMessageMixin, GroupRequiredMixin, DeleteView):
 	group_required = u'profesor'
 	model = models.Asistencia_Alumno
@@ -587,11 +1149,18 @@ class EliminarAsistenciaAlumno(SuccessMessageMixin, GroupRequiredMixin, DeleteVi
 		messages.add_message(self.request, messages.INFO, 'Eliminado con éxito.')
 		return self.post(*args, **kwargs)
 
-class Actividad(GroupRequiredMixin, ListView):
+class Actividad(CondicionalMixin, GroupRequiredMixin, ListView):
 	group_required = u'secretario'
 	template_name = "actividad/index.html"
 	model = models.Actividad
 
+class DatosActividad(Datos):
+	group_required = u'secretario'
+	model = models.Actividad
+	columns = [('id', 'id'), ('fecha', 'fecha'), ('descripcion', 'descripcion')]
+	search_fields = ['descripcion']
+	actions_template = "actividad/acciones.html"
+
 class AgregarActividad(SuccessMessageMixin, GroupRequiredMixin, CreateView):
 	group_required = u'secretario'
 	template_name = "actividad/agregar.html"
@@ -600,10 +1169,12 @@ class AgregarActividad(SuccessMessageMixin, GroupRequiredMixin, CreateView):
 	success_url = "/actividad/"
 	success_message = "Creado con éxito."
 
-class VerActividad(GroupRequiredMixin, DetailView):
+class VerActividad(CondicionalMixin, RelacionesMixin, GroupRequiredMixin, DetailView):
 	group_required = u'secretario'
 	template_name = "actividad/ver.html"
 	model = models.Actividad
+	prefetch_related = ['participantes']
+	presupuesto_consultas = 5
 
 class EditarActividad(SuccessMessageMixin, GroupRequiredMixin, UpdateView):
 	group_required = u'secretario'
@@ -613,17 +1184,85 @@ class EditarActividad(SuccessMessageMixin, GroupRequiredMixin, UpdateView):
 	success_url = "/actividad/"
 	success_message = "Editado con éxito."
 
-def personal_pdf(request):
-	template = 'pdf/personal.html'
-	context = {'personal': models.Personal.objects.all()}
-	pdf = render_to_pdf(template, context)
-	if pdf:
-		response = HttpResponse(pdf, content_type='application/pdf')
-		filename = "personal.pdf"
-		content = "inline; filename='%s'" % filename
-		download = request.GET.get("download")
-		if download:
-			content = "attachment; filename='%s'" % filename
-		response['Content-Disposition'] = content
-		return response
-	return HttpResponse("Not found")
\ No newline at end of file
+class PersonalPDF(CondicionalMixin, ExportarPDF):
+	template_name = 'pdf/personal.html'
+	plantillas_condicional = ()
+	queryset = models.Personal.objects.all()
+	context_object_name = 'personal'
+	filename = "personal.pdf"
+
+personal_pdf = PersonalPDF.as_view()
+
+class ExportarAlumno(GroupRequiredMixin, ExportarTabla):
+	group_required = u'secretario'
+	model = models.Alumno
+	filename = "alumnos"
+	columns = [
+		('Cédula', 'cedula'),
+		('Nombre', 'nombre'),
+		('Teléfono', 'telefono'),
+		('Dirección', 'direccion'),
+		('Correo', 'correo'),
+		('Fecha de nacimiento', 'fecha_nacimiento'),
+		('Representante', 'representante__nombre'),
+	]
+
+class ExportarAsistenciaAlumno(GroupRequiredMixin, ExportarTabla):
+	group_required = u'secretario'
+	model = models.Asistencia_Alumno
+	filename = "asistencia_alumnos"
+	columns = [
+		('Fecha', 'fecha'),
+		('Asignatura', 'asignatura_alumno__asignatura__nombre'),
+		('Cédula', 'asignatura_alumno__alumno__cedula'),
+		('Alumno', 'asignatura_alumno__alumno__nombre'),
+	]
+
+class ExportarAsistenciaPersonal(GroupRequiredMixin, ExportarTabla):
+	group_required = u'secretario'
+	model = models.Asistencia_Personal
+	filename = "asistencia_personal"
+	columns = [
+		('Fecha', 'fecha'),
+		('Cédula', 'personal__cedula'),
+		('Personal', 'personal__nombre'),
+		('Horas', 'horas'),
+	]
+
+class ExportarEvaluacionAlumno(GroupRequiredMixin, ExportarTabla):
+	group_required = u'secretario'
+	model = models.Evaluacion_Alumno
+	filename = "evaluaciones"
+	columns = [
+		('Fecha', 'fecha'),
+		('Asignatura', 'asignatura_alumno__asignatura__nombre'),
+		('Cédula', 'asignatura_alumno__alumno__cedula'),
+		('Alumno', 'asignatura_alumno__alumno__nombre'),
+		('Evaluación', 'evaluacion__nombre'),
+		('Nota', 'nota'),
+	]
+
+class ExportarBien(GroupRequiredMixin, ExportarTabla):
+	group_required = u'secretario'
+	model = models.Bien
+	filename = "bienes"
+	columns = [
+		('Nombre', 'nombre'),
+		('Tipo', 'tipo__nombre'),
+		('Departamento', 'departamento__nombre'),
+		('Status', 'status'),
+		('Fecha', 'fecha'),
+	]
+
+class ExportarReporte(GroupRequiredMixin, ExportarTabla):
+	group_required = u'secretario'
+	model = models.Reporte
+	filename = "reportes"
+	columns = [
+		('Bien', 'bien__nombre'),
+		('Departamento', 'bien__departamento__nombre'),
+		('Status', 'status'),
+		('Fecha de inicio', 'fecha_inicio'),
+		('Fecha de fin', 'fecha_fin'),
+		('Observación', 'observacion'),
+	]
\ No newline at end of file
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -37,16 +38,19 @@ INSTALLED_APPS = [
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
-    'django.contrib.staticfiles',
+    'app.apps.StaticFilesConfig',
     'widget_tweaks',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'app.metricas.MetricasMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'app.middleware.PerfilMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -75,13 +79,84 @@ WSGI_APPLICATION = 'lca.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# SQLite por defecto; con LCA_DB_ENGINE=postgresql se usa PostgreSQL con los
+# datos de conexión de las variables LCA_DB_*. Para pasar los datos de
+# db.sqlite3 a la base nueva: python manage.py copiar_datos
+if os.environ.get('LCA_DB_ENGINE') == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('LCA_DB_NAME', 'lca'),
+            'USER': os.environ.get('LCA_DB_USER', 'lca'),
+            'PASSWORD': os.environ.get('LCA_DB_PASSWORD', ''),
+            'HOST': os.environ.get('LCA_DB_HOST', 'localhost'),
+            'PORT': os.environ.get('LCA_DB_PORT', '5432'),
+            'CONN_MAX_AGE': int(os.environ.get('LCA_DB_CONN_MAX_AGE', 600)),
+            'CONN_HEALTH_CHECKS': True,
+            # Detrás de PgBouncer en modo transacción no hay cursores del servidor
+            'DISABLE_SERVER_SIDE_CURSORS': os.environ.get('LCA_DB_PGBOUNCER') == '1',
+            'OPTIONS': {
+                'connect_timeout': 5,
+            },
+        }
     }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('LCA_DB_NAME', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': int(os.environ.get('LCA_DB_CONN_MAX_AGE', 60)),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'timeout': 20,
+            },
+        }
+    }
+
+# Pragmas aplicados a cada conexión SQLite nueva (ver app/signals.py)
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'mmap_size': 64 * 1024 * 1024,
+    'busy_timeout': 20000,
 }
 
+# Caché compartida por todos los procesos del servidor, en archivos bajo
+# LCA_CACHE_DIR o BASE_DIR / 'cache': así todos ven las versiones de
+# app/versiones.py cuando un proceso las invalida. La memoria del proceso
+# solo se usa con DEBUG, donde runserver corre en un proceso.
+if DEBUG and not os.environ.get('LCA_CACHE_DIR'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'OPTIONS': {
+                'MAX_ENTRIES': 1000,
+            },
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('LCA_CACHE_DIR') or str(BASE_DIR / 'cache'),
+            'OPTIONS': {
+                'MAX_ENTRIES': 10000,
+            },
+        }
+    }
+
+# Segundos que dura la versión de cada modelo (app/versiones.py). Si una
+# invalidación no llega a un proceso, este es el tiempo máximo que sigue
+# sirviendo respuestas viejas.
+VERSIONES_TIMEOUT = 5 * 60
+
+# Segundos que dura la versión del perfil de cada usuario (app/middleware.py):
+# a lo sumo ese tiempo un cambio de grupo tarda en llegar a todos los procesos.
+PERFIL_VERSION_TIMEOUT = 60
+
+# Duración de las respuestas guardadas por CacheMixin (app/views.py)
+CACHE_VISTAS_TIMEOUT = 24 * 60 * 60
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -124,6 +199,13 @@ STATICFILES_DIRS = [
     'static'
 ]
 
+# collectstatic copia a STATIC_ROOT los archivos con el hash del contenido en
+# el nombre y sus versiones .gz y .br; WhiteNoise los sirve con
+# Cache-Control inmutable y según el Accept-Encoding de cada navegador.
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+STATICFILES_STORAGE = 'app.estaticos.EstaticosStorage'
+WHITENOISE_KEEP_ONLY_HASHED_FILES = True
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
 
@@ -132,6 +214,40 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Configuraciones personales
 LOGIN_REDIRECT_URL = '/'
 
+# Exportaciones en PDF generadas en segundo plano
+EXPORTACIONES_DIR = BASE_DIR / 'exportaciones'
+PDF_WORKERS = 2
+PDF_TIMEOUT = 600
+
+# Boletines de fin de lapso (app/boletines.py): procesos y alumnos por tarea
+BOLETINES_WORKERS = os.cpu_count() or 1
+BOLETINES_LOTE = 20
+
+# Procesos para calcular las contraseñas iniciales en importaciones masivas
+IMPORTAR_WORKERS = os.cpu_count() or 1
+
+# Miniaturas de las fotos de perfil (app/miniaturas.py)
+MINIATURAS_WORKERS = 2
+MINIATURAS_MAX_AGE = 365 * 24 * 60 * 60
+
+# Recipes de los permisos (app/almacenamiento.py)
+RECIPES_MAX_LADO = 2000
+RECIPES_MAX_BYTES = 1024 * 1024
+
+# Envío de archivos por el servidor web: 'x-accel-redirect' (nginx, con una
+# location interna en ENVIO_ARCHIVOS_PREFIJO que apunte a MEDIA_ROOT),
+# 'x-sendfile' (Apache) o vacío para que los envíe Django.
+ENVIO_ARCHIVOS = os.environ.get('LCA_ENVIO_ARCHIVOS', '')
+ENVIO_ARCHIVOS_PREFIJO = '/protegido/'
+
+# Métricas por vista (app/metricas.py). Con METRICAS_TOKEN el endpoint
+# /metricas/ acepta 'Authorization: Bearer <token>' además de la sesión de
+# un secretario. METRICAS_ESTRICTO convierte en error los presupuestos
+# de consultas excedidos; las pruebas lo activan.
+METRICAS_SERVER_TIMING = True
+METRICAS_ESTRICTO = False
+METRICAS_TOKEN = os.environ.get('LCA_METRICAS_TOKEN', '')
+
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = 'smtp.gmail.com'
 EMAIL_USE_TLS = True
@@ -0,0 +1,38 @@
+// Gráficos de asistencia del tablero. Los datos salen de los resúmenes
+// diarios y mensuales, así que la consulta no crece con el historial.
+$(document).ready(function() {
+  var contenedor = $('#estadisticas-asistencia');
+  if (!contenedor.length) {
+    return;
+  }
+
+  function grafico(id, tipo, datos, color) {
+    var horizontal = tipo === 'horizontalBar';
+    var escala = [{"ticks": {"min": 0, "max": 100}}];
+    return new Chart(document.getElementById(id), {
+      "type": tipo,
+      "data": {
+        "labels": datos.etiquetas,
+        "datasets": [{
+          "data": datos.porcentajes,
+          "backgroundColor": tipo === 'line' ? 'rgba(78, 115, 223, 0.05)' : color,
+          "borderColor": color,
+          "pointRadius": 2,
+          "lineTension": 0.3
+        }]
+      },
+      "options": {
+        "maintainAspectRatio": true,
+        "legend": {"display": false},
+        "scales": horizontal ? {"xAxes": escala} : {"yAxes": escala}
+      }
+    });
+  }
+
+  $.getJSON(contenedor.data('url'), function(datos) {
+    grafico('asistencia-dias', 'line', datos.dias, '#4e73df');
+    grafico('asistencia-meses', 'bar', datos.meses, '#1cc88a');
+    grafico('asistencia-asignaturas', 'horizontalBar', datos.asignaturas, '#f6c23e');
+    grafico('asistencia-alumnos', 'horizontalBar', datos.alumnos, '#e74a3b');
+  });
+});
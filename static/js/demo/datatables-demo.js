@@ -1,8 +1,32 @@
 // Call the dataTables jQuery plugin
 $(document).ready(function() {
-  $('#dataTable').DataTable({
+  var tabla = $('#dataTable');
+  var opciones = {
     "language": {
       "url": "//cdn.datatables.net/plug-ins/1.10.15/i18n/Spanish.json"
     }
-  });
+  };
+
+  // Las tablas con data-url se paginan, ordenan y filtran en el servidor.
+  // El cursor que devuelve cada página se reenvía al pedir la siguiente
+  // para que el servidor pagine por keyset en lugar de OFFSET.
+  if (tabla.data('url')) {
+    var cursor = null;
+    opciones.processing = true;
+    opciones.serverSide = true;
+    opciones.ajax = {
+      "url": tabla.data('url'),
+      "data": function(d) {
+        if (cursor && JSON.parse(cursor).start === d.start) {
+          d.cursor = cursor;
+        }
+      },
+      "dataSrc": function(json) {
+        cursor = json.cursor || null;
+        return json.data;
+      }
+    };
+  }
+
+  tabla.DataTable(opciones);
 });